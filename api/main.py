@@ -1,7 +1,8 @@
 from fastapi import FastAPI
-from api.routes import auth, regist
+from api.routes import auth, regist, inventory, forecasting, jobs
 from fastapi.responses import FileResponse
 from api.routes import auth
+from db.db_connection import get_pool_stats
 import os
 
 app = FastAPI(title="Datatel Inventory API", version="1.0.0")
@@ -9,6 +10,9 @@ app = FastAPI(title="Datatel Inventory API", version="1.0.0")
 # Registrar rutas
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(regist.router, prefix="/register", tags=["Registration"])
+app.include_router(inventory.router, prefix="/inventory", tags=["Inventory"])
+app.include_router(forecasting.router, tags=["Forecasting"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
 
 @app.get("/favicon.ico", include_in_schema=False)
 def favicon():
@@ -21,3 +25,10 @@ def favicon():
 @app.get("/")
 def read_root():
     return {"message": "Bienvenido a la API de Datatel"}
+
+@app.get("/db/pool")
+def read_pool_stats():
+    """
+    Devuelve el estado del pool de conexiones compartido por el proceso.
+    """
+    return get_pool_stats()
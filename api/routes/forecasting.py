@@ -0,0 +1,191 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Literal
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+from fastapi import APIRouter, HTTPException, Query, Request
+from api.streaming import frame_chunks, negotiate_format, stream_frames
+from db.db_operations import get_database_operations
+from db.results_store import ResultsStore
+from models.forecast_service import ForecastService
+from models.generate_restocking_matrix import RestockingMatrix
+
+# Hilos que ejecutan el trabajo de los modelos; las solicitudes adicionales esperan sin bloquear el bucle de eventos
+FORECAST_WORKERS = 4
+# Hasta esta cantidad de productos se leen solo sus ventas; con más se usa la instantánea completa
+PER_PRODUCT_FETCH_LIMIT = 200
+
+router = APIRouter()
+
+_executor = ThreadPoolExecutor(max_workers=FORECAST_WORKERS, thread_name_prefix="forecast")
+_services_lock = threading.Lock()
+_services = {}  # motor -> ForecastService compartido por todas las solicitudes
+
+
+class ForecastBatchRequest(BaseModel):
+    product_ids: List[int] = Field(..., min_length=1)
+    days: int = Field(30, ge=1, le=365)
+    engine: Literal["statsmodels", "fast"] = "statsmodels"
+
+
+def get_db_ops():
+    """
+    Operaciones de datos compartidas por el servicio (y por lo tanto sus instantáneas y cachés).
+    """
+    with _services_lock:
+        if 'db_ops' not in _services:
+            _services['db_ops'] = get_database_operations()
+        return _services['db_ops']
+
+
+def get_forecast_service(engine):
+    """
+    Servicio de predicción del motor indicado; se crea una vez y se mantiene caliente entre solicitudes.
+    """
+    db_ops = get_db_ops()
+    with _services_lock:
+        if engine not in _services:
+            _services[engine] = ForecastService(engine=engine, db_ops=db_ops)
+        return _services[engine]
+
+
+async def run_in_pool(function, *args):
+    """
+    Ejecuta una función bloqueante en el pool de predicción y espera su resultado.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_executor, partial(function, *args))
+
+
+def frame_records(data):
+    """
+    Convierte un DataFrame en una lista de diccionarios serializable a JSON (NaN -> None).
+    """
+    return data.astype(object).where(data.notna(), None).to_dict('records')
+
+
+def forecast_payload(product_forecast):
+    """
+    Representación JSON del resultado unificado de un producto.
+    """
+    future = product_forecast.future_frame()
+    return {
+        "ID_Producto": int(product_forecast.product_id),
+        "Clase": product_forecast.demand_class,
+        "MSE": product_forecast.error_metrics.get("MSE"),
+        "RMSE": product_forecast.error_metrics.get("RMSE"),
+        "Total": float(product_forecast.restocking_total),
+        "Error": product_forecast.error,
+        "Prediccion": [
+            {"Fecha": date.strftime("%Y-%m-%d"), "Prediccion": float(value)}
+            for date, value in zip(future['Fecha'], future['Predicción'])
+        ]
+    }
+
+
+def forecast_frame(forecasts, output_format):
+    """
+    Bloque de predicciones para una respuesta por streaming: un objeto por producto en NDJSON
+    o una fila por producto y fecha en CSV (una fila vacía si el producto no tiene predicción).
+    """
+    if output_format != "csv":
+        return pd.DataFrame([forecast_payload(product_forecast) for product_forecast in forecasts])
+    parts = []
+    for product_forecast in forecasts:
+        future = product_forecast.future_frame().rename(columns={'Predicción': 'Prediccion'})
+        if future.empty:
+            future = pd.DataFrame({'Fecha': [pd.NaT], 'Prediccion': [np.nan]})
+        parts.append(future.assign(ID_Producto=int(product_forecast.product_id), Clase=product_forecast.demand_class,
+                                   MSE=product_forecast.error_metrics.get("MSE"),
+                                   RMSE=product_forecast.error_metrics.get("RMSE")))
+    return pd.concat(parts, ignore_index=True)[['ID_Producto', 'Clase', 'MSE', 'RMSE', 'Fecha', 'Prediccion']]
+
+
+def compute_forecasts(engine, product_ids, days):
+    service = get_forecast_service(engine)
+    if len(product_ids) <= PER_PRODUCT_FETCH_LIMIT:
+        return service.get_product_forecasts(product_ids, days)
+    return service.get_forecasts(product_ids, days)
+
+
+def precomputed_run():
+    """
+    Almacén de resultados y última ejecución precalculada por run.py, o (None, None) si no hay ninguna.
+    """
+    try:
+        store = ResultsStore()
+        return store, store.latest_run_id()
+    except Exception as e:
+        print(f"Error al leer los resultados precalculados: {e}")
+        return None, None
+
+
+def compute_restocking_matrix(engine):
+    """
+    Matriz de reposición: la última ejecución precalculada por run.py o, si no existe, calculada en el servicio.
+    """
+    store, run_id = precomputed_run()
+    matrix = store.fetch_restocking_matrix(run_id) if run_id is not None else None
+    if matrix is None or matrix.empty:
+        matrix = RestockingMatrix(engine=engine, db_ops=get_db_ops()).generate_matrix()
+    return matrix
+
+
+@router.get("/forecast/accuracy")
+async def get_forecast_accuracy(request: Request, engine: Literal["statsmodels", "fast"] = "statsmodels",
+                                horizon: int = Query(30, ge=1, le=365), origins: int = Query(5, ge=1, le=52),
+                                step: int = Query(7, ge=1, le=90)):
+    """
+    Precisión fuera de muestra por producto (orígenes móviles): MSE, RMSE, MAE, MASE y sesgo con la clase de
+    demanda de cada producto, para comparar motores y el enrutamiento a Croston/SBA.
+    """
+    service = get_forecast_service(engine)
+    table = await run_in_pool(service.get_accuracy_table, horizon, origins, step)
+    output_format = negotiate_format(request)
+    if output_format != "json":
+        return stream_frames(frame_chunks(table), output_format)
+    return {"data": frame_records(table)}
+
+
+@router.get("/forecast/{product_id}")
+async def get_product_forecast(product_id: int, days: int = Query(30, ge=1, le=365),
+                               engine: Literal["statsmodels", "fast"] = "statsmodels"):
+    product_forecast = (await run_in_pool(compute_forecasts, engine, [product_id], days))[0]
+    if product_forecast.history.empty:
+        raise HTTPException(status_code=404, detail=f"No hay ventas del producto {product_id}")
+    return forecast_payload(product_forecast)
+
+
+@router.post("/forecast")
+async def get_batch_forecast(batch: ForecastBatchRequest, request: Request):
+    output_format = negotiate_format(request)
+    if output_format != "json":
+        # Los productos se predicen por bloques y cada bloque se envía en cuanto termina
+        async def forecast_chunks():
+            product_ids = list(dict.fromkeys(batch.product_ids))
+            for start in range(0, len(product_ids), PER_PRODUCT_FETCH_LIMIT):
+                chunk_ids = product_ids[start:start + PER_PRODUCT_FETCH_LIMIT]
+                forecasts = await run_in_pool(compute_forecasts, batch.engine, chunk_ids, batch.days)
+                yield forecast_frame(forecasts, output_format)
+        return stream_frames(forecast_chunks(), output_format)
+
+    forecasts = await run_in_pool(compute_forecasts, batch.engine, batch.product_ids, batch.days)
+    return {"data": [forecast_payload(product_forecast) for product_forecast in forecasts]}
+
+
+@router.get("/restocking-matrix")
+async def get_restocking_matrix(request: Request, engine: Literal["statsmodels", "fast"] = "statsmodels"):
+    output_format = negotiate_format(request)
+    if output_format != "json":
+        store, run_id = await run_in_pool(precomputed_run)
+        if run_id is not None:
+            return stream_frames(store.iter_restocking_matrix(run_id), output_format)
+
+    matrix = await run_in_pool(compute_restocking_matrix, engine)
+    if matrix.empty:
+        raise HTTPException(status_code=404, detail="No data found")
+    if output_format != "json":
+        return stream_frames(frame_chunks(matrix), output_format)
+    return {"data": frame_records(matrix)}
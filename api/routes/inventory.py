@@ -1,5 +1,6 @@
-from fastapi import APIRouter, HTTPException
-from db.db_connection import get_db_connection
+from fastapi import APIRouter, HTTPException, Request
+from api.routes.forecasting import frame_records, get_db_ops, precomputed_run, run_in_pool
+from api.streaming import negotiate_format, stream_frames
 
 router = APIRouter()
 
@@ -7,11 +8,24 @@ router = APIRouter()
 def get_items():
     return {"message": "Inventory items endpoint"}
 
+@router.get("/all")
+async def get_inventory():
+    # Instantánea de inventario compartida con el servicio de predicción, leída en el pool de hilos
+    inventory_data = await run_in_pool(lambda: get_db_ops().fetch_inventory_snapshot())
+    return frame_records(inventory_data)
+
 @router.get("/restocking_matrix")
-def get_restocking_matrix():
-    connection = get_db_connection()
-    query = "SELECT * FROM restocking_matrix"
-    result = connection.execute(query).fetchall()
-    if not result:
+def get_restocking_matrix(request: Request):
+    # Filas precalculadas por run.py (última ejecución completada); sin tablas de resultados no hay datos
+    store, run_id = precomputed_run()
+    if run_id is None:
+        raise HTTPException(status_code=404, detail="No data found")
+    output_format = negotiate_format(request)
+    if output_format != "json":
+        # NDJSON o CSV leídos por bloques con un cursor de servidor
+        return stream_frames(store.iter_restocking_matrix(run_id), output_format)
+
+    result = store.fetch_restocking_matrix(run_id)
+    if result is None or result.empty:
         raise HTTPException(status_code=404, detail="No data found")
-    return {"data": [dict(row) for row in result]}
\ No newline at end of file
+    return {"data": result.astype(object).where(result.notna(), None).to_dict('records')}
\ No newline at end of file
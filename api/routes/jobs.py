@@ -0,0 +1,138 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
+from fastapi import APIRouter, HTTPException
+from models.generate_restocking_matrix import RestockingMatrix
+from api.routes.forecasting import frame_records, get_db_ops
+
+# Trabajos que se ejecutan a la vez; los demás quedan en cola
+JOB_WORKERS = 1
+# Trabajos terminados que se conservan para consultar su resultado
+JOB_HISTORY = 20
+
+router = APIRouter()
+
+
+class JobManager:
+    """
+    Trabajos de larga duración ejecutados en un pool local de hilos.
+    Cada trabajo informa su avance (productos completados y total) y conserva su resultado al terminar.
+    Una solicitud idéntica a un trabajo en cola o en ejecución se asocia a ese mismo trabajo.
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS, history=JOB_HISTORY):
+        """
+        :param max_workers: Número de trabajos ejecutados en paralelo.
+        :param history: Número de trabajos terminados que se conservan.
+        """
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()  # id -> trabajo
+        self._active = {}  # clave -> id del trabajo en cola o en ejecución
+        self._lock = threading.Lock()
+
+    def submit(self, key, function):
+        """
+        Encola un trabajo o retorna el trabajo activo con la misma clave.
+        :param key: Clave que identifica solicitudes idénticas (por ejemplo, ("restocking-matrix", motor)).
+        :param function: Función function(progress) que recibe progress(completados, total) y retorna el resultado.
+        :return: Tupla (id del trabajo, True si se creó uno nuevo).
+        """
+        with self._lock:
+            if key in self._active:
+                return self._active[key], False
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                'id': job_id, 'key': key, 'status': 'queued', 'done': 0, 'total': None,
+                'created_at': time.time(), 'started_at': None, 'finished_at': None, 'result': None, 'error': None
+            }
+            self._active[key] = job_id
+            self._prune()
+        self._executor.submit(self._run, job_id, function)
+        return job_id, True
+
+    def _run(self, job_id, function):
+        job = self._jobs[job_id]
+        with self._lock:
+            job['status'] = 'running'
+            job['started_at'] = time.time()
+
+        def progress(done, total):
+            with self._lock:
+                job['done'], job['total'] = done, total
+
+        try:
+            result = function(progress)
+            status, error = 'completed', None
+        except Exception as e:
+            print(f"Error en el trabajo {job_id}: {e}")
+            result, status, error = None, 'failed', str(e)
+        with self._lock:
+            job.update(status=status, result=result, error=error, finished_at=time.time())
+            self._active.pop(job['key'], None)
+            self._prune()
+
+    def _prune(self):
+        """
+        Descarta los trabajos terminados más antiguos que excedan el historial. Debe invocarse con el candado.
+        """
+        finished = [job_id for job_id, job in self._jobs.items() if job['status'] in ('completed', 'failed')]
+        for job_id in finished[:max(len(finished) - self.history, 0)]:
+            del self._jobs[job_id]
+
+    def status(self, job_id):
+        """
+        Estado de un trabajo con su avance y el tiempo restante estimado (segundos) según el ritmo observado.
+        :return: Diccionario sin el resultado o None si el trabajo no existe.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            eta = None
+            if job['status'] == 'running' and job['total'] and job['done']:
+                elapsed = time.time() - job['started_at']
+                eta = elapsed / job['done'] * (job['total'] - job['done'])
+            elif job['status'] == 'completed':
+                eta = 0.0
+            return {
+                'job_id': job['id'], 'status': job['status'], 'done': job['done'], 'total': job['total'],
+                'eta_seconds': eta, 'error': job['error'],
+                'elapsed_seconds': ((job['finished_at'] or time.time()) - job['started_at']
+                                    if job['started_at'] is not None else None)
+            }
+
+    def result(self, job_id):
+        """
+        Resultado de un trabajo completado (None si no existe o aún no termina).
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job['result'] if job is not None else None
+
+
+# Instancia compartida por todo el proceso
+job_manager = JobManager()
+
+
+@router.post("/restocking-matrix", status_code=202)
+def create_restocking_matrix_job(engine: Literal["statsmodels", "fast"] = "statsmodels"):
+    def generate(progress):
+        return RestockingMatrix(engine=engine, db_ops=get_db_ops()).generate_matrix(progress=progress)
+
+    job_id, created = job_manager.submit(("restocking-matrix", engine), generate)
+    return {**job_manager.status(job_id), 'created': created}
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    status = job_manager.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"No existe el trabajo {job_id}")
+    result = job_manager.result(job_id) if status['status'] == 'completed' else None
+    if result is not None:
+        status['result'] = frame_records(result)
+    return status
@@ -0,0 +1,73 @@
+import json
+import numpy as np
+from starlette.concurrency import iterate_in_threadpool
+from fastapi.responses import StreamingResponse
+
+# Filas por bloque al serializar un DataFrame completo en una respuesta por streaming
+STREAM_CHUNK_ROWS = 5000
+
+MEDIA_TYPES = {
+    'ndjson': "application/x-ndjson",
+    'csv': "text/csv; charset=utf-8"
+}
+
+
+def negotiate_format(request):
+    """
+    Elige el formato de la respuesta según la cabecera Accept: "ndjson", "csv" o "json" (por defecto).
+    """
+    accept = request.headers.get("accept", "").lower()
+    if "ndjson" in accept:
+        return "ndjson"
+    if "text/csv" in accept:
+        return "csv"
+    return "json"
+
+
+def frame_chunks(data, chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    Divide un DataFrame en bloques consecutivos de filas.
+    """
+    for start in range(0, len(data), chunk_rows):
+        yield data.iloc[start:start + chunk_rows]
+
+
+def encode_chunk(chunk, output_format, header):
+    """
+    Serializa un bloque como líneas NDJSON (un objeto por fila) o CSV (con encabezado solo en el primero).
+    """
+    if output_format == "csv":
+        return chunk.to_csv(index=False, header=header)
+    records = chunk.astype(object).where(chunk.notna(), None).to_dict('records')  # NaN -> null
+    return "".join(json.dumps(record, ensure_ascii=False, default=json_default) + "\n" for record in records)
+
+
+def json_default(value):
+    """
+    Convierte a JSON los valores que json no serializa: escalares de NumPy y fechas (ISO 8601).
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def stream_frames(chunks, output_format):
+    """
+    Respuesta por streaming a partir de bloques de DataFrame; cada bloque se envía en cuanto está disponible.
+    :param chunks: Iterable (por ejemplo, un cursor de servidor leído con chunksize) o iterable asíncrono de
+                   DataFrames; los iterables síncronos se recorren fuera del bucle de eventos.
+    :param output_format: "ndjson" o "csv".
+    :return: StreamingResponse con el tipo de contenido del formato.
+    """
+    async def body():
+        header = True
+        iterator = chunks if hasattr(chunks, "__aiter__") else iterate_in_threadpool(iter(chunks))
+        async for chunk in iterator:
+            encoded = encode_chunk(chunk, output_format, header)
+            header = False
+            if encoded:
+                yield encoded
+
+    return StreamingResponse(body(), media_type=MEDIA_TYPES[output_format])
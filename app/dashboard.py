@@ -5,6 +5,7 @@ from models.generate_restocking_matrix import RestockingMatrix
 from models.compare_sales_and_predictions import CompareSalesAndPredictions
 from models.predict_restocking_by_product import PredictRestockingByProduct
 from models.predict_by_date import PredictionByDate
+from db.results_store import ResultsStore
 import requests
 
 class Dashboard:
@@ -12,6 +13,9 @@ class Dashboard:
     Clase para manejar la visualización y la interacción del Dashboard de Inventarios.
     """
 
+    # Antigüedad a partir de la cual los resultados precalculados se marcan como desactualizados
+    MAX_RESULT_AGE = pd.Timedelta(hours=24)
+
     @staticmethod
     def fetch_inventory():
         response = requests.get("http://127.0.0.1:8000/inventory/all")
@@ -29,6 +33,46 @@ class Dashboard:
             st.write("Datos de inventario obtenidos desde la API:")
             st.dataframe(inventory_data)
 
+    @staticmethod
+    def precomputed_run():
+        """
+        Almacén de resultados y última ejecución precalculada por run.py, consultados en cada renderizado
+        para que una ejecución nueva (o las tablas creadas después de iniciar el dashboard) se vea de inmediato.
+        Retorna (None, None) si el origen de datos no tiene tablas de resultados, en cuyo caso cada sección
+        calcula sus resultados en vivo.
+        """
+        try:
+            store = ResultsStore()
+        except Exception as e:
+            print(f"Resultados precalculados no disponibles: {e}")
+            return None, None
+        return store, store.latest_run()
+
+    @staticmethod
+    def format_age(age):
+        """
+        Describe una antigüedad (Timedelta) en minutos, horas o días.
+        """
+        minutes = max(int(age.total_seconds() // 60), 0)
+        if minutes < 60:
+            return f"{minutes} min"
+        if minutes < 24 * 60:
+            return f"{minutes // 60} h"
+        return f"{minutes // (24 * 60)} días"
+
+    @staticmethod
+    def show_run_age(run):
+        """
+        Muestra la ejecución precalculada que se está usando y avisa si supera MAX_RESULT_AGE.
+        """
+        age = pd.Timestamp.now() - run['Fecha_Ejecucion']
+        message = (f"Resultados precalculados de la ejecución {run['Run_ID']} (motor {run['Motor']}, "
+                   f"{run['Fecha_Ejecucion']:%Y-%m-%d %H:%M}, hace {Dashboard.format_age(age)}).")
+        if age > Dashboard.MAX_RESULT_AGE:
+            st.warning(f"{message} Ejecute run.py para actualizarlos.")
+        else:
+            st.caption(message)
+
     @staticmethod
     def apply_colors(row):
         """
@@ -94,11 +138,20 @@ class Dashboard:
 
         st.title("Predicción de Inventario con Modelo ARIMA")
 
+        # Todas las secciones leen la misma ejecución precalculada por run.py
+        store, run = Dashboard.precomputed_run()
+        run_id = run['Run_ID'] if run is not None else None
+        if run is not None:
+            Dashboard.show_run_age(run)
+
         # Sección: Matriz de Reposición
         st.header("Matriz de Reposición de inventario")
         try:
-            restocking = RestockingMatrix()
-            restocking_df = restocking.generate_matrix()
+            # Se usan los resultados precalculados por run.py; si no existen, se calcula la matriz en vivo
+            restocking_df = store.fetch_restocking_matrix(run_id) if run_id is not None else None
+            if restocking_df is None:
+                restocking = RestockingMatrix()
+                restocking_df = restocking.generate_matrix()
 
             styled_df = restocking_df.style.apply(Dashboard.apply_colors, axis=1)
             st.dataframe(styled_df, use_container_width=True)
@@ -143,8 +196,10 @@ class Dashboard:
         # Sección: Predicción de Reposición por Producto
         st.header("Predicción de Reposición por Producto")
         try:
-            restocking_by_product = PredictRestockingByProduct()
-            product_restocking_df = restocking_by_product.predict_restocking_by_product()
+            product_restocking_df = store.fetch_restocking_by_product(run_id) if run_id is not None else None
+            if product_restocking_df is None:
+                restocking_by_product = PredictRestockingByProduct()
+                product_restocking_df = restocking_by_product.predict_restocking_by_product()
 
             if product_restocking_df.empty:
                 st.warning("No hay datos suficientes para generar predicciones.")
@@ -189,7 +244,9 @@ class Dashboard:
             selected_product_option = st.selectbox("Selecciona un producto para predecir:", product_options_list)
             selected_product_id = product_id_mapping[selected_product_option]
 
-            forecast_df = future_prediction.predict_future(selected_product_id)
+            forecast_df = store.fetch_forecast(selected_product_id, run_id) if run_id is not None else None
+            if forecast_df is None:
+                forecast_df = future_prediction.predict_future(selected_product_id)
 
             if forecast_df.empty:
                 st.warning("No hay datos suficientes para generar predicciones.")
@@ -0,0 +1,188 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import itertools
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic_data import generate_inventory, generate_sales
+from benchmarks.sqlite_operations import SQLiteDatabaseOperations
+from db.file_operations import FileDatabaseOperations
+from db.db_operations import query_cache, snapshot_store
+from models.model_cache import backtest_model_cache, model_cache
+from models.fast_ar_engine import compare_engines
+from models.forecast_service import ForecastService
+from models.generate_restocking_matrix import RestockingMatrix
+from models.predict_restocking_by_product import PredictRestockingByProduct
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def reset_caches(cache_dir):
+    """
+    Deja las cachés en frío: invalida las instantáneas, vacía la caché de consultas y la de modelos del escenario.
+    """
+    snapshot_store.invalidate()
+    query_cache.clear()
+    model_cache.cache_dir = cache_dir
+    model_cache.clear()
+    backtest_model_cache.cache_dir = os.path.join(cache_dir, "backtest")
+    backtest_model_cache.clear()
+
+
+def make_backend(backend, inventory_data, sales_data, data_dir):
+    """
+    Carga los datos sintéticos en el origen de datos indicado.
+    :param backend: "sqlite" (base en memoria) o "files" (archivos Parquet en data_dir).
+    :return: Instancia de DatabaseOperations sobre los datos sintéticos, con las ventas leídas como totales
+             diarios igual que en la aplicación (get_database_operations).
+    """
+    if backend == "files":
+        inventory_path = os.path.join(data_dir, "inventory.parquet")
+        sales_path = os.path.join(data_dir, "sales.parquet")
+        inventory_data.to_parquet(inventory_path, index=False)
+        sales_data.to_parquet(sales_path, index=False)
+        return FileDatabaseOperations(inventory_path, sales_path, sales_mode="daily")
+    return SQLiteDatabaseOperations(inventory_data, sales_data, sales_mode="daily")
+
+
+def run_scenario(n_products, history_days, sparsity, engine="statsmodels", max_workers=1, seed=0, track_memory=True,
+                 backend="sqlite", check_engines=False):
+    """
+    Ejecuta un escenario del pipeline de predicción sobre un catálogo sintético en SQLite o en archivos.
+    Mide el tiempo de cada etapa (lectura, preprocesamiento, clasificación, ajuste, predicción y política),
+    el tiempo total y el pico de memoria, y por separado el tiempo en frío de predict_restocking_by_product.
+    Con check_engines, además compara la precisión del motor vectorizado con ARIMA de statsmodels (compare_engines).
+    :return: Diccionario con los parámetros y las mediciones del escenario.
+    """
+    inventory_data = generate_inventory(n_products, seed=seed)
+    sales_data = generate_sales(n_products, history_days, sparsity=sparsity, seed=seed)
+    stages = {}
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        db_ops = make_backend(backend, inventory_data, sales_data, work_dir)
+        reset_caches(os.path.join(work_dir, "model_cache"))
+        if track_memory:
+            tracemalloc.start()
+        total_start = time.perf_counter()
+
+        start = time.perf_counter()
+        inventory_snapshot = db_ops.fetch_inventory_snapshot()
+        db_ops.fetch_sales_snapshot()
+        stages['fetch'] = time.perf_counter() - start
+
+        service = ForecastService(engine=engine, max_workers=max_workers, db_ops=db_ops)
+        start = time.perf_counter()
+        service.build_demand_matrix()
+        stages['preprocess'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        service.get_forecasts(inventory_snapshot['ID_Producto'].unique())
+        fit_wall = time.perf_counter() - start
+        stages.update(service.last_stage_seconds or {'classify': 0.0, 'fit': 0.0, 'forecast': 0.0})
+
+        # Con las predicciones ya calculadas, generate_matrix solo aplica la política de reposición
+        start = time.perf_counter()
+        restocking_df = RestockingMatrix(engine=engine, max_workers=max_workers, db_ops=db_ops).generate_matrix()
+        stages['policy'] = time.perf_counter() - start
+
+        wall_seconds = time.perf_counter() - total_start
+        peak_bytes = None
+        if track_memory:
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        engine_agreement = compare_engines(service.build_demand_matrix())[1] if check_engines else None
+
+        reset_caches(os.path.join(work_dir, "model_cache"))
+        start = time.perf_counter()
+        PredictRestockingByProduct(engine=engine, db_ops=db_ops).predict_restocking_by_product()
+        restocking_by_product_seconds = time.perf_counter() - start
+
+    return {
+        'products': n_products,
+        'history_days': history_days,
+        'sparsity': sparsity,
+        'engine': engine,
+        'backend': backend,
+        'max_workers': max_workers,
+        'seed': seed,
+        'sales_rows': len(sales_data),
+        'wall_seconds': wall_seconds,
+        'fit_wall_seconds': fit_wall,
+        'stages': stages,
+        'predict_restocking_by_product_seconds': restocking_by_product_seconds,
+        'peak_memory_bytes': peak_bytes,
+        'snapshot_bytes': {name: report['total_bytes'] for name, report in db_ops.memory_report().items()},
+        'routing': service.last_routing_report,
+        'matrix_rows': len(restocking_df),
+        'engine_agreement': engine_agreement
+    }
+
+
+def environment_metadata():
+    """
+    Metadatos para comparar ejecuciones entre versiones.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'cpu_count': os.cpu_count()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de predicción sobre catálogos sintéticos.")
+    parser.add_argument("--products", type=int, nargs="+", default=[50, 200], help="Tamaños de catálogo.")
+    parser.add_argument("--history-days", type=int, nargs="+", default=[365], help="Días de historial.")
+    parser.add_argument("--sparsity", type=float, nargs="+", default=[0.2, 0.8], help="Probabilidad de día sin ventas.")
+    parser.add_argument("--engine", nargs="+", default=["statsmodels"], choices=["statsmodels", "fast"])
+    parser.add_argument("--backend", nargs="+", default=["sqlite"], choices=["sqlite", "files"], help="Origen de datos sintético.")
+    parser.add_argument("--max-workers", type=int, default=1, help="Procesos para el ajuste ARIMA.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="No medir el pico de memoria (evita la sobrecarga de tracemalloc).")
+    parser.add_argument("--check-engines", action="store_true",
+                        help="Comparar el RMSE del motor vectorizado con ARIMA de statsmodels en cada escenario.")
+    parser.add_argument("--output", default=None, help="Ruta del archivo JSON de resultados.")
+    args = parser.parse_args(argv)
+
+    results = []
+    for n_products, history_days, sparsity, engine, backend in itertools.product(
+            args.products, args.history_days, args.sparsity, args.engine, args.backend):
+        result = run_scenario(n_products, history_days, sparsity, engine=engine, max_workers=args.max_workers,
+                              seed=args.seed, track_memory=not args.no_memory, backend=backend,
+                              check_engines=args.check_engines)
+        results.append(result)
+        print(f"productos={n_products} días={history_days} dispersión={sparsity} motor={engine} origen={backend}: "
+              f"{result['wall_seconds']:.2f}s, pico={result['peak_memory_bytes']} bytes")
+        if result['engine_agreement'] is not None:
+            agreement = result['engine_agreement']
+            print(f"  RMSE medio statsmodels={agreement['rmse_statsmodels_mean']:.3f} "
+                  f"fast={agreement['rmse_fast_mean']:.3f} "
+                  f"(fast igual o mejor en {agreement['fast_better_or_equal']}/{agreement['products']})")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w') as output_file:
+        json.dump({'metadata': environment_metadata(), 'results': results}, output_file, indent=2, default=float)
+    print(f"Resultados guardados en {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from db.db_operations import DatabaseOperations
+
+
+class SQLiteDatabaseOperations(DatabaseOperations):
+    """
+    Sustituto de DatabaseOperations respaldado por una base SQLite en memoria.
+    Ejecuta las mismas consultas que la versión de SQL Server sobre datos sintéticos; la expresión que
+    trunca la fecha al día se elige según el dialecto del motor.
+    """
+
+    def __init__(self, inventory_data, sales_data, sales_mode=None):
+        """
+        Crea la base en memoria y carga las tablas ds_Product_Items y DATATEL_Ventas_Inventario_Analytical_Dataset.
+        :param inventory_data: DataFrame de inventario.
+        :param sales_data: DataFrame de transacciones de venta.
+        :param sales_mode: Modo de lectura de ventas (ver DatabaseOperations).
+        """
+        super().__init__(sales_mode=sales_mode,
+                         engine=create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}))
+        inventory_data.to_sql("ds_Product_Items", self.engine, index=False)
+        sales_data.to_sql("DATATEL_Ventas_Inventario_Analytical_Dataset", self.engine, index=False, chunksize=50000)
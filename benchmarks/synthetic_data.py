@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+CATEGORIES = ["Routers", "Switches", "Cableado", "Antenas", "Accesorios"]
+
+
+def generate_inventory(n_products, seed=0):
+    """
+    Genera un catálogo sintético con la misma estructura que ds_Product_Items.
+    :param n_products: Número de productos del catálogo.
+    :param seed: Semilla del generador aleatorio.
+    :return: DataFrame de inventario.
+    """
+    rng = np.random.default_rng(seed)
+    product_ids = np.arange(1, n_products + 1)
+    return pd.DataFrame({
+        'ID_Producto': product_ids,
+        'Nombre_Producto': [f"Producto {product_id}" for product_id in product_ids],
+        'Stock_Actual': rng.integers(0, 60, n_products),
+        'Categoria': rng.choice(CATEGORIES, n_products),
+        'Precio_Unitario': np.round(rng.uniform(5, 500, n_products), 2)
+    })
+
+
+def generate_sales(n_products, history_days, sparsity=0.5, seed=0, end_date="2024-12-31"):
+    """
+    Genera transacciones sintéticas con la misma estructura que DATATEL_Ventas_Inventario_Analytical_Dataset.
+    Cada producto tiene una tasa base, estacionalidad semanal y una fecha de alta aleatoria; `sparsity`
+    controla la probabilidad de que un día no tenga ventas.
+    :param n_products: Número de productos con historial.
+    :param history_days: Número de días de historial.
+    :param sparsity: Probabilidad de que un día del producto no tenga ventas (0 = ventas diarias).
+    :param seed: Semilla del generador aleatorio.
+    :param end_date: Último día del historial.
+    :return: DataFrame de transacciones de venta.
+    """
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(end_date) - pd.Timedelta(days=history_days - 1)
+
+    # Tasa base, estacionalidad semanal y día de alta de cada producto
+    base_rate = rng.lognormal(mean=0.5, sigma=0.6, size=n_products)
+    weekly = 1 + 0.3 * np.sin(2 * np.pi * (np.arange(history_days) % 7) / 7)
+    launch_day = rng.integers(0, max(history_days // 4, 1), n_products)
+
+    days = np.arange(history_days)
+    active = (rng.random((n_products, history_days)) >= sparsity) & (days[None, :] >= launch_day[:, None])
+    product_rows, day_cols = np.nonzero(active)
+
+    # Entre una y tres transacciones por día con ventas
+    transactions = 1 + rng.poisson(0.5, len(product_rows)).clip(max=2)
+    product_rows = np.repeat(product_rows, transactions)
+    day_cols = np.repeat(day_cols, transactions)
+    quantities = 1 + rng.poisson(base_rate[product_rows] * weekly[day_cols])
+
+    sale_dates = start + pd.to_timedelta(day_cols, unit='D') + pd.to_timedelta(rng.integers(8, 20, len(day_cols)), unit='h')
+    return pd.DataFrame({
+        'Fecha_Venta': sale_dates,
+        'ID_Cliente': rng.integers(1, 500, len(day_cols)),
+        'ID_Producto': product_rows + 1,
+        'Cantidad_Vendida': quantities.astype(np.int64),
+        'aud_Fecha_Modificacion': sale_dates
+    })
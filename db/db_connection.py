@@ -1,55 +1,146 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base   
 import json
+import threading
 import urllib.parse
 import os
 
 Base = declarative_base()
 
-def get_db_connection():
+CONFIG_PATH = os.path.join("data", "database_config.json")
+
+# Origen de datos configurable con la clave "backend" y las claves obligatorias de cada uno
+BACKEND_REQUIRED_KEYS = {
+    'sqlserver': ['server', 'database', 'driver'],
+    'sqlite': ['sqlite_path'],
+    'files': ['inventory_path', 'sales_path']
+}
+
+# Valores por defecto del pool de conexiones; pueden sobrescribirse en el archivo de configuración
+POOL_DEFAULTS = {
+    'pool_size': 5,
+    'max_overflow': 10,
+    'pool_recycle': 1800,
+    'pool_pre_ping': True,
+    'pool_timeout': 30
+}
+
+_registry_lock = threading.Lock()
+_settings_cache = {'key': None, 'settings': None}
+_registry = {'pid': None, 'engine': None, 'sessionmaker': None}
+
+
+def load_database_settings(config_path=CONFIG_PATH):
     """
-    Establece y retorna un motor de conexión a la base de datos SQL Server usando SQLAlchemy con autenticación de Windows.
-    La configuración se obtiene desde un archivo JSON.
+    Carga la configuración de la base de datos, releyendo el archivo JSON solo si cambió.
+    :param config_path: Ruta del archivo de configuración.
+    :return: Diccionario con la configuración y los parámetros del pool.
     """
-    try:
-        # Verificar si el archivo de configuración existe
-        config_path = os.path.join("data", "database_config.json")
-        if not os.path.exists(config_path):
-            raise FileNotFoundError(f"El archivo de configuración '{config_path}' no se encuentra.")
+    # Verificar si el archivo de configuración existe
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(f"El archivo de configuración '{config_path}' no se encuentra.")
 
+    cache_key = (config_path, os.path.getmtime(config_path))
+    if _settings_cache['key'] != cache_key:
         # Cargar configuración desde el archivo JSON
         with open(config_path, 'r') as config_file:
             config = json.load(config_file)
 
-        # Validar claves necesarias
-        required_keys = ['server', 'database', 'driver']
+        # Validar el origen de datos y sus claves necesarias
+        backend = config.get('backend', 'sqlserver')
+        if backend not in BACKEND_REQUIRED_KEYS:
+            raise KeyError(f"Origen de datos desconocido '{backend}'; use uno de {list(BACKEND_REQUIRED_KEYS)}.")
+        required_keys = BACKEND_REQUIRED_KEYS[backend]
         for key in required_keys:
             if key not in config:
                 raise KeyError(f"Falta la clave requerida '{key}' en el archivo de configuración.")
 
-        # Crear una cadena de conexión para autenticación de Windows
-        connection_string = (
-            f"mssql+pyodbc://@"
-            f"{config['server']}/{config['database']}?driver={urllib.parse.quote(config['driver'])}&Trusted_Connection=yes"
-        )
+        _settings_cache['settings'] = {**POOL_DEFAULTS, **config, 'backend': backend}
+        _settings_cache['key'] = cache_key
+    return _settings_cache['settings']
+
+
+def _create_engine(settings):
+    """
+    Crea el motor SQLAlchemy del origen configurado: SQL Server con autenticación de Windows
+    o un archivo SQLite (con "files", el de results_sqlite_path), todos con el pool configurado.
+    """
+    pool_options = {key: settings[key] for key in POOL_DEFAULTS}
+    if settings['backend'] == 'files':
+        # Los datos se leen de archivos; los resultados precalculados pueden guardarse en un archivo SQLite aparte
+        if not settings.get('results_sqlite_path'):
+            raise ValueError("El origen de datos 'files' lee archivos CSV/Parquet y no usa un motor SQL; "
+                             "configure 'results_sqlite_path' para guardar los resultados precalculados.")
+        return create_engine(f"sqlite:///{settings['results_sqlite_path']}", connect_args={"check_same_thread": False},
+                             **pool_options)
+    if settings['backend'] == 'sqlite':
+        return create_engine(f"sqlite:///{settings['sqlite_path']}", connect_args={"check_same_thread": False},
+                             **pool_options)
+
+    # Crear una cadena de conexión para autenticación de Windows
+    connection_string = (
+        f"mssql+pyodbc://@"
+        f"{settings['server']}/{settings['database']}?driver={urllib.parse.quote(settings['driver'])}&Trusted_Connection=yes"
+    )
+    return create_engine(connection_string, fast_executemany=True, **pool_options)
+
 
-        # Crear motor SQLAlchemy
-        engine = create_engine(connection_string, fast_executemany=True)
-        print("Conexión exitosa a la base de datos.")
-        return engine
+def get_db_connection():
+    """
+    Retorna el motor de conexión a la base de datos (SQL Server o SQLite) compartido por todo el proceso.
+    El motor (y su pool de conexiones) se crea la primera vez que se solicita; un proceso hijo creado
+    con fork obtiene su propio motor para no compartir conexiones con el proceso padre.
+    """
+    try:
+        with _registry_lock:
+            if _registry['engine'] is None or _registry['pid'] != os.getpid():
+                if _registry['engine'] is not None:
+                    # Conexiones heredadas del proceso padre: se descartan sin cerrarlas
+                    _registry['engine'].dispose(close=False)
+                _registry['engine'] = _create_engine(load_database_settings())
+                _registry['sessionmaker'] = sessionmaker(autocommit=False, autoflush=False, bind=_registry['engine'])
+                _registry['pid'] = os.getpid()
+                print("Conexión exitosa a la base de datos.")
+            return _registry['engine']
     except Exception as e:
         print(f"Error al conectar a la base de datos: {e}")
         raise
 
 
+def dispose_db_connection():
+    """
+    Cierra las conexiones del pool y descarta el motor compartido; el siguiente uso crea uno nuevo
+    (por ejemplo, tras cambiar la configuración).
+    """
+    with _registry_lock:
+        if _registry['engine'] is not None:
+            _registry['engine'].dispose()
+        _registry.update({'pid': None, 'engine': None, 'sessionmaker': None})
+
+
+def get_pool_stats():
+    """
+    Retorna el estado del pool de conexiones del motor compartido.
+    :return: Diccionario con el tamaño, conexiones disponibles, en uso y de desborde (vacío si aún no hay motor).
+    """
+    engine = _registry['engine']
+    if engine is None:
+        return {}
+    pool = engine.pool
+    stats = {'status': pool.status()}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        if hasattr(pool, name):
+            stats[name] = getattr(pool, name)()
+    return stats
+
+
 # Dependencia para usar en FastAPI
 def get_db_session():
     """
-    Retorna una sesión de base de datos usando SQLAlchemy.
+    Retorna una sesión de base de datos desde el sessionmaker compartido.
     """
-    engine = get_db_connection()
-    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    return Session()
+    get_db_connection()
+    return _registry['sessionmaker']()
 
 
 # Prueba la conexión
@@ -60,5 +151,6 @@ if __name__ == "__main__":
         print("Conexión establecida con éxito.")
         connection.close()
         print("Conexión cerrada correctamente.")
+        print(f"Estado del pool: {get_pool_stats()}")
     except Exception as ex:
         print(f"Error general: {ex}")
@@ -2,52 +2,698 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
-from db.db_connection import get_db_connection
+from sqlalchemy import bindparam, text
+from db.db_connection import get_db_connection, load_database_settings
+from db.sales_sync import SalesSync
+
+
+class DataSnapshotStore:
+    """
+    Almacén compartido en memoria para las instantáneas de ventas e inventario.
+    Cada conjunto de datos se carga una sola vez y se reutiliza hasta que expira su TTL
+    o se invalida explícitamente, evitando consultar la tabla completa en cada llamada.
+    """
+
+    def __init__(self, ttl_seconds=300):
+        """
+        Inicializa el almacén de instantáneas.
+        :param ttl_seconds: Segundos de vida de cada instantánea antes de recargarla.
+        """
+        self.ttl_seconds = ttl_seconds
+        self._snapshots = {}  # clave -> {'data', 'loaded_at', 'version', 'derived', 'derived_locks'}
+        self._key_locks = {}  # clave -> candado que serializa la carga de esa clave
+        # Candado global breve: solo protege los diccionarios, nunca se mantiene durante una carga o un builder
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _is_fresh(self, entry):
+        """
+        Indica si una instantánea sigue dentro de su tiempo de vida.
+        """
+        return (time.monotonic() - entry['loaded_at']) < self.ttl_seconds
+
+    def get(self, key, loader):
+        """
+        Devuelve la instantánea asociada a la clave, cargándola con `loader` si no existe o expiró.
+        Se entrega una copia para que los consumidores puedan modificarla sin alterar la instantánea.
+        :param key: Nombre del conjunto de datos (por ejemplo, "sales" o "inventory").
+        :param loader: Función sin argumentos que retorna el DataFrame desde la base de datos.
+        :return: Copia del DataFrame almacenado.
+        """
+        return self._load_entry(key, loader)['data'].copy()
+
+    def get_derived(self, key, loader, name, builder):
+        """
+        Devuelve un objeto derivado de la instantánea (por ejemplo, la matriz de demanda).
+        El objeto se construye una sola vez por versión de la instantánea y se comparte sin copiar,
+        por lo que los consumidores deben tratarlo como de solo lectura.
+        Cada objeto derivado tiene su propio candado: construir uno no bloquea a los demás ni a otras claves.
+        :param key: Nombre del conjunto de datos base.
+        :param loader: Función sin argumentos que retorna el DataFrame desde la base de datos.
+        :param name: Nombre del objeto derivado.
+        :param builder: Función que recibe el DataFrame de la instantánea (sin modificarlo) y construye el objeto derivado.
+        :return: Objeto derivado asociado a la versión vigente de la instantánea.
+        """
+        entry = self._load_entry(key, loader)
+        with self._lock:
+            if name in entry['derived']:
+                return entry['derived'][name]
+            derived_lock = entry['derived_locks'].setdefault(name, threading.Lock())
+
+        with derived_lock:
+            with self._lock:
+                if name in entry['derived']:
+                    return entry['derived'][name]  # Otro hilo lo construyó mientras se esperaba
+            derived = builder(entry['data'])
+            with self._lock:
+                return entry['derived'].setdefault(name, derived)
+
+    def _fresh_entry(self, key):
+        """
+        Retorna la entrada de la clave si sigue vigente (contándola como acierto) o None.
+        Debe invocarse con el candado global adquirido.
+        """
+        entry = self._snapshots.get(key)
+        if entry is not None and self._is_fresh(entry):
+            self.hits += 1
+            return entry
+        return None
+
+    def _load_entry(self, key, loader):
+        """
+        Retorna la entrada vigente de la clave, recargándola si no existe o expiró.
+        La carga se serializa con el candado de la clave, de modo que las solicitudes concurrentes de la misma
+        clave esperan una sola lectura y las de otras claves no se bloquean.
+        """
+        with self._lock:
+            entry = self._fresh_entry(key)
+            if entry is not None:
+                return entry
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                entry = self._fresh_entry(key)  # Otro hilo pudo recargarla mientras se esperaba
+                if entry is not None:
+                    return entry
+                entry = self._snapshots.get(key)
+                self.misses += 1
+
+            data = loader()
+            with self._lock:
+                if entry is not None and self._same_result(entry['data'], data):
+                    # La caché de consultas confirmó que la tabla no cambió: se conservan la versión y los derivados
+                    entry['data'] = data
+                    entry['loaded_at'] = time.monotonic()
+                    return entry
+
+                previous_version = entry['version'] if entry is not None else 0
+                entry = {
+                    'data': data,
+                    'loaded_at': time.monotonic(),
+                    'version': previous_version + 1,
+                    'derived': {},
+                    'derived_locks': {}
+                }
+                self._snapshots[key] = entry
+                return entry
+
+    @staticmethod
+    def _same_result(previous, current):
+        """
+        Indica si dos cargas provienen del mismo resultado de la caché de consultas (ver QueryResultCache).
+        """
+        version = previous.attrs.get('result_version')
+        return version is not None and version == current.attrs.get('result_version')
+
+    def is_fresh(self, key):
+        """
+        Indica si la instantánea de la clave está cargada y dentro de su tiempo de vida (sin cargarla).
+        :param key: Nombre del conjunto de datos.
+        """
+        with self._lock:
+            entry = self._snapshots.get(key)
+            return entry is not None and self._is_fresh(entry)
+
+    def version(self, key):
+        """
+        Retorna el número de versión de la instantánea (se incrementa en cada recarga).
+        :param key: Nombre del conjunto de datos.
+        :return: Entero con la versión, o 0 si nunca se cargó.
+        """
+        with self._lock:
+            entry = self._snapshots.get(key)
+            return entry['version'] if entry is not None else 0
+
+    def invalidate(self, key=None):
+        """
+        Invalida una instantánea concreta o todas si no se indica clave.
+        La versión se conserva para que la siguiente carga la incremente.
+        :param key: Nombre del conjunto de datos a invalidar.
+        """
+        with self._lock:
+            keys = [key] if key is not None else list(self._snapshots)
+            for snapshot_key in keys:
+                entry = self._snapshots.get(snapshot_key)
+                if entry is not None:
+                    entry['loaded_at'] = float('-inf')
+
+    def stats(self):
+        """
+        Reporta los aciertos, fallos y el estado de cada instantánea.
+        :return: Diccionario con contadores y antigüedad/versión por clave.
+        """
+        with self._lock:
+            now = time.monotonic()
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'ttl_seconds': self.ttl_seconds,
+                'snapshots': {
+                    key: {
+                        'version': entry['version'],
+                        'age_seconds': now - entry['loaded_at'],
+                        'fresh': self._is_fresh(entry),
+                        'rows': len(entry['data'])
+                    }
+                    for key, entry in self._snapshots.items()
+                }
+            }
+
+
+# Instancia compartida por todo el proceso
+snapshot_store = DataSnapshotStore()
+
+
+class QueryResultCache:
+    """
+    Caché en memoria de resultados de consultas, validada con una sonda barata sobre la tabla de origen.
+    Cada resultado se guarda junto con la versión de la tabla (filas y última aud_Fecha_Modificacion);
+    mientras la sonda retorne la misma versión se reutiliza el resultado sin volver a leer la tabla.
+    Las entradas menos usadas se descartan cuando se supera el presupuesto de memoria.
+    Las tablas cuya sonda falla (por ejemplo, sin la columna aud_Fecha_Modificacion) se recuerdan para no
+    repetir la sonda en cada lectura; sus consultas se ejecutan siempre sin caché.
+    """
+
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        """
+        Inicializa la caché de resultados.
+        :param max_bytes: Presupuesto de memoria en bytes; los resultados más grandes no se guardan.
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # clave -> {'token', 'data', 'bytes'}
+        self._unversioned = set()  # (motor, tabla) cuya sonda de versión falló
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_fetch(self, key, token, fetcher):
+        """
+        Retorna el resultado guardado si la versión de la tabla coincide; si no, lo lee con `fetcher` y lo guarda.
+        Se entrega una copia superficial con la versión en attrs['result_version'], por lo que los consumidores
+        pueden reemplazar columnas, pero no deben modificar los valores en el lugar.
+        :param key: Clave hashable de la consulta (texto, parámetros y tipos).
+        :param token: Versión de la tabla retornada por la sonda.
+        :param fetcher: Función sin argumentos que ejecuta la consulta y retorna un DataFrame.
+        :return: DataFrame con el resultado.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['token'] == token:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._share(entry['data'], key, token)
+            self.misses += 1
+
+        data = fetcher()
+        size = int(data.memory_usage(deep=True, index=True).sum())
+        with self._lock:
+            self._discard(key)
+            if size <= self.max_bytes:
+                self._entries[key] = {'token': token, 'data': data, 'bytes': size}
+                self.total_bytes += size
+                while self.total_bytes > self.max_bytes:
+                    self._discard(next(iter(self._entries)))
+                    self.evictions += 1
+        return self._share(data, key, token)
+
+    def is_unversioned(self, source):
+        """
+        Indica si la sonda de la tabla ya falló antes.
+        :param source: Tupla que identifica el motor y la tabla.
+        """
+        with self._lock:
+            return source in self._unversioned
+
+    def mark_unversioned(self, source):
+        """
+        Recuerda que la sonda de la tabla falló.
+        :return: True si es la primera vez (para informarlo una sola vez).
+        """
+        with self._lock:
+            if source in self._unversioned:
+                return False
+            self._unversioned.add(source)
+            return True
+
+    @staticmethod
+    def _share(data, key, token):
+        shared = data.copy(deep=False)
+        shared.attrs['result_version'] = (key, token)
+        return shared
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry['bytes']
+
+    def clear(self):
+        """
+        Elimina todos los resultados guardados y olvida las sondas fallidas (se vuelven a intentar).
+        """
+        with self._lock:
+            self._entries.clear()
+            self._unversioned.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        """
+        Reporta los aciertos, fallos, descartes y la memoria ocupada.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'total_bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'unversioned_tables': sorted(source[-1] for source in self._unversioned)
+            }
+
+
+# Instancia compartida por todo el proceso
+query_cache = QueryResultCache()
+
+# Sonda de versión de una tabla: el conteo detecta eliminaciones y la fecha de auditoría, altas y modificaciones
+TABLE_VERSION_PROBE = "SELECT COUNT(*) AS Filas, MAX(aud_Fecha_Modificacion) AS Modificacion FROM {table}"
+
+# Tipos de cada columna por conjunto de datos: enteros de 32 bits para IDs y cantidades, categorías para los
+# textos repetidos y fechas convertidas al leer. El orden de las columnas es el de la consulta completa.
+FETCH_SPECS = {
+    'inventory': {
+        'ID_Producto': 'int32',
+        'Nombre_Producto': 'category',
+        'Stock_Actual': 'int32',
+        'Categoria': 'category',
+        'Precio_Unitario': 'float64'
+    },
+    'sales': {
+        'Fecha_Venta': 'datetime64[ns]',
+        'ID_Producto': 'int32',
+        'Cantidad_Vendida': 'int32'
+    }
+}
+
+
+# Expresión que trunca la fecha de venta al día en cada dialecto SQL
+SALES_DAY_EXPRESSIONS = {
+    'mssql': "CAST(Fecha_Venta AS date)",
+    'sqlite': "date(Fecha_Venta)"
+}
+
+
+def date_columns(spec):
+    """
+    Columnas de fecha de una especificación, para interpretarlas durante la lectura (parse_dates).
+    """
+    return [column for column, dtype in spec.items() if dtype.startswith('datetime')]
+
+
+def apply_fetch_spec(data, spec):
+    """
+    Convierte las columnas de un DataFrame a los tipos de su especificación.
+    Las columnas de fecha ya interpretadas durante la lectura no se vuelven a convertir; las enteras con nulos,
+    decimales o valores fuera de rango conservan su tipo original.
+    :param data: DataFrame leído de la base de datos (se modifica en el lugar).
+    :param spec: Diccionario {columna: tipo}.
+    :return: El mismo DataFrame con los tipos aplicados.
+    """
+    for column, dtype in spec.items():
+        if column not in data.columns:
+            continue
+        values = data[column]
+        if dtype.startswith('datetime'):
+            if not pd.api.types.is_datetime64_any_dtype(values):
+                data[column] = pd.to_datetime(values)
+        elif dtype.startswith('int'):
+            limits = np.iinfo(dtype)
+            numeric = pd.to_numeric(values, errors='coerce')
+            if (numeric.notna().all() and (numeric % 1 == 0).all()
+                    and (len(numeric) == 0 or (numeric.min() >= limits.min and numeric.max() <= limits.max))):
+                data[column] = numeric.astype(dtype)
+        else:
+            data[column] = values.astype(dtype)
+    return data
+
+
+def memory_report(data):
+    """
+    Reporta la memoria ocupada por un DataFrame, incluyendo el contenido de las columnas de texto.
+    :return: Diccionario con filas, bytes totales y bytes y tipo por columna.
+    """
+    usage = data.memory_usage(deep=True, index=True)
+    return {
+        'rows': len(data),
+        'total_bytes': int(usage.sum()),
+        'columns': {
+            column: {'dtype': str(data[column].dtype), 'bytes': int(usage[column])} for column in data.columns
+        }
+    }
+
 
 class DatabaseOperations:
-    def __init__(self):
+    # Modo de lectura de ventas: "raw" (transacciones), "daily" (totales diarios agregados en el servidor),
+    # "synced" (almacén local en Parquet actualizado de forma incremental, ver db/sales_sync.py)
+    # o "streaming" (transacciones leídas por bloques y agregadas por día en el cliente).
+    # get_database_operations() usa "daily" salvo que la configuración indique otro modo
+    sales_mode = "raw"
+    # Filas por bloque en la lectura por streaming
+    stream_chunksize = 200000
+    # Caché de resultados validada por versión de tabla (None la desactiva)
+    result_cache = query_cache
+    # Vista indexada con los totales diarios (db/migrations/003_daily_sales_view.sql); None agrega sobre la tabla
+    daily_sales_view = None
+
+    def __init__(self, sales_mode=None, engine=None, daily_sales_view=None):
         """
         Inicializa el motor de conexión a la base de datos.
+        :param sales_mode: "raw", "daily", "synced" o "streaming" (por defecto, "raw").
+        :param engine: Motor SQLAlchemy a utilizar (por defecto, el motor compartido de get_db_connection()).
+        :param daily_sales_view: Vista indexada de totales diarios a consultar en lugar de agregar la tabla
+                                 (por ejemplo, "dbo.vw_Ventas_Diarias").
         """
         try:
-            self.engine = get_db_connection()  # Motor SQLAlchemy
+            self.engine = engine if engine is not None else get_db_connection()  # Motor SQLAlchemy
         except Exception as e:
             raise Exception(f"Error al configurar el motor de conexión: {e}")
+        if sales_mode is not None:
+            self.sales_mode = sales_mode
+        if daily_sales_view is not None:
+            self.daily_sales_view = daily_sales_view
+
+    @property
+    def sales_day_expression(self):
+        """
+        Expresión SQL que trunca Fecha_Venta al día según el dialecto del motor.
+        """
+        return SALES_DAY_EXPRESSIONS.get(self.engine.dialect.name, SALES_DAY_EXPRESSIONS['mssql'])
 
-    def execute_query(self, query):
+    def execute_query(self, query, params=None, expanding=(), spec=None, table=None):
         """
         Ejecuta una consulta SQL y devuelve los resultados como un DataFrame.
         :param query: Consulta SQL a ejecutar.
+        :param params: Diccionario con los parámetros (:nombre) de la consulta.
+        :param expanding: Nombres de los parámetros que reciben una lista (para cláusulas IN).
+        :param spec: Diccionario {columna: tipo} aplicado al resultado (ver FETCH_SPECS).
+        :param table: Tabla de la que depende el resultado; si se indica, el resultado se reutiliza desde
+                      la caché de consultas mientras la versión de la tabla no cambie.
         :return: DataFrame con los resultados de la consulta.
         """
+        if table is not None and self.result_cache is not None:
+            token = self.table_version(table)
+            if token is not None:
+                key = (str(self.engine.url), id(self.engine), query,
+                       tuple(sorted((name, tuple(value) if isinstance(value, list) else value)
+                                    for name, value in (params or {}).items())),
+                       tuple((spec or {}).items()))
+                return self.result_cache.get_or_fetch(
+                    key, token, lambda: self.execute_query(query, params, expanding, spec))
+
+        # Las fechas se interpretan al leer, sin una conversión posterior sobre el DataFrame ya construido
+        parse_dates = date_columns(spec) if spec else None
         try:
-            return pd.read_sql(query, self.engine)  # Usa directamente el motor
+            if params is None:
+                data = pd.read_sql(query, self.engine, parse_dates=parse_dates)  # Usa directamente el motor
+            else:
+                statement = text(query).bindparams(*[bindparam(name, expanding=True) for name in expanding])
+                data = pd.read_sql(statement, self.engine, params=params, parse_dates=parse_dates)
         except Exception as e:
             raise Exception(f"Error al ejecutar la consulta: {e}")
+        return apply_fetch_spec(data, spec) if spec else data
+
+    def table_version(self, table):
+        """
+        Consulta la versión actual de una tabla con TABLE_VERSION_PROBE.
+        :param table: Nombre de la tabla.
+        Si la sonda falla, la tabla se recuerda en la caché de consultas y no se vuelve a sondear.
+        :return: Tupla (filas, última modificación) o None si la tabla no admite la sonda (sin caché).
+        """
+        source = (str(self.engine.url), id(self.engine), table)
+        if self.result_cache is not None and self.result_cache.is_unversioned(source):
+            return None
+        try:
+            with self.engine.connect() as connection:
+                row = connection.execute(text(TABLE_VERSION_PROBE.format(table=table))).one()
+        except Exception as e:
+            if self.result_cache is None or self.result_cache.mark_unversioned(source):
+                print(f"La tabla '{table}' no admite la sonda de versión; sus lecturas no usarán la caché: {e}")
+            return None
+        return tuple(str(value) for value in row)
+
+    @staticmethod
+    def _select_columns(dataset, columns):
+        """
+        Valida las columnas pedidas de un conjunto de datos (todas si es None) y retorna su especificación.
+        """
+        spec = FETCH_SPECS[dataset]
+        if columns is None:
+            return spec
+        unknown = [column for column in columns if column not in spec]
+        if unknown:
+            raise Exception(f"Error: columnas desconocidas para '{dataset}': {unknown}")
+        return {column: spec[column] for column in columns}
 
-    def fetch_inventory_data(self):
+    def fetch_inventory_data(self, columns=None):
         """
         Extrae datos reales de inventario desde SQL Server.
+        :param columns: Columnas a leer (por defecto, todas las de FETCH_SPECS['inventory']).
         """
-        query = """
-        SELECT 
-            ID_Producto, 
-            Nombre_Producto, 
-            Stock_Actual, 
-            Categoria, 
-            Precio_Unitario 
+        spec = self._select_columns('inventory', columns)
+        query = f"""
+        SELECT {', '.join(spec)}
         FROM ds_Product_Items
         """
-        return self.execute_query(query)
+        return self.execute_query(query, spec=spec, table="ds_Product_Items")
 
     def fetch_sales_data(self):
         """
-        Extrae datos históricos de ventas desde SQL Server.
+        Extrae datos históricos de ventas desde SQL Server según el modo configurado:
+        totales diarios por producto ("daily"), transacciones individuales ("raw") o totales diarios
+        del almacén local tras traer solo los cambios desde la última sincronización ("synced") o totales
+        diarios calculados leyendo las transacciones por bloques ("streaming").
+        """
+        if self.sales_mode == "daily":
+            return self.fetch_daily_sales()
+        if self.sales_mode == "streaming":
+            return self.fetch_sales_streaming()
+        if self.sales_mode == "synced":
+            self.sales_sync.sync()
+            return apply_fetch_spec(self.sales_sync.load_sales(), FETCH_SPECS['sales'])
+        return self.fetch_raw_sales()
+
+    @property
+    def sales_sync(self):
+        """
+        Sincronizador del almacén local de ventas asociado a esta instancia.
+        """
+        if getattr(self, '_sales_sync', None) is None:
+            self._sales_sync = SalesSync(self)
+        return self._sales_sync
+
+    def fetch_daily_sales(self, start_date=None, end_date=None, product_ids=None):
+        """
+        Extrae los totales diarios de ventas por producto, agregados en el servidor.
+        El volumen transferido depende de los días con ventas de cada producto y no del número de transacciones.
+        :param start_date: Fecha inicial (incluida) o None.
+        :param end_date: Fecha final (incluida) o None.
+        :param product_ids: Lista de IDs de producto a incluir o None para todos.
+        :return: DataFrame con Fecha_Venta (día), ID_Producto y Cantidad_Vendida.
+        """
+        day = "Fecha_Venta" if self.daily_sales_view else self.sales_day_expression
+        conditions, params, expanding = [], {}, []
+        if start_date is not None:
+            conditions.append(f"{day} >= :start_date")
+            params['start_date'] = pd.Timestamp(start_date).date()
+        if end_date is not None:
+            conditions.append(f"{day} <= :end_date")
+            params['end_date'] = pd.Timestamp(end_date).date()
+        if product_ids is not None:
+            conditions.append("ID_Producto IN :product_ids")
+            params['product_ids'] = [int(product_id) for product_id in product_ids]
+            expanding.append('product_ids')
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        if self.daily_sales_view:
+            # NOEXPAND obliga a leer el índice de la vista también en ediciones distintas de Enterprise
+            hint = " WITH (NOEXPAND)" if self.engine.dialect.name == 'mssql' else ""
+            query = f"""
+            SELECT Fecha_Venta, ID_Producto, Cantidad_Vendida
+            FROM {self.daily_sales_view}{hint}
+            {where}
+            """
+        else:
+            query = f"""
+            SELECT {day} AS Fecha_Venta, ID_Producto, SUM(Cantidad_Vendida) AS Cantidad_Vendida
+            FROM DATATEL_Ventas_Inventario_Analytical_Dataset
+            {where}
+            GROUP BY {day}, ID_Producto
+            """
+        # Una consulta filtrada por producto usa el índice y cuesta menos que la sonda de versión, que recorre
+        # toda la tabla (COUNT/MAX); por eso solo la lectura completa pasa por la caché de consultas
+        table = "DATATEL_Ventas_Inventario_Analytical_Dataset" if product_ids is None else None
+        return self.execute_query(query, params, expanding, spec=FETCH_SPECS['sales'], table=table)
+
+    def fetch_product_sales(self, product_ids, start_date=None, end_date=None):
+        """
+        Extrae los totales diarios de uno o varios productos con una consulta parametrizada
+        (ID_Producto IN ..., rango de fechas opcional), sin leer el resto del catálogo.
+        La consulta se envía siempre al servidor, sin pasar por la caché de consultas ni su sonda de versión.
+        :param product_ids: ID de un producto o lista de IDs.
+        :param start_date: Fecha inicial (incluida) o None.
+        :param end_date: Fecha final (incluida) o None.
+        :return: DataFrame con Fecha_Venta (día), ID_Producto y Cantidad_Vendida.
+        """
+        if np.isscalar(product_ids):
+            product_ids = [product_ids]
+        return self.fetch_daily_sales(start_date=start_date, end_date=end_date, product_ids=list(product_ids))
+
+    def fetch_raw_sales(self, columns=None):
+        """
+        Extrae las transacciones de ventas sin agregar.
+        :param columns: Columnas a leer (por defecto, todas las de FETCH_SPECS['sales']).
         """
-        query = """
-        SELECT Fecha_Venta, ID_Producto, Cantidad_Vendida 
+        spec = self._select_columns('sales', columns)
+        query = f"""
+        SELECT {', '.join(spec)}
         FROM DATATEL_Ventas_Inventario_Analytical_Dataset
         """
-        return self.execute_query(query)
-    
\ No newline at end of file
+        return self.execute_query(query, spec=spec, table="DATATEL_Ventas_Inventario_Analytical_Dataset")
+
+    def iter_sales_chunks(self, chunksize):
+        """
+        Recorre las transacciones de ventas por bloques con un cursor de servidor.
+        :param chunksize: Filas por bloque.
+        :return: Generador de DataFrames con Fecha_Venta, ID_Producto y Cantidad_Vendida.
+        """
+        query = f"""
+        SELECT {', '.join(FETCH_SPECS['sales'])}
+        FROM DATATEL_Ventas_Inventario_Analytical_Dataset
+        """
+        with self.engine.connect().execution_options(stream_results=True) as connection:
+            yield from pd.read_sql(text(query), connection, chunksize=chunksize,
+                                   parse_dates=date_columns(FETCH_SPECS['sales']))
+
+    def fetch_sales_streaming(self, chunksize=None):
+        """
+        Lee las transacciones por bloques y acumula los totales diarios por producto.
+        Los totales parciales se combinan cuando superan el tamaño del acumulado, de modo que la memoria
+        depende del número de días con ventas por producto y no del tamaño de la tabla.
+        :param chunksize: Filas por bloque (por defecto, stream_chunksize).
+        :return: DataFrame con Fecha_Venta (día), ID_Producto y Cantidad_Vendida.
+        """
+        spec = FETCH_SPECS['sales']
+        chunksize = chunksize or self.stream_chunksize
+        totals, partials, partial_rows = None, [], 0
+
+        def fold(totals, partials):
+            parts = partials if totals is None else [totals] + partials
+            return pd.concat(parts).groupby(level=[0, 1], sort=False).sum()
+
+        try:
+            for chunk in self.iter_sales_chunks(chunksize):
+                chunk = apply_fetch_spec(chunk, spec)
+                daily = chunk.groupby([chunk['Fecha_Venta'].dt.normalize(), chunk['ID_Producto']], sort=False)[
+                    'Cantidad_Vendida'].sum()
+                partials.append(daily)
+                partial_rows += len(daily)
+                # Combinar los parciales cuando ocupan más que el acumulado (costo amortizado lineal)
+                if partial_rows > max(len(totals) if totals is not None else 0, chunksize):
+                    totals, partials, partial_rows = fold(totals, partials), [], 0
+        except Exception as e:
+            raise Exception(f"Error al leer las ventas por bloques: {e}")
+
+        if partials:
+            totals = fold(totals, partials)
+        if totals is None or totals.empty:
+            return apply_fetch_spec(pd.DataFrame(columns=list(spec)), spec)
+        totals.index.names = ['Fecha_Venta', 'ID_Producto']
+        return apply_fetch_spec(totals.rename('Cantidad_Vendida').reset_index(), spec)
+
+    def memory_report(self):
+        """
+        Reporta la memoria de las instantáneas de inventario y ventas vigentes.
+        """
+        return {
+            'inventory': memory_report(self.fetch_inventory_snapshot()),
+            'sales': memory_report(self.fetch_sales_snapshot())
+        }
+
+    @property
+    def sales_snapshot_key(self):
+        """
+        Clave de la instantánea de ventas; cada modo de lectura tiene su propia instantánea.
+        """
+        return "sales" if self.sales_mode == "raw" else f"sales:{self.sales_mode}"
+
+    def fetch_inventory_snapshot(self):
+        """
+        Retorna los datos de inventario desde la instantánea compartida del proceso.
+        """
+        return snapshot_store.get("inventory", self.fetch_inventory_data)
+
+    def fetch_sales_snapshot(self):
+        """
+        Retorna los datos de ventas desde la instantánea compartida del proceso.
+        """
+        return snapshot_store.get(self.sales_snapshot_key, self.fetch_sales_data)
+
+    def sales_snapshot_fresh(self):
+        """
+        Indica si la instantánea de ventas ya está cargada y vigente, es decir, si leerla no consulta la base.
+        """
+        return snapshot_store.is_fresh(self.sales_snapshot_key)
+
+    def fetch_sales_derived(self, name, builder):
+        """
+        Retorna un objeto derivado de la instantánea de ventas, recalculado solo cuando la instantánea cambia.
+        :param name: Nombre del objeto derivado.
+        :param builder: Función que construye el objeto a partir del DataFrame de ventas.
+        """
+        return snapshot_store.get_derived(self.sales_snapshot_key, self.fetch_sales_data, name, builder)
+
+
+def get_database_operations(**kwargs):
+    """
+    Crea las operaciones de datos del origen configurado en data/database_config.json (clave "backend"):
+    "sqlserver" (por defecto) y "sqlite" usan DatabaseOperations con su motor (y la vista de totales diarios de
+    la clave "daily_sales_view", si existe); "files" lee archivos CSV/Parquet.
+    Las ventas se leen como totales diarios ("daily") salvo que la clave "sales_mode" indique otro modo.
+    :param kwargs: Argumentos adicionales para el constructor (por ejemplo, sales_mode).
+    :return: Instancia de DatabaseOperations o de una subclase.
+    """
+    settings = load_database_settings()
+    kwargs.setdefault('sales_mode', settings.get('sales_mode', "daily"))
+    if settings['backend'] == 'files':
+        from db.file_operations import FileDatabaseOperations
+        return FileDatabaseOperations(settings['inventory_path'], settings['sales_path'], **kwargs)
+    if settings.get('daily_sales_view'):
+        kwargs.setdefault('daily_sales_view', settings['daily_sales_view'])
+    return DatabaseOperations(**kwargs)
@@ -0,0 +1,103 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+from db.db_operations import DatabaseOperations, FETCH_SPECS, apply_fetch_spec, date_columns
+
+
+class FileDatabaseOperations(DatabaseOperations):
+    """
+    Origen de datos basado en archivos CSV o Parquet con las mismas columnas que las tablas
+    ds_Product_Items y DATATEL_Ventas_Inventario_Analytical_Dataset.
+    Permite ejecutar y perfilar el pipeline sin un servidor de base de datos; los filtros y la
+    agregación diaria que en SQL se hacen en el servidor se aplican aquí con pandas.
+    """
+
+    def __init__(self, inventory_path, sales_path, sales_mode=None):
+        """
+        :param inventory_path: Ruta del archivo de inventario (.csv o .parquet).
+        :param sales_path: Ruta del archivo de ventas (.csv o .parquet).
+        :param sales_mode: "raw", "daily" o "streaming" (por defecto, "raw").
+        """
+        self.engine = None
+        self.inventory_path = inventory_path
+        self.sales_path = sales_path
+        if sales_mode is not None:
+            self.sales_mode = sales_mode
+
+    @staticmethod
+    def _read(path, columns, filters=None, dates=()):
+        """
+        Lee las columnas indicadas de un archivo CSV o Parquet; un archivo vacío produce un DataFrame vacío.
+        Con Parquet, los filtros (formato de pyarrow) descartan los grupos de filas que no los cumplen.
+        Con CSV, las columnas de `dates` se interpretan como fechas durante la lectura (Parquet ya guarda el tipo).
+        """
+        if not os.path.exists(path):
+            raise Exception(f"Error: el archivo de datos '{path}' no se encuentra.")
+        if os.path.getsize(path) == 0:
+            return pd.DataFrame(columns=columns)
+        if path.endswith(".parquet"):
+            return pd.read_parquet(path, columns=columns, filters=filters)
+        return pd.read_csv(path, usecols=columns, parse_dates=list(dates))
+
+    def execute_query(self, query, params=None, expanding=(), spec=None, table=None):
+        raise Exception("Error: el origen de datos basado en archivos no ejecuta consultas SQL.")
+
+    def fetch_inventory_data(self, columns=None):
+        """
+        Lee el inventario desde su archivo.
+        :param columns: Columnas a leer (por defecto, todas las de FETCH_SPECS['inventory']).
+        """
+        spec = self._select_columns('inventory', columns)
+        return apply_fetch_spec(self._read(self.inventory_path, list(spec)), spec)
+
+    def fetch_raw_sales(self, columns=None):
+        """
+        Lee las transacciones de ventas desde su archivo.
+        :param columns: Columnas a leer (por defecto, todas las de FETCH_SPECS['sales']).
+        """
+        spec = self._select_columns('sales', columns)
+        return apply_fetch_spec(self._read(self.sales_path, list(spec), dates=date_columns(spec)), spec)
+
+    def fetch_daily_sales(self, start_date=None, end_date=None, product_ids=None):
+        """
+        Totales diarios de ventas por producto, con los mismos filtros opcionales que la versión SQL.
+        """
+        if product_ids is not None:
+            product_ids = [int(product_id) for product_id in product_ids]
+            spec = FETCH_SPECS['sales']
+            sales_data = apply_fetch_spec(
+                self._read(self.sales_path, list(spec), filters=[('ID_Producto', 'in', product_ids)],
+                           dates=date_columns(spec)), spec)
+        else:
+            sales_data = self.fetch_raw_sales()
+        days = sales_data['Fecha_Venta'].dt.normalize()
+        keep = pd.Series(True, index=sales_data.index)
+        # Los límites se truncan al día, igual que la comparación por fecha de la versión SQL
+        if start_date is not None:
+            keep &= days >= pd.Timestamp(start_date).normalize()
+        if end_date is not None:
+            keep &= days <= pd.Timestamp(end_date).normalize()
+        if product_ids is not None:
+            keep &= sales_data['ID_Producto'].isin(product_ids)
+        daily = (sales_data[keep]
+                 .groupby([days[keep].rename('Fecha_Venta'), sales_data.loc[keep, 'ID_Producto']], sort=False)
+                 ['Cantidad_Vendida'].sum()
+                 .reset_index())
+        return apply_fetch_spec(daily, FETCH_SPECS['sales'])
+
+    def iter_sales_chunks(self, chunksize):
+        """
+        Recorre el archivo de ventas por bloques sin cargarlo completo.
+        """
+        columns = list(FETCH_SPECS['sales'])
+        if os.path.getsize(self.sales_path) == 0:
+            return
+        if self.sales_path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(self.sales_path).iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(self.sales_path, usecols=columns, chunksize=chunksize,
+                                   parse_dates=date_columns(FETCH_SPECS['sales']))
@@ -0,0 +1,148 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import glob
+import hashlib
+import re
+from datetime import datetime
+from sqlalchemy import text
+from db.db_connection import get_db_connection
+from db.results_store import RESULT_METADATA, ResultsStore
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+
+# Separador de lotes de SQL Server: una línea que solo contiene GO
+BATCH_SEPARATOR = re.compile(r"^\s*GO\s*;?\s*$", re.IGNORECASE | re.MULTILINE)
+
+CREATE_LEDGER = """
+IF OBJECT_ID('dbo.schema_migrations', 'U') IS NULL
+CREATE TABLE dbo.schema_migrations (
+    Version NVARCHAR(255) NOT NULL PRIMARY KEY,
+    Checksum CHAR(64) NOT NULL,
+    Fecha_Aplicacion DATETIME2 NOT NULL
+)
+"""
+
+
+class MigrationRunner:
+    """
+    Aplica en orden los scripts .sql de db/migrations y registra cada uno en la tabla schema_migrations,
+    de modo que ejecutar el proceso varias veces solo aplica los scripts pendientes.
+    Cada script se divide en lotes por las líneas GO y se ejecuta en una sola transacción junto con su registro.
+    Los scripts están escritos en T-SQL, por lo que solo se aplican sobre SQL Server.
+    """
+
+    def __init__(self, engine=None, migrations_dir=MIGRATIONS_DIR):
+        """
+        :param engine: Motor SQLAlchemy a utilizar (por defecto, el de get_db_connection()).
+        :param migrations_dir: Carpeta con los scripts numerados (001_..., 002_...).
+        """
+        self.engine = engine if engine is not None else get_db_connection()
+        self.migrations_dir = migrations_dir
+
+    def migrations(self):
+        """
+        Lista los scripts de migración ordenados por nombre.
+        :return: Lista de tuplas (versión, ruta, checksum SHA-256 del contenido).
+        """
+        migrations = []
+        for path in sorted(glob.glob(os.path.join(self.migrations_dir, "*.sql"))):
+            with open(path, 'rb') as script_file:
+                checksum = hashlib.sha256(script_file.read()).hexdigest()
+            migrations.append((os.path.splitext(os.path.basename(path))[0], path, checksum))
+        return migrations
+
+    @staticmethod
+    def split_batches(script):
+        """
+        Divide un script en los lotes separados por GO, descartando los vacíos.
+        """
+        return [batch.strip() for batch in BATCH_SEPARATOR.split(script) if batch.strip()]
+
+    def check_dialect(self):
+        """
+        Verifica que el motor sea SQL Server, el único dialecto de los scripts de migración.
+        """
+        if self.engine.dialect.name != 'mssql':
+            raise Exception(
+                f"Error: las migraciones de db/migrations están escritas en T-SQL y el motor es "
+                f"'{self.engine.dialect.name}'; use ResultsStore().create_tables() para crear las tablas de resultados."
+            )
+
+    def applied(self):
+        """
+        Retorna las migraciones ya aplicadas como diccionario {versión: checksum}.
+        """
+        self.check_dialect()
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(CREATE_LEDGER)
+            rows = connection.execute(text("SELECT Version, Checksum FROM dbo.schema_migrations")).fetchall()
+        return {version: checksum for version, checksum in rows}
+
+    def pending(self):
+        """
+        Retorna las migraciones que aún no se aplicaron, avisando de las aplicadas cuyo archivo cambió.
+        """
+        applied = self.applied()
+        pending = []
+        for version, path, checksum in self.migrations():
+            if version not in applied:
+                pending.append((version, path, checksum))
+            elif applied[version] != checksum:
+                print(f"Advertencia: la migración '{version}' cambió después de aplicarse; no se vuelve a ejecutar.")
+        return pending
+
+    def apply(self, dry_run=False):
+        """
+        Aplica las migraciones pendientes en orden; se detiene en la primera que falle.
+        :param dry_run: Si es True, solo lista las migraciones pendientes.
+        :return: Lista con las versiones aplicadas (o pendientes, con dry_run).
+        """
+        applied = []
+        for version, path, checksum in self.pending():
+            if dry_run:
+                applied.append(version)
+                continue
+            with open(path, 'r', encoding='utf-8') as script_file:
+                batches = self.split_batches(script_file.read())
+            try:
+                with self.engine.begin() as connection:
+                    for batch in batches:
+                        connection.exec_driver_sql(batch)
+                    connection.execute(
+                        text("INSERT INTO dbo.schema_migrations (Version, Checksum, Fecha_Aplicacion) "
+                             "VALUES (:version, :checksum, :applied_at)"),
+                        {"version": version, "checksum": checksum, "applied_at": datetime.now()}
+                    )
+            except Exception as e:
+                raise Exception(f"Error al aplicar la migración '{version}': {e}")
+            print(f"Migración aplicada: {version}")
+            applied.append(version)
+        return applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aplica las migraciones pendientes de db/migrations.")
+    parser.add_argument("--dry-run", action="store_true", help="Solo lista las migraciones pendientes.")
+    args = parser.parse_args(argv)
+    runner = MigrationRunner()
+    if runner.engine.dialect.name != 'mssql':
+        # Otros motores: solo las tablas de resultados; el índice y la vista indexada son propios de SQL Server
+        tables = ", ".join(RESULT_METADATA.tables)
+        if args.dry_run:
+            print(f"Motor '{runner.engine.dialect.name}': se crearían las tablas de resultados ({tables}).")
+        else:
+            ResultsStore(engine=runner.engine).create_tables()
+            print(f"Motor '{runner.engine.dialect.name}': tablas de resultados creadas ({tables}).")
+        return
+    versions = runner.apply(dry_run=args.dry_run)
+    if not versions:
+        print("No hay migraciones pendientes.")
+    elif args.dry_run:
+        print(f"Migraciones pendientes: {', '.join(versions)}")
+
+
+if __name__ == "__main__":
+    main()
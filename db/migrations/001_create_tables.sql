@@ -0,0 +1,40 @@
+-- Tablas de resultados precalculados por el proceso por lotes (run.py).
+-- Cada ejecución se identifica con Run_ID; la API y el dashboard leen la última ejecución completada.
+
+IF OBJECT_ID('dbo.restocking_runs', 'U') IS NULL
+CREATE TABLE dbo.restocking_runs (
+    Run_ID BIGINT NOT NULL PRIMARY KEY,
+    Fecha_Ejecucion DATETIME2 NOT NULL,
+    Motor NVARCHAR(20) NOT NULL,
+    Dias_Prediccion INT NOT NULL,
+    Productos INT NOT NULL,
+    Estado NVARCHAR(20) NOT NULL
+);
+GO
+
+IF OBJECT_ID('dbo.restocking_matrix', 'U') IS NULL
+CREATE TABLE dbo.restocking_matrix (
+    Run_ID BIGINT NOT NULL,
+    ID_Producto INT NOT NULL,
+    Nombre_Producto NVARCHAR(255) NULL,
+    Stock_Actual INT NULL,
+    Cantidad_Minima INT NOT NULL,
+    Cantidad_Reposicion INT NOT NULL,
+    Estado_Reposicion NVARCHAR(20) NOT NULL,
+    Prioridad INT NOT NULL,
+    Prediccion_Total FLOAT NOT NULL,
+    MSE FLOAT NULL,
+    RMSE FLOAT NULL,
+    CONSTRAINT PK_restocking_matrix PRIMARY KEY (Run_ID, ID_Producto)
+);
+GO
+
+IF OBJECT_ID('dbo.product_forecasts', 'U') IS NULL
+CREATE TABLE dbo.product_forecasts (
+    Run_ID BIGINT NOT NULL,
+    ID_Producto INT NOT NULL,
+    Fecha DATE NOT NULL,
+    Prediccion FLOAT NOT NULL,
+    CONSTRAINT PK_product_forecasts PRIMARY KEY (Run_ID, ID_Producto, Fecha)
+);
+GO
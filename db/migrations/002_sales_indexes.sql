@@ -0,0 +1,20 @@
+-- Índices del dataset analítico de ventas para las lecturas de predicción.
+-- IX_Ventas_Producto_Fecha cubre la agregación diaria por producto: la lectura completa recorre solo el índice
+-- y la de uno o varios productos (ID_Producto IN ... y rango de fechas) se resuelve con búsquedas por rango.
+-- IX_Ventas_Modificacion atiende la sincronización incremental (aud_Fecha_Modificacion >= marca de agua)
+-- y la sonda de versión de la caché de consultas (MAX(aud_Fecha_Modificacion)).
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_Ventas_Producto_Fecha'
+                 AND object_id = OBJECT_ID('dbo.DATATEL_Ventas_Inventario_Analytical_Dataset'))
+CREATE NONCLUSTERED INDEX IX_Ventas_Producto_Fecha
+    ON dbo.DATATEL_Ventas_Inventario_Analytical_Dataset (ID_Producto, Fecha_Venta)
+    INCLUDE (Cantidad_Vendida);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_Ventas_Modificacion'
+                 AND object_id = OBJECT_ID('dbo.DATATEL_Ventas_Inventario_Analytical_Dataset'))
+CREATE NONCLUSTERED INDEX IX_Ventas_Modificacion
+    ON dbo.DATATEL_Ventas_Inventario_Analytical_Dataset (aud_Fecha_Modificacion);
+GO
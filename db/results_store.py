@@ -0,0 +1,228 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import BigInteger, Column, Date, DateTime, Float, Integer, MetaData, String, Table, Unicode, text
+from sqlalchemy.exc import IntegrityError
+from db.db_connection import get_db_connection
+
+# Columnas de la tabla restocking_matrix y su nombre en la matriz que muestra el dashboard
+MATRIX_DISPLAY_COLUMNS = {
+    'ID_Producto': "Código del Equipo",
+    'Nombre_Producto': "Descripción del Equipo",
+    'Stock_Actual': "Inventario Actual",
+    'Cantidad_Minima': "Cantidad Mínima Requerida",
+    'Cantidad_Reposicion': "Cantidad Recomendada de Reposición",
+    'Estado_Reposicion': "Estado de Reposición",
+    'MSE': "MSE",
+    'RMSE': "RMSE"
+}
+
+# Definición portable de las tablas de resultados (equivalente a db/migrations/001_create_tables.sql),
+# usada para crearlas en motores distintos de SQL Server
+RESULT_METADATA = MetaData()
+Table(
+    "restocking_runs", RESULT_METADATA,
+    Column("Run_ID", BigInteger, primary_key=True, autoincrement=False),
+    Column("Fecha_Ejecucion", DateTime, nullable=False),
+    Column("Motor", String(20), nullable=False),
+    Column("Dias_Prediccion", Integer, nullable=False),
+    Column("Productos", Integer, nullable=False),
+    Column("Estado", String(20), nullable=False)
+)
+Table(
+    "restocking_matrix", RESULT_METADATA,
+    Column("Run_ID", BigInteger, primary_key=True, autoincrement=False),
+    Column("ID_Producto", Integer, primary_key=True, autoincrement=False),
+    Column("Nombre_Producto", Unicode(255)),
+    Column("Stock_Actual", Integer),
+    Column("Cantidad_Minima", Integer, nullable=False),
+    Column("Cantidad_Reposicion", Integer, nullable=False),
+    Column("Estado_Reposicion", String(20), nullable=False),
+    Column("Prioridad", Integer, nullable=False),
+    Column("Prediccion_Total", Float, nullable=False),
+    Column("MSE", Float),
+    Column("RMSE", Float)
+)
+Table(
+    "product_forecasts", RESULT_METADATA,
+    Column("Run_ID", BigInteger, primary_key=True, autoincrement=False),
+    Column("ID_Producto", Integer, primary_key=True, autoincrement=False),
+    Column("Fecha", Date, primary_key=True),
+    Column("Prediccion", Float, nullable=False)
+)
+
+
+class ResultsStore:
+    """
+    Resultados precalculados (matriz de reposición y predicciones por producto) guardados en tablas versionadas.
+    Cada ejecución del proceso por lotes escribe sus filas bajo un Run_ID y solo se publica al confirmar la
+    transacción, de modo que los lectores siempre ven la última ejecución completa.
+    """
+
+    def __init__(self, engine=None, chunk_size=10000):
+        """
+        :param engine: Motor SQLAlchemy a utilizar (por defecto, el de get_db_connection()).
+        :param chunk_size: Filas enviadas por cada llamada a executemany.
+        """
+        self.engine = engine if engine is not None else get_db_connection()
+        self.chunk_size = chunk_size
+
+    def create_tables(self):
+        """
+        Crea las tablas de resultados que aún no existan con DDL portable (SQLite y otros motores);
+        en SQL Server se crean con las migraciones de db/migrations.
+        """
+        RESULT_METADATA.create_all(self.engine, checkfirst=True)
+
+    def _insert_rows(self, connection, table, run_id, rows):
+        """
+        Inserta las filas de una ejecución en una tabla con inserciones masivas.
+        Con SQL Server el motor usa fast_executemany, por lo que cada bloque se envía en un solo viaje.
+        """
+        if rows.empty:
+            return
+        rows = rows.assign(Run_ID=run_id)
+        columns = list(rows.columns)
+        insert = text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(':' + column for column in columns)})")
+        for start in range(0, len(rows), self.chunk_size):
+            chunk = rows.iloc[start:start + self.chunk_size]
+            records = chunk.astype(object).where(chunk.notna(), None).to_dict('records')  # NaN -> NULL
+            connection.execute(insert, records)
+
+    def write_run(self, engine_name, forecast_days, matrix_rows, forecast_rows, attempts=3):
+        """
+        Escribe una ejecución completa en una sola transacción, con el siguiente Run_ID (MAX(Run_ID) + 1).
+        Si otra ejecución toma el mismo Run_ID al mismo tiempo, la clave primaria de restocking_runs rechaza
+        la segunda y esta se reintenta con un nuevo identificador.
+        :param engine_name: Motor de predicción utilizado.
+        :param forecast_days: Días futuros predichos.
+        :param matrix_rows: DataFrame con las columnas de la tabla restocking_matrix (sin Run_ID).
+        :param forecast_rows: DataFrame con ID_Producto, Fecha y Prediccion (sin Run_ID).
+        :param attempts: Intentos ante un Run_ID duplicado.
+        :return: Run_ID de la ejecución escrita.
+        """
+        for attempt in range(attempts):
+            try:
+                with self.engine.begin() as connection:
+                    run_id = connection.execute(text("SELECT COALESCE(MAX(Run_ID), 0) + 1 FROM restocking_runs")).scalar()
+                    # La fila de la ejecución va primero: reserva el Run_ID antes de enviar las filas masivas
+                    connection.execute(
+                        text("INSERT INTO restocking_runs (Run_ID, Fecha_Ejecucion, Motor, Dias_Prediccion, Productos, Estado) "
+                             "VALUES (:run_id, :executed_at, :engine_name, :forecast_days, :products, 'completed')"),
+                        {"run_id": run_id, "executed_at": datetime.now(), "engine_name": engine_name,
+                         "forecast_days": forecast_days, "products": len(matrix_rows)}
+                    )
+                    self._insert_rows(connection, "restocking_matrix", run_id, matrix_rows)
+                    self._insert_rows(connection, "product_forecasts", run_id, forecast_rows)
+                return run_id
+            except IntegrityError:
+                if attempt == attempts - 1:
+                    raise
+
+    def prune_runs(self, keep=5):
+        """
+        Elimina las ejecuciones más antiguas, conservando las `keep` más recientes.
+        """
+        with self.engine.begin() as connection:
+            run_ids = [row[0] for row in connection.execute(text("SELECT Run_ID FROM restocking_runs ORDER BY Run_ID DESC"))]
+            for run_id in run_ids[keep:]:
+                for table in ("restocking_matrix", "product_forecasts", "restocking_runs"):
+                    connection.execute(text(f"DELETE FROM {table} WHERE Run_ID = :run_id"), {"run_id": run_id})
+
+    def latest_run(self):
+        """
+        Retorna la última ejecución completada o None si no existe ninguna
+        (o si las tablas de resultados aún no se crearon).
+        :return: Diccionario con Run_ID, Fecha_Ejecucion (Timestamp), Motor, Dias_Prediccion y Productos.
+        """
+        try:
+            with self.engine.connect() as connection:
+                run = connection.execute(text(
+                    "SELECT Run_ID, Fecha_Ejecucion, Motor, Dias_Prediccion, Productos FROM restocking_runs "
+                    "WHERE Run_ID = (SELECT MAX(Run_ID) FROM restocking_runs WHERE Estado = 'completed')"
+                )).mappings().first()
+        except Exception as e:
+            print(f"Error al leer los resultados precalculados: {e}")
+            return None
+        if run is None:
+            return None
+        return {**run, 'Fecha_Ejecucion': pd.Timestamp(run['Fecha_Ejecucion'])}
+
+    def latest_run_id(self):
+        """
+        Retorna el Run_ID de la última ejecución completada o None si no existe ninguna (ver latest_run).
+        """
+        run = self.latest_run()
+        return run['Run_ID'] if run is not None else None
+
+    def _read(self, query, params, run_id):
+        """
+        Ejecuta una consulta de lectura sobre la ejecución indicada o la última completada.
+        :return: DataFrame con el resultado o None si no hay resultados precalculados.
+        """
+        try:
+            run_id = run_id if run_id is not None else self.latest_run_id()
+            if run_id is None:
+                return None
+            return pd.read_sql(text(query), self.engine, params={**params, "run_id": run_id})
+        except Exception as e:
+            print(f"Error al leer los resultados precalculados: {e}")
+            return None
+
+    def fetch_restocking_matrix(self, run_id=None):
+        """
+        Retorna la matriz de reposición precalculada, ordenada por prioridad y con las columnas del dashboard.
+        :param run_id: Ejecución a leer (por defecto, la última completada).
+        :return: DataFrame o None si no hay resultados precalculados.
+        """
+        matrix = self._read(
+            f"SELECT {', '.join(MATRIX_DISPLAY_COLUMNS)} FROM restocking_matrix WHERE Run_ID = :run_id ORDER BY Prioridad",
+            {}, run_id
+        )
+        return matrix.rename(columns=MATRIX_DISPLAY_COLUMNS) if matrix is not None else None
+
+    def iter_restocking_matrix(self, run_id, chunksize=None):
+        """
+        Recorre la matriz precalculada de una ejecución por bloques con un cursor de servidor, sin cargarla completa.
+        :param run_id: Ejecución a leer (ver latest_run_id).
+        :param chunksize: Filas por bloque (por defecto, chunk_size).
+        :return: Generador de DataFrames ordenados por prioridad y con las columnas del dashboard.
+        """
+        query = (f"SELECT {', '.join(MATRIX_DISPLAY_COLUMNS)} FROM restocking_matrix "
+                 f"WHERE Run_ID = :run_id ORDER BY Prioridad")
+        with self.engine.connect().execution_options(stream_results=True) as connection:
+            for chunk in pd.read_sql(text(query), connection, params={"run_id": run_id},
+                                     chunksize=chunksize or self.chunk_size):
+                yield chunk.rename(columns=MATRIX_DISPLAY_COLUMNS)
+
+    def fetch_restocking_by_product(self, run_id=None):
+        """
+        Retorna la cantidad total predicha por producto (columnas ID_Producto, Producto y Cantidad).
+        :param run_id: Ejecución a leer (por defecto, la última completada).
+        :return: DataFrame o None si no hay resultados precalculados.
+        """
+        return self._read(
+            "SELECT ID_Producto, Nombre_Producto AS Producto, Prediccion_Total AS Cantidad "
+            "FROM restocking_matrix WHERE Run_ID = :run_id ORDER BY ID_Producto",
+            {}, run_id
+        )
+
+    def fetch_forecast(self, product_id, run_id=None):
+        """
+        Retorna la predicción futura precalculada de un producto (columnas Fecha y Predicción).
+        :param product_id: ID del producto.
+        :param run_id: Ejecución a leer (por defecto, la última completada).
+        :return: DataFrame o None si no hay resultados precalculados para el producto en esa ejecución.
+        """
+        forecast = self._read(
+            "SELECT Fecha, Prediccion FROM product_forecasts WHERE Run_ID = :run_id AND ID_Producto = :product_id "
+            "ORDER BY Fecha",
+            {"product_id": int(product_id)}, run_id
+        )
+        if forecast is None or forecast.empty:
+            return None
+        forecast['Fecha'] = pd.to_datetime(forecast['Fecha'])
+        return forecast.rename(columns={'Prediccion': 'Predicción'})
@@ -0,0 +1,147 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import glob
+import json
+import threading
+from datetime import datetime
+import pandas as pd
+
+STORE_DIR = os.path.join("data", "sales_store")
+
+# Grupo de líneas de venta del dataset analítico. No es una clave: la tabla no tiene clave primaria y una venta
+# puede tener varias líneas del mismo producto, por lo que cada grupo se reemplaza completo desde el origen.
+SALE_GROUP = ['Fecha_Venta', 'ID_Cliente', 'ID_Producto']
+STORE_COLUMNS = SALE_GROUP + ['Cantidad_Vendida', 'aud_Fecha_Modificacion']
+
+# Un solo hilo sincroniza a la vez, aunque existan varias instancias sobre el mismo almacén
+_sync_lock = threading.Lock()
+
+
+class SalesSync:
+    """
+    Sincronización incremental de las ventas hacia un almacén local en Parquet particionado por mes de venta.
+    Se guarda una marca de agua con el mayor aud_Fecha_Modificacion leído; cada sincronización trae todas las
+    líneas actuales de los grupos de venta (fecha, cliente y producto) con filas nuevas o modificadas desde esa
+    marca y reescribe únicamente las particiones afectadas, reemplazando esos grupos completos. Así se conservan
+    las líneas repetidas de una misma venta y las filas releídas en el límite de la marca no se duplican.
+    Las filas eliminadas en el origen (o movidas a otra fecha de venta) no se detectan; para eso se usa una
+    sincronización completa (full=True).
+    """
+
+    def __init__(self, db_ops, store_dir=STORE_DIR):
+        """
+        :param db_ops: Instancia de DatabaseOperations usada para leer el origen.
+        :param store_dir: Carpeta del almacén local.
+        """
+        self.db_ops = db_ops
+        self.store_dir = store_dir
+        self.state_path = os.path.join(store_dir, "_watermark.json")
+
+    def load_state(self):
+        """
+        Retorna el estado de la última sincronización (marca de agua, filas y fecha) o un estado vacío.
+        """
+        if not os.path.exists(self.state_path):
+            return {'watermark': None, 'rows_synced': 0, 'synced_at': None}
+        with open(self.state_path, 'r') as state_file:
+            return json.load(state_file)
+
+    def _save_state(self, state):
+        temp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as state_file:
+            json.dump(state, state_file, indent=2)
+        os.replace(temp_path, self.state_path)
+
+    def fetch_changes(self, watermark=None):
+        """
+        Lee del origen todas las líneas de los grupos de venta con alguna fila modificada desde la marca de agua
+        (todas las filas si no hay marca). Se usa >= para no perder filas con la misma marca de tiempo.
+        """
+        query = f"""
+        SELECT {', '.join(STORE_COLUMNS)}
+        FROM DATATEL_Ventas_Inventario_Analytical_Dataset
+        """
+        if watermark is None:
+            return self.db_ops.execute_query(query)
+        matches = ' AND '.join(f"cambio.{column} = venta.{column}" for column in SALE_GROUP)
+        query = f"""
+        SELECT {', '.join(f'venta.{column}' for column in STORE_COLUMNS)}
+        FROM DATATEL_Ventas_Inventario_Analytical_Dataset venta
+        WHERE EXISTS (
+            SELECT 1 FROM DATATEL_Ventas_Inventario_Analytical_Dataset cambio
+            WHERE cambio.aud_Fecha_Modificacion >= :watermark AND {matches}
+        )
+        """
+        return self.db_ops.execute_query(query, {'watermark': pd.Timestamp(watermark).to_pydatetime()})
+
+    def _partition_path(self, month):
+        return os.path.join(self.store_dir, f"Mes={month}", "ventas.parquet")
+
+    def _merge_partition(self, month, changes):
+        """
+        Combina los cambios de un mes con su partición y la reescribe de forma atómica: los grupos de venta
+        presentes en los cambios se reemplazan completos por sus líneas actuales.
+        """
+        path = self._partition_path(month)
+        if os.path.exists(path):
+            stored = pd.read_parquet(path)
+            touched = pd.MultiIndex.from_frame(stored[SALE_GROUP]).isin(pd.MultiIndex.from_frame(changes[SALE_GROUP]))
+            changes = pd.concat([stored[~touched], changes], ignore_index=True)
+        merged = changes.sort_values(SALE_GROUP, kind='stable').reset_index(drop=True)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        merged.to_parquet(temp_path, index=False)
+        os.replace(temp_path, path)
+
+    def sync(self, full=False):
+        """
+        Trae los cambios desde la última marca de agua y los combina en el almacén local.
+        :param full: Si es True, reconstruye el almacén completo desde el origen.
+        :return: Diccionario con las filas leídas, las particiones reescritas y la nueva marca de agua.
+        """
+        with _sync_lock:
+            state = {'watermark': None, 'rows_synced': 0, 'synced_at': None} if full else self.load_state()
+            if full:
+                for path in glob.glob(os.path.join(self.store_dir, "Mes=*", "ventas.parquet")):
+                    os.remove(path)
+
+            try:
+                changes = self.fetch_changes(state['watermark'])
+            except Exception as e:
+                raise Exception(f"Error al leer los cambios de ventas: {e}")
+
+            months = []
+            if not changes.empty:
+                changes['Fecha_Venta'] = pd.to_datetime(changes['Fecha_Venta'])
+                changes['aud_Fecha_Modificacion'] = pd.to_datetime(changes['aud_Fecha_Modificacion'])
+                partition_months = changes['Fecha_Venta'].dt.strftime('%Y-%m')
+                for month, month_changes in changes.groupby(partition_months, sort=True):
+                    self._merge_partition(month, month_changes)
+                    months.append(month)
+                watermark = changes['aud_Fecha_Modificacion'].max()
+                if state['watermark'] is None or watermark > pd.Timestamp(state['watermark']):
+                    state['watermark'] = watermark.isoformat()
+
+            state['rows_synced'] = state.get('rows_synced', 0) + len(changes)
+            state['synced_at'] = datetime.now().isoformat(timespec='seconds')
+            os.makedirs(self.store_dir, exist_ok=True)
+            self._save_state(state)
+            return {'rows_fetched': len(changes), 'partitions_written': months, 'watermark': state['watermark']}
+
+    def load_sales(self, daily=True):
+        """
+        Lee las ventas del almacén local.
+        :param daily: Si es True, retorna los totales diarios por producto; si no, las ventas individuales.
+        :return: DataFrame con Fecha_Venta, ID_Producto y Cantidad_Vendida.
+        """
+        paths = sorted(glob.glob(os.path.join(self.store_dir, "Mes=*", "ventas.parquet")))
+        columns = ['Fecha_Venta', 'ID_Producto', 'Cantidad_Vendida']
+        if not paths:
+            return pd.DataFrame(columns=columns)
+        sales_data = pd.concat([pd.read_parquet(path, columns=columns) for path in paths], ignore_index=True)
+        if not daily:
+            return sales_data
+        sales_data['Fecha_Venta'] = sales_data['Fecha_Venta'].dt.normalize()
+        return sales_data.groupby(['Fecha_Venta', 'ID_Producto'], as_index=False, sort=False)['Cantidad_Vendida'].sum()
@@ -0,0 +1,208 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import warnings
+import numpy as np
+import pandas as pd
+from models.demand_matrix import pack_series
+from models.model_cache import backtest_model_cache
+from models.fast_ar_engine import FastAREngine
+from models.demand_classification import CrostonSBAEngine, classify_demand
+from models.order_selection import get_product_order
+
+
+def batch_error_metrics(actuals, forecasts):
+    """
+    Calcula MSE y RMSE de muchas series a la vez como operaciones de arreglos.
+    :param actuals: Lista de arreglos reales (longitudes variables).
+    :param forecasts: Lista de arreglos predichos con la misma longitud que su real.
+    :return: Tupla (MSE, RMSE) como arreglos; NaN para series vacías.
+    """
+    actual_values, lengths = pack_series(actuals)
+    forecast_values, _ = pack_series(forecasts)
+    valid = np.arange(actual_values.shape[1])[None, :] < lengths[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mse = np.where(valid, (actual_values - forecast_values) ** 2, 0.0).sum(axis=1) / lengths
+    return mse, np.sqrt(mse)
+
+
+def accuracy_metrics(actuals, forecasts, scales):
+    """
+    Métricas de precisión de todos los productos y orígenes como operaciones de arreglos.
+    :param actuals: Arreglo (productos, orígenes, horizonte) con los valores reales (NaN si no aplica).
+    :param forecasts: Arreglo (productos, orígenes, horizonte) con las predicciones (NaN si no aplica).
+    :param scales: Arreglo (productos,) con el MAE de la predicción ingenua a un paso dentro de la muestra.
+    :return: Diccionario de arreglos por producto: MSE, RMSE, MAE, MASE, Sesgo y Origenes.
+    """
+    errors = forecasts - actuals
+    valid = ~np.isnan(errors)
+    counts = valid.sum(axis=(1, 2))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mse = np.nansum(errors ** 2, axis=(1, 2)) / counts
+        mae = np.nansum(np.abs(errors), axis=(1, 2)) / counts
+        bias = np.nansum(errors, axis=(1, 2)) / counts  # Positivo = sobrestimación
+        mase = mae / scales
+    return {
+        'MSE': mse,
+        'RMSE': np.sqrt(mse),
+        'MAE': mae,
+        'MASE': np.where(np.isfinite(mase), mase, np.nan),
+        'Sesgo': bias,
+        'Origenes': valid.any(axis=2).sum(axis=1)
+    }
+
+
+class RollingOriginBacktest:
+    """
+    Evaluación con orígenes móviles: para cada producto se predice `horizon` días desde varios cortes.
+    El modelo se ajusta una sola vez en el primer corte y luego se avanza su estado con los días
+    observados hasta cada corte siguiente (sin volver a optimizar); las métricas de todos los
+    productos y cortes se calculan a la vez.
+    """
+
+    def __init__(self, engine="statsmodels", horizon=30, n_origins=5, step=7, min_train=30, demand_routing=True,
+                 model_classes=("smooth",)):
+        """
+        :param engine: Motor de predicción: "statsmodels" (ARIMA) o "fast" (AR vectorizado por lotes).
+        :param horizon: Días predichos desde cada corte.
+        :param n_origins: Número máximo de cortes por producto.
+        :param step: Días entre cortes consecutivos.
+        :param min_train: Días mínimos de entrenamiento antes del primer corte.
+        :param demand_routing: Si es True, las series esporádicas se evalúan con Croston/SBA como en el servicio.
+        :param model_classes: Clases de demanda que se evalúan con el motor cuando hay enrutamiento.
+        """
+        self.engine = engine
+        self.horizon = horizon
+        self.n_origins = n_origins
+        self.step = step
+        self.min_train = min_train
+        self.demand_routing = demand_routing
+        self.model_classes = tuple(model_classes)
+        self.last_details = None
+
+    def origins(self, lengths):
+        """
+        Calcula los cortes de cada producto; el último corte deja exactamente `horizon` días de prueba.
+        :param lengths: Arreglo con la longitud de la serie de cada producto.
+        :return: Arreglo (productos, n_origins) con el índice de cada corte o -1 si no aplica.
+        """
+        offsets = (self.n_origins - 1 - np.arange(self.n_origins)) * self.step
+        cutoffs = lengths[:, None] - self.horizon - offsets[None, :]
+        return np.where(cutoffs >= self.min_train, cutoffs, -1)
+
+    def run_from_matrix(self, demand_matrix, product_ids=None):
+        """
+        Ejecuta el backtest sobre las series de la matriz de demanda.
+        :param demand_matrix: Instancia de DemandMatrix.
+        :param product_ids: Productos a evaluar (por defecto, todos los de la matriz).
+        :return: DataFrame con la tabla de precisión.
+        """
+        if product_ids is None:
+            product_ids = demand_matrix.product_ids.tolist()
+        return self.run(product_ids, [demand_matrix.series(product_id) for product_id in product_ids])
+
+    def run(self, product_ids, histories):
+        """
+        Ejecuta el backtest y devuelve una tabla compacta de precisión por producto.
+        :param product_ids: Lista de IDs de producto.
+        :param histories: Lista de series diarias completas, una por producto.
+        :return: DataFrame con ID_Producto, Clase, Origenes, MSE, RMSE, MAE, MASE y Sesgo.
+        """
+        columns = ['ID_Producto', 'Clase', 'Origenes', 'MSE', 'RMSE', 'MAE', 'MASE', 'Sesgo']
+        n_products = len(product_ids)
+        if n_products == 0:
+            return pd.DataFrame(columns=columns)
+        values, lengths = pack_series(histories)
+        origins = self.origins(lengths)
+        actuals = np.full((n_products, self.n_origins, self.horizon), np.nan)
+        forecasts = np.full((n_products, self.n_origins, self.horizon), np.nan)
+
+        # Valores reales de cada corte tomados de la matriz empaquetada en una sola indexación
+        horizon_index = np.clip(origins, 0, None)[:, :, None] + np.arange(self.horizon)[None, None, :]
+        in_range = (origins[:, :, None] >= 0) & (horizon_index < lengths[:, None, None])
+        if values.shape[1]:
+            flat_index = np.clip(horizon_index, 0, values.shape[1] - 1).reshape(n_products, -1)
+            gathered = np.take_along_axis(values, flat_index, axis=1).reshape(actuals.shape)
+            actuals[in_range] = gathered[in_range]
+
+        # Los cortes van en orden creciente: el primero válido es el mínimo no negativo
+        first_origin = np.where(origins >= 0, origins, np.iinfo(np.int64).max).min(axis=1)
+        first_origin = np.where((origins >= 0).any(axis=1), first_origin, -1)
+        evaluable = np.flatnonzero(first_origin > 0)
+
+        classes = np.full(n_products, "unclassified", dtype=object)
+        if self.demand_routing and len(evaluable):
+            classes[evaluable] = classify_demand([values[i, :first_origin[i]] for i in evaluable])
+        to_model = [i for i in evaluable if not self.demand_routing or classes[i] in self.model_classes]
+        to_croston = [i for i in evaluable if self.demand_routing and classes[i] not in self.model_classes]
+
+        if to_croston:
+            self._forecast_croston(values, origins, to_croston, forecasts)
+        if self.engine == "fast":
+            self._forecast_fast(values, origins, first_origin, to_model, forecasts)
+        else:
+            self._forecast_statsmodels(product_ids, histories, origins, first_origin, to_model, forecasts)
+
+        forecasts[np.isnan(actuals)] = np.nan
+
+        # Escala del MASE: MAE de la predicción ingenua a un paso antes del primer corte
+        diffs = np.abs(np.diff(values, axis=1))
+        in_sample = np.arange(diffs.shape[1])[None, :] < (first_origin - 1)[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scales = np.where(in_sample, diffs, 0.0).sum(axis=1) / in_sample.sum(axis=1)
+
+        metrics = accuracy_metrics(actuals, forecasts, scales)
+        self.last_details = {'origins': origins, 'actuals': actuals, 'forecasts': forecasts}
+        table = pd.DataFrame({'ID_Producto': list(product_ids), 'Clase': classes, **metrics})
+        return table[columns]
+
+    def _forecast_croston(self, values, origins, rows, forecasts):
+        """
+        Croston/SBA vectorizado: una estimación por corte para todas las series esporádicas.
+        """
+        engine = CrostonSBAEngine()
+        for k in range(self.n_origins):
+            active = [i for i in rows if origins[i, k] > 0]
+            if active:
+                rates = engine.demand_rate([values[i, :origins[i, k]] for i in active])
+                forecasts[active, k, :] = rates[:, None]
+
+    def _forecast_fast(self, values, origins, first_origin, rows, forecasts):
+        """
+        Motor vectorizado: coeficientes estimados una sola vez en el primer corte y reutilizados en los siguientes.
+        """
+        if not rows:
+            return
+        engine = FastAREngine()
+        coefficients = engine.fit([values[i, :first_origin[i]] for i in rows])
+        for k in range(self.n_origins):
+            active = [row for row, i in enumerate(rows) if origins[i, k] > 0]
+            if active:
+                predicted = engine.forecast([values[rows[row], :origins[rows[row], k]] for row in active],
+                                            self.horizon, coefficients=coefficients[active])
+                forecasts[[rows[row] for row in active], k, :] = predicted
+
+    def _forecast_statsmodels(self, product_ids, histories, origins, first_origin, rows, forecasts):
+        """
+        ARIMA: ajuste (o caché) en el primer corte y `append(refit=False)` para avanzar a cada corte siguiente.
+        Los ajustes se guardan en backtest_model_cache para no desplazar a los modelos de producción.
+        """
+        for i in rows:
+            product_id, history = product_ids[i], histories[i]
+            try:
+                order = get_product_order(product_id)
+                fitted_model = backtest_model_cache.get_or_fit(product_id, history[:first_origin[i]], order=order)
+                position = first_origin[i]
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    for k in range(self.n_origins):
+                        origin = origins[i, k]
+                        if origin <= 0:
+                            continue
+                        if origin > position:
+                            fitted_model = fitted_model.append(history[position:origin], refit=False)
+                            position = origin
+                        forecasts[i, k, :] = np.asarray(fitted_model.forecast(steps=self.horizon))
+            except Exception as e:
+                print(f"Error en el backtest del producto {product_id}: {e}")
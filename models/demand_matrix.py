@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+
+def pack_series(series_list):
+    """
+    Alinea a la izquierda una lista de series diarias en una matriz rellenada con ceros.
+    :param series_list: Lista de series (o arreglos) de longitudes variables.
+    :return: Tupla (matriz float64 series × días, arreglo con la longitud de cada serie).
+    """
+    lengths = np.array([len(series) for series in series_list], dtype=np.int64)
+    width = int(lengths.max()) if len(lengths) else 0
+    values = np.zeros((len(series_list), width), dtype=np.float64)
+    for row, series in enumerate(series_list):
+        values[row, :lengths[row]] = np.nan_to_num(np.asarray(series, dtype=np.float64))
+    return values, lengths
+
+
+class DemandMatrix:
+    """
+    Matriz densa de demanda diaria (productos × días calendario) respaldada por un arreglo NumPy.
+    Se construye en una sola pasada vectorizada y entrega la serie diaria de cada producto
+    como una vista sin copia de su fila.
+    """
+
+    def __init__(self, values, dates, product_ids, first_day, last_day):
+        """
+        :param values: Arreglo float64 de forma (productos, días) con la cantidad vendida por día.
+        :param dates: DatetimeIndex diario que corresponde a las columnas de la matriz.
+        :param product_ids: Arreglo con los IDs de producto en el orden de las filas.
+        :param first_day: Índice de la primera columna con ventas de cada producto.
+        :param last_day: Índice de la última columna con ventas de cada producto.
+        """
+        self.values = values
+        self.dates = dates
+        self.product_ids = product_ids
+        self.product_index = {product_id: row for row, product_id in enumerate(product_ids.tolist())}
+        self.first_day = first_day
+        self.last_day = last_day
+
+    @classmethod
+    def from_sales(cls, sales_data):
+        """
+        Construye la matriz a partir de los datos de ventas crudos o preprocesados.
+        :param sales_data: DataFrame con 'Fecha_Venta' (columna o índice), 'ID_Producto' y 'Cantidad_Vendida'.
+        :return: Instancia de DemandMatrix.
+        """
+        if 'Fecha_Venta' in sales_data.columns:
+            sale_dates = pd.to_datetime(sales_data['Fecha_Venta'])
+        else:
+            sale_dates = pd.Series(pd.to_datetime(sales_data.index), index=sales_data.index)
+
+        sale_days = sale_dates.dt.normalize().to_numpy()
+        if len(sale_days) == 0:
+            return cls(np.zeros((0, 0)), pd.DatetimeIndex([], freq='D'), np.array([], dtype=np.int64),
+                       np.array([], dtype=np.int64), np.array([], dtype=np.int64))
+
+        # Codificar productos y días como enteros para agregar con un único bincount
+        product_codes, product_ids = pd.factorize(sales_data['ID_Producto'].to_numpy(), sort=True)
+        start = sale_days.min()
+        day_codes = ((sale_days - start) // np.timedelta64(1, 'D')).astype(np.int64)
+        n_products, n_days = len(product_ids), int(day_codes.max()) + 1
+
+        quantities = np.nan_to_num(sales_data['Cantidad_Vendida'].to_numpy(dtype=np.float64))
+        values = np.bincount(
+            product_codes * n_days + day_codes, weights=quantities, minlength=n_products * n_days
+        ).reshape(n_products, n_days)
+
+        # Rango de fechas con ventas de cada producto (equivalente al rango de resample('D'))
+        day_range = pd.Series(day_codes).groupby(product_codes).agg(['min', 'max'])
+        dates = pd.date_range(start=start, periods=n_days, freq='D', name='Fecha_Venta')
+        return cls(values, dates, np.asarray(product_ids), day_range['min'].to_numpy(), day_range['max'].to_numpy())
+
+    def series(self, product_id):
+        """
+        Retorna la serie diaria de ventas de un producto como vista sin copia de la matriz.
+        :param product_id: ID del producto.
+        :return: Serie con índice diario desde su primera hasta su última venta (vacía si no tiene ventas).
+        """
+        row = self.product_index.get(product_id)
+        if row is None:
+            return pd.Series([], index=pd.DatetimeIndex([], freq='D', name='Fecha_Venta'),
+                             dtype=np.float64, name='Cantidad_Vendida')
+        first, last = self.first_day[row], self.last_day[row] + 1
+        return pd.Series(self.values[row, first:last], index=self.dates[first:last],
+                         name='Cantidad_Vendida', copy=False)
@@ -0,0 +1,409 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_squared_error
+from db.db_operations import get_database_operations
+from models.demand_matrix import DemandMatrix
+from models.model_cache import model_cache
+from models.fast_ar_engine import FastAREngine
+from models.demand_classification import DEMAND_CLASSES, CrostonSBAEngine, classify_demand
+from models.order_selection import DEFAULT_ORDER, get_product_order
+from models.backtesting import RollingOriginBacktest, batch_error_metrics
+
+
+def calculate_error_metrics(test, forecast):
+    """
+    Calcula métricas de error para evaluar la precisión del modelo.
+    :param test: Serie real del conjunto de prueba.
+    :param forecast: Serie predicha por el modelo.
+    :return: Diccionario con las métricas RMSE y MSE.
+    """
+    mse = mean_squared_error(test, forecast)
+    rmse = np.sqrt(mse)
+    return {"MSE": mse, "RMSE": rmse}
+
+
+def fit_product_forecast(product_id, train, test_steps, future_steps=30, order=DEFAULT_ORDER):
+    """
+    Ajusta (o recupera de la caché) el modelo ARIMA de un producto y genera sus predicciones de prueba y futuras.
+    Es una función de módulo para que pueda ejecutarse dentro de un pool de procesos;
+    cualquier error se captura y se devuelve para no abortar el resto de los productos.
+    :param product_id: ID del producto.
+    :param train: Serie diaria de entrenamiento del producto.
+    :param test_steps: Número de días del conjunto de prueba.
+    :param future_steps: Número de días futuros a predecir.
+    :param order: Tupla (p, d, q) del modelo ARIMA.
+    :return: Diccionario con 'forecast', 'forecast_future', 'error' (None si el ajuste fue exitoso)
+             y los segundos de ajuste y predicción ('fit_seconds', 'forecast_seconds').
+    """
+    start = time.perf_counter()
+    try:
+        fitted_model = model_cache.get_or_fit(product_id, train, order=order)
+        fitted_at = time.perf_counter()
+        # Una sola predicción cubre el periodo de prueba y el horizonte futuro
+        forecast = np.asarray(fitted_model.forecast(steps=max(test_steps, future_steps)))
+        return {'forecast': forecast[:test_steps], 'forecast_future': forecast[:future_steps], 'error': None,
+                'fit_seconds': fitted_at - start, 'forecast_seconds': time.perf_counter() - fitted_at}
+    except Exception as e:
+        return {'forecast': None, 'forecast_future': None, 'error': str(e),
+                'fit_seconds': time.perf_counter() - start, 'forecast_seconds': 0.0}
+
+
+class ProductForecast:
+    """
+    Resultado unificado de un producto: contiene la predicción de validación (backtest), sus métricas
+    de error, la predicción futura y el total de reposición, todos obtenidos de un único ajuste.
+    """
+
+    def __init__(self, product_id, history, train_size, backtest=None, future=None, error_metrics=None, error=None,
+                 demand_class=None):
+        """
+        :param product_id: ID del producto.
+        :param history: Serie diaria completa de ventas del producto.
+        :param train_size: Número de días usados para entrenar (80% de la serie).
+        :param backtest: Predicción sobre el conjunto de prueba (20%) o None si no se ajustó el modelo.
+        :param future: Predicción de los días futuros desde el final del entrenamiento o None.
+        :param error_metrics: Diccionario con las métricas MSE/RMSE del backtest.
+        :param error: Mensaje de error si el ajuste falló.
+        :param demand_class: Clase de demanda del producto (ver models/demand_classification.py).
+        """
+        self.product_id = product_id
+        self.history = history
+        self.train = history[:train_size]
+        self.test = history[train_size:]
+        self.backtest = backtest
+        self.future = future
+        self.error_metrics = error_metrics if error_metrics is not None else {"MSE": None, "RMSE": None}
+        self.error = error
+        self.demand_class = demand_class
+
+    @property
+    def fitted(self):
+        """
+        Indica si el producto cuenta con un modelo ajustado y predicciones.
+        """
+        return self.future is not None
+
+    @property
+    def restocking_total(self):
+        """
+        Cantidad total predicha para el horizonte futuro (0 si no hay predicción).
+        """
+        return self.future.sum() if self.fitted else 0
+
+    def future_frame(self):
+        """
+        Retorna la predicción futura como DataFrame con las columnas 'Fecha' y 'Predicción'.
+        """
+        if not self.fitted:
+            return pd.DataFrame({'Fecha': [], 'Predicción': []})
+        forecast_dates = pd.date_range(start=self.train.index[-1] + pd.Timedelta(days=1), periods=len(self.future))
+        return pd.DataFrame({'Fecha': forecast_dates, 'Predicción': self.future})
+
+
+class ForecastService:
+    """
+    Servicio de predicción que ajusta un único modelo por producto y por versión de los datos.
+    Los resultados se guardan junto a la instantánea de ventas, de modo que la matriz de reposición,
+    la comparación de ventas, la predicción futura y la reposición por producto comparten el mismo ajuste.
+    """
+
+    def __init__(self, engine="statsmodels", forecast_days=30, max_workers=1, executor=None, db_ops=None,
+                 demand_routing=True, model_classes=("smooth",)):
+        """
+        :param engine: Motor de predicción: "statsmodels" (ARIMA por producto) o "fast" (AR vectorizado por lotes).
+        :param forecast_days: Número de días futuros a predecir.
+        :param max_workers: Número de procesos para ajustar los modelos en paralelo (1 = ejecución en serie,
+                            None = todos los núcleos disponibles).
+        :param executor: Ejecutor de concurrent.futures ya configurado; tiene prioridad sobre max_workers.
+        :param db_ops: Instancia de DatabaseOperations a reutilizar (por defecto, la del origen configurado).
+        :param demand_routing: Si es True, las series esporádicas se estiman con Croston/SBA en lugar del motor.
+        :param model_classes: Clases de demanda que se envían al motor de predicción cuando hay enrutamiento.
+        """
+        self.db_ops = db_ops if db_ops is not None else get_database_operations()
+        self.engine = engine
+        self.forecast_days = forecast_days
+        self.max_workers = max_workers
+        self.executor = executor
+        self.demand_routing = demand_routing
+        self.model_classes = tuple(model_classes)
+        self.last_routing_report = None
+        self.last_stage_seconds = None
+        self._report_lock = threading.Lock()  # Publica juntos last_routing_report y last_stage_seconds
+
+    def build_demand_matrix(self):
+        """
+        Construye (o reutiliza) la matriz densa productos × días a partir de la instantánea de ventas.
+        """
+        return self.db_ops.fetch_sales_derived("demand_matrix", DemandMatrix.from_sales)
+
+    def _results(self, forecast_days):
+        """
+        Diccionario de resultados asociado a la versión vigente de la instantánea de ventas y el candado que
+        serializa su llenado; ambos se comparten entre las instancias del servicio y los hilos de la API.
+        :return: Tupla (diccionario {ID de producto: ProductForecast}, candado).
+        """
+        routing = "routed" if self.demand_routing else "direct"
+        return self.db_ops.fetch_sales_derived(f"forecasts:{self.engine}:{routing}:{forecast_days}",
+                                               lambda sales_data: ({}, threading.Lock()))
+
+    def fit_products(self, product_ids, trains, test_steps, future_steps, advance=None):
+        """
+        Clasifica la demanda de cada producto y envía solo las series de las clases configuradas
+        (por defecto, "smooth") al motor de predicción; las series esporádicas o intermitentes se estiman
+        en una sola pasada con Croston/SBA. El reporte de clases y tiempo ahorrado queda en last_routing_report
+        y los segundos por etapa (clasificación, ajuste y predicción) en last_stage_seconds; con un pool de
+        procesos el ajuste y la predicción ARIMA se reportan como la suma de los tiempos de cada producto.
+        :param product_ids: Lista de IDs de producto.
+        :param trains: Lista de series de entrenamiento (una por producto).
+        :param test_steps: Lista con el número de días de prueba de cada producto.
+        :param future_steps: Número de días futuros a predecir.
+        :param advance: Función opcional que recibe cuántos productos se completaron en cada paso.
+        :return: Lista de diccionarios con el formato de fit_product_forecast más la clave 'demand_class'.
+        """
+        stage_seconds = {'classify': 0.0, 'fit': 0.0, 'forecast': 0.0}
+        start = time.perf_counter()
+        classes = classify_demand(trains) if self.demand_routing else np.full(len(trains), "unclassified")
+        stage_seconds['classify'] = time.perf_counter() - start
+        routed_to_model = [not self.demand_routing or demand_class in self.model_classes for demand_class in classes]
+        model_indexes = [i for i, to_model in enumerate(routed_to_model) if to_model]
+        sparse_indexes = [i for i, to_model in enumerate(routed_to_model) if not to_model]
+        results = [None] * len(trains)
+
+        if sparse_indexes:
+            start = time.perf_counter()
+            demand_rate = CrostonSBAEngine().demand_rate([trains[i] for i in sparse_indexes])
+            fitted_at = time.perf_counter()
+            sparse_steps = max([test_steps[i] for i in sparse_indexes] + [future_steps])
+            sparse_forecasts = np.repeat(demand_rate[:, None], sparse_steps, axis=1)
+            stage_seconds['fit'] += fitted_at - start
+            stage_seconds['forecast'] += time.perf_counter() - fitted_at
+            for row, i in enumerate(sparse_indexes):
+                results[i] = {'forecast': sparse_forecasts[row, :test_steps[i]],
+                              'forecast_future': sparse_forecasts[row, :future_steps], 'error': None}
+            if advance is not None:
+                advance(len(sparse_indexes))
+
+        start = time.perf_counter()
+        model_results = self.fit_with_engine(
+            [product_ids[i] for i in model_indexes], [trains[i] for i in model_indexes],
+            [test_steps[i] for i in model_indexes], future_steps, advance
+        ) if model_indexes else []
+        model_seconds = time.perf_counter() - start
+        for i, model_result in zip(model_indexes, model_results):
+            results[i] = model_result
+            stage_seconds['fit'] += model_result.pop('fit_seconds', 0.0)
+            stage_seconds['forecast'] += model_result.pop('forecast_seconds', 0.0)
+
+        for i, result in enumerate(results):
+            result['demand_class'] = str(classes[i])
+
+        seconds_per_model = model_seconds / len(model_indexes) if model_indexes else None
+        routing_report = {
+            'counts': {demand_class: int((classes == demand_class).sum()) for demand_class in DEMAND_CLASSES},
+            'model_products': len(model_indexes),
+            'croston_products': len(sparse_indexes),
+            'model_seconds': model_seconds,
+            'estimated_seconds_saved': (
+                seconds_per_model * len(sparse_indexes) if seconds_per_model is not None else None
+            )
+        }
+        with self._report_lock:
+            self.last_routing_report = routing_report
+            self.last_stage_seconds = stage_seconds
+        return results
+
+    def fit_with_engine(self, product_ids, trains, test_steps, future_steps, advance=None):
+        """
+        Ajusta los modelos de varios productos, en serie, en paralelo o con el motor vectorizado.
+        El motor ARIMA usa el orden seleccionado de cada producto (ver models/order_selection.py);
+        el motor vectorizado mantiene su AR(5) sobre la serie diferenciada.
+        Los resultados conservan el orden de entrada independientemente del ejecutor.
+        :param product_ids: Lista de IDs de producto.
+        :param trains: Lista de series de entrenamiento (una por producto).
+        :param test_steps: Lista con el número de días de prueba de cada producto.
+        :param future_steps: Número de días futuros a predecir.
+        :param advance: Función opcional que recibe cuántos productos se completaron en cada paso.
+        :return: Lista de diccionarios con el formato de fit_product_forecast.
+        """
+        if self.engine == "fast":
+            # Un único ajuste y predicción vectorizados para todos los productos
+            engine = FastAREngine()
+            start = time.perf_counter()
+            coefficients = engine.fit(trains)
+            fitted_at = time.perf_counter()
+            forecasts = engine.forecast(trains, max(list(test_steps) + [future_steps]), coefficients=coefficients)
+            results = [
+                {'forecast': forecasts[i, :test_steps[i]], 'forecast_future': forecasts[i, :future_steps], 'error': None}
+                for i in range(len(trains))
+            ]
+            if results:
+                results[0]['fit_seconds'] = fitted_at - start
+                results[0]['forecast_seconds'] = time.perf_counter() - fitted_at
+            if advance is not None:
+                advance(len(results))
+            return results
+
+        future_steps_list = [future_steps] * len(trains)
+        orders = [get_product_order(product_id) for product_id in product_ids]
+        args = (product_ids, trains, test_steps, future_steps_list, orders)
+        if self.executor is not None:
+            return self._collect(self.executor.map(fit_product_forecast, *args), advance)
+        if self.max_workers == 1 or len(trains) <= 1:
+            return self._collect(map(fit_product_forecast, *args), advance)
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            return self._collect(executor.map(fit_product_forecast, *args), advance)
+
+    @staticmethod
+    def _collect(results, advance):
+        """
+        Recorre los resultados a medida que llegan, informando el avance producto a producto.
+        """
+        if advance is None:
+            return list(results)
+        collected = []
+        for result in results:
+            collected.append(result)
+            advance(1)
+        return collected
+
+    def get_forecasts(self, product_ids, forecast_days=None, progress=None):
+        """
+        Retorna el resultado unificado de varios productos, ajustando solo los que aún no se calcularon
+        para la versión vigente de los datos. Las solicitudes concurrentes sobre la misma versión se serializan,
+        de modo que cada producto se ajusta una sola vez y las demás esperan y reutilizan su resultado.
+        :param product_ids: Lista de IDs de producto.
+        :param forecast_days: Número de días futuros a predecir (por defecto, el configurado en el servicio).
+        :param progress: Función opcional progress(completados, total) invocada a medida que se resuelven los
+                         productos; los que ya estaban calculados cuentan como completados desde el inicio.
+        :return: Lista de ProductForecast en el mismo orden que product_ids.
+        """
+        forecast_days = forecast_days if forecast_days is not None else self.forecast_days
+        results, results_lock = self._results(forecast_days)
+        unique_ids = list(dict.fromkeys(product_ids))
+
+        with results_lock:
+            pending = [product_id for product_id in unique_ids if product_id not in results]
+            done = [len(unique_ids) - len(pending)]
+
+            def report(count):
+                done[0] += count
+                progress(done[0], len(unique_ids))
+
+            advance = report if progress is not None else None
+            if advance is not None:
+                advance(0)
+
+            if pending:
+                demand_matrix = self.build_demand_matrix()
+                histories = [demand_matrix.series(product_id) for product_id in pending]
+                results.update(zip(pending, self.forecast_histories(pending, histories, forecast_days, advance)))
+
+            return [results[product_id] for product_id in product_ids]
+
+    def get_product_forecasts(self, product_ids, forecast_days=None):
+        """
+        Retorna el resultado unificado de pocos productos.
+        Si la instantánea de ventas está vigente (por ejemplo, porque el dashboard ya calculó la matriz), los
+        resultados se toman del mismo diccionario por versión que usa get_forecasts, ajustando solo los que
+        falten; así todas las secciones muestran una misma versión de los datos y cada producto se ajusta una vez.
+        Si no, se leen solo las ventas de esos productos con una consulta por producto
+        (ver DatabaseOperations.fetch_product_sales), sin cargar la instantánea de todo el catálogo.
+        La serie de cada producto es la misma que en la matriz de demanda completa, por lo que el resultado
+        coincide con el de get_forecasts; los modelos ARIMA ajustados se reutilizan desde la caché de modelos.
+        :param product_ids: Lista de IDs de producto.
+        :param forecast_days: Número de días futuros a predecir (por defecto, el configurado en el servicio).
+        :return: Lista de ProductForecast en el mismo orden que product_ids.
+        """
+        forecast_days = forecast_days if forecast_days is not None else self.forecast_days
+        unique_ids = list(dict.fromkeys(product_ids))
+        if not unique_ids:
+            return []
+        if self.db_ops.sales_snapshot_fresh():
+            return self.get_forecasts(product_ids, forecast_days)
+        demand_matrix = DemandMatrix.from_sales(self.db_ops.fetch_product_sales(unique_ids))
+        histories = [demand_matrix.series(product_id) for product_id in unique_ids]
+        results = dict(zip(unique_ids, self.forecast_histories(unique_ids, histories, forecast_days)))
+        return [results[product_id] for product_id in product_ids]
+
+    def get_forecast(self, product_id, forecast_days=None):
+        """
+        Retorna el resultado unificado de un producto (ver get_product_forecasts).
+        :param product_id: ID del producto.
+        :param forecast_days: Número de días futuros a predecir (por defecto, el configurado en el servicio).
+        :return: Instancia de ProductForecast.
+        """
+        return self.get_product_forecasts([product_id], forecast_days)[0]
+
+    def forecast_histories(self, product_ids, histories, forecast_days, advance=None):
+        """
+        Ajusta y evalúa los productos a partir de sus series diarias completas (80% entrenamiento, 20% prueba).
+        :param product_ids: Lista de IDs de producto sin repetidos.
+        :param histories: Lista con la serie diaria de cada producto.
+        :param forecast_days: Número de días futuros a predecir.
+        :param advance: Función opcional que recibe cuántos productos se completaron en cada paso.
+        :return: Lista de ProductForecast en el mismo orden que product_ids.
+        """
+        train_sizes = [int(len(history) * 0.8) for history in histories]  # 80% para entrenamiento
+
+        # Ajustar solo los productos con datos de entrenamiento
+        fit_indexes = [i for i, train_size in enumerate(train_sizes) if train_size > 0]
+        if advance is not None:
+            advance(len(product_ids) - len(fit_indexes))
+        fit_results = dict(zip(fit_indexes, self.fit_products(
+            [product_ids[i] for i in fit_indexes],
+            [histories[i][:train_sizes[i]] for i in fit_indexes],
+            [len(histories[i]) - train_sizes[i] for i in fit_indexes],
+            forecast_days, advance
+        )))
+
+        # Métricas del conjunto de prueba de todos los productos ajustados en una sola operación
+        scored = [i for i, fit_result in fit_results.items()
+                  if fit_result['error'] is None and train_sizes[i] < len(histories[i])]
+        mse, rmse = batch_error_metrics([histories[i][train_sizes[i]:] for i in scored],
+                                        [fit_results[i]['forecast'] for i in scored])
+        error_metrics = {i: {"MSE": mse[row], "RMSE": rmse[row]} for row, i in enumerate(scored)}
+
+        return [self._build_forecast(product_id, histories[i], train_sizes[i], fit_results.get(i),
+                                     error_metrics.get(i, {}))
+                for i, product_id in enumerate(product_ids)]
+
+    def get_accuracy_table(self, horizon=30, n_origins=5, step=7):
+        """
+        Tabla de precisión por producto con orígenes móviles (ver models/backtesting.py),
+        calculada una sola vez por versión de los datos y configuración.
+        :param horizon: Días predichos desde cada corte.
+        :param n_origins: Número máximo de cortes por producto.
+        :param step: Días entre cortes consecutivos.
+        :return: DataFrame con ID_Producto, Clase, Origenes, MSE, RMSE, MAE, MASE y Sesgo.
+        """
+        routing = "routed" if self.demand_routing else "direct"
+        tables = self.db_ops.fetch_sales_derived(f"backtests:{self.engine}:{routing}", lambda sales_data: {})
+        settings = (horizon, n_origins, step)
+        if settings not in tables:
+            backtest = RollingOriginBacktest(engine=self.engine, horizon=horizon, n_origins=n_origins, step=step,
+                                             demand_routing=self.demand_routing, model_classes=self.model_classes)
+            tables[settings] = backtest.run_from_matrix(self.build_demand_matrix())
+        return tables[settings]
+
+    @staticmethod
+    def _build_forecast(product_id, history, train_size, fit_result, error_metrics):
+        """
+        Construye el ProductForecast a partir del resultado del ajuste y sus métricas del conjunto de prueba.
+        """
+        if fit_result is None:
+            return ProductForecast(product_id, history, train_size)
+        if fit_result['error'] is not None:
+            print(f"Error al ajustar el modelo ARIMA del producto {product_id}: {fit_result['error']}")
+            return ProductForecast(product_id, history, train_size, error=fit_result['error'],
+                                   demand_class=fit_result.get('demand_class'))
+
+        return ProductForecast(product_id, history, train_size, backtest=fit_result['forecast'],
+                               future=fit_result['forecast_future'], error_metrics=error_metrics,
+                               demand_class=fit_result.get('demand_class'))
@@ -0,0 +1,367 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import hashlib
+import json
+import pickle
+import threading
+from collections import OrderedDict
+import numpy as np
+from statsmodels.tsa.arima.model import ARIMA
+
+
+class ModelCache:
+    """
+    Caché de modelos ARIMA ajustados con dos niveles: un LRU en memoria y un directorio en disco.
+    Las entradas se identifican por producto, huella de la serie de entrenamiento y orden del modelo,
+    de modo que se reutiliza el modelo ajustado (no la predicción) para cualquier horizonte.
+    Cada entrada guarda solo los parámetros estimados (unos cientos de bytes en lugar de varios MB del
+    resultado completo); al recuperarla, el modelo se reconstruye con `ARIMA(train, order).filter(params)`,
+    que recorre el filtro de Kalman sin volver a optimizar y retorna el mismo resultado.
+    Cuando la serie solo crece con días nuevos, el último modelo del producto se extiende con las
+    nuevas observaciones sin volver a optimizar sus parámetros.
+    """
+
+    def __init__(self, cache_dir=os.path.join("data", "model_cache"), max_memory_bytes=64 * 1024 * 1024,
+                 max_disk_bytes=512 * 1024 * 1024, refit_every_obs=30, drift_tolerance=1.5):
+        """
+        Inicializa la caché de modelos.
+        :param cache_dir: Directorio donde se guardan los parámetros serializados.
+        :param max_memory_bytes: Tamaño máximo en bytes de las entradas del LRU en memoria.
+        :param max_disk_bytes: Tamaño máximo en bytes del directorio de caché; se eliminan los archivos menos usados.
+        :param refit_every_obs: Observaciones añadidas por extensión tras las cuales se fuerza un reajuste completo
+                                (None desactiva el reajuste programado).
+        :param drift_tolerance: Razón máxima entre el RMSE de los errores a un paso de los días nuevos y el RMSE
+                                de los residuos del último ajuste completo antes de forzar un reajuste.
+        """
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.refit_every_obs = refit_every_obs
+        self.drift_tolerance = drift_tolerance
+        self._memory = OrderedDict()  # clave -> (entrada, bytes)
+        self._memory_bytes = 0
+        # Archivos en disco ordenados por último uso y su tamaño total; se listan una sola vez por directorio
+        self._disk_index = OrderedDict()  # ruta -> bytes
+        self._disk_bytes = 0
+        self._disk_dir = None
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.extensions = 0
+        self.refits = 0
+
+    @staticmethod
+    def make_key(product_id, series, order):
+        """
+        Genera la clave de caché a partir del producto, la serie de entrenamiento y el orden del modelo.
+        :param product_id: ID del producto.
+        :param series: Serie diaria de entrenamiento.
+        :param order: Tupla (p, d, q) del modelo ARIMA.
+        :return: Cadena hexadecimal que identifica la entrada.
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{product_id}|{tuple(order)}|{len(series)}".encode())
+        if len(series):
+            digest.update(str(series.index[0]).encode())
+        digest.update(np.ascontiguousarray(series.to_numpy(dtype=np.float64)).tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key, train, order):
+        """
+        Busca los parámetros de un modelo primero en memoria y luego en disco y reconstruye el modelo ajustado.
+        :param key: Clave generada con make_key.
+        :param train: Serie diaria de entrenamiento con la que se generó la clave.
+        :param order: Tupla (p, d, q) del modelo ARIMA.
+        :return: Resultado ARIMA ajustado o None si no existe.
+        """
+        entry = self._get_entry(key)
+        if entry is None:
+            return None
+        try:
+            return ARIMA(train, order=order).filter(entry['params'])
+        except Exception as e:
+            print(f"Error al reconstruir el modelo en caché: {e}")
+            return None
+
+    def _get_entry(self, key):
+        """
+        Retorna la entrada guardada ({'params', 'order'}) o None, actualizando su uso en ambos niveles.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key][0]
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cache_file:
+                entry = pickle.load(cache_file)
+            if not isinstance(entry, dict) or 'params' not in entry:
+                raise ValueError("formato de entrada no reconocido")
+            os.utime(path)  # Marcar el archivo como usado recientemente (para otros procesos)
+        except FileNotFoundError:
+            entry = None
+        except Exception as e:
+            print(f"Error al leer el modelo en caché '{path}': {e}")
+            self._remove(path)
+            with self._lock:
+                self._disk_bytes -= self._disk_index.pop(path, 0)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, entry)
+            if path in self._disk_index:
+                self._disk_index.move_to_end(path)
+            return entry
+
+    def put(self, key, fitted_model):
+        """
+        Guarda los parámetros de un modelo ajustado en memoria y en disco, aplicando los límites de tamaño.
+        :param key: Clave generada con make_key.
+        :param fitted_model: Resultado ARIMA ajustado.
+        """
+        entry = {'params': np.asarray(fitted_model.params, dtype=np.float64),
+                 'order': tuple(fitted_model.model.order)}
+        with self._lock:
+            self._remember(key, entry)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as cache_file:
+                pickle.dump(entry, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, path)  # Escritura atómica, segura entre procesos
+            with self._lock:
+                self._track_disk(path, size)
+        except Exception as e:
+            print(f"Error al guardar el modelo en caché: {e}")
+
+    def get_or_fit(self, product_id, train, order=(5, 1, 0)):
+        """
+        Retorna el modelo ARIMA ajustado para la serie indicada. Si no está en caché, intenta extender
+        el último modelo del producto con los días nuevos y solo como último recurso lo ajusta desde cero.
+        :param product_id: ID del producto.
+        :param train: Serie diaria de entrenamiento.
+        :param order: Tupla (p, d, q) del modelo ARIMA.
+        :return: Resultado ARIMA ajustado.
+        """
+        key = self.make_key(product_id, train, order)
+        fitted_model = self.get(key, train, order)
+        if fitted_model is not None:
+            return fitted_model
+
+        lineage = self._read_lineage(product_id, order)
+        extended = self.extend(product_id, train, order, lineage)
+        if extended is not None:
+            fitted_model, lineage = extended
+        else:
+            fitted_model = ARIMA(train, order=order).fit()
+            lineage = {'appended_obs': 0, 'resid_rmse': self._resid_rmse(fitted_model, order)}
+            with self._lock:
+                self.refits += 1
+
+        self.put(key, fitted_model)
+        lineage.update({'key': key, 'n_obs': len(train), 'start': str(train.index[0])})
+        self._write_lineage(product_id, order, lineage)
+        return fitted_model
+
+    def extend(self, product_id, train, order, lineage):
+        """
+        Extiende el último modelo del producto con las observaciones nuevas usando `append(refit=False)`,
+        que reutiliza los parámetros estimados y solo actualiza el estado del filtro.
+        Devuelve None cuando corresponde un reajuste completo: no hay modelo previo, la serie histórica
+        cambió, se alcanzó el calendario de reajuste o el error en los días nuevos se desvió demasiado.
+        :param product_id: ID del producto.
+        :param train: Serie diaria de entrenamiento completa (historia previa más días nuevos).
+        :param order: Tupla (p, d, q) del modelo ARIMA.
+        :param lineage: Metadatos del último modelo del producto o None.
+        :return: Tupla (modelo extendido, metadatos actualizados) o None.
+        """
+        if lineage is None or len(train) <= lineage['n_obs'] or str(train.index[0]) != lineage['start']:
+            return None
+        new_obs = len(train) - lineage['n_obs']
+        if self.refit_every_obs is not None and lineage['appended_obs'] + new_obs > self.refit_every_obs:
+            return None
+        # La historia ya conocida debe coincidir exactamente con la del modelo previo
+        if self.make_key(product_id, train[:lineage['n_obs']], order) != lineage['key']:
+            return None
+        base_model = self.get(lineage['key'], train[:lineage['n_obs']], order)
+        if base_model is None:
+            return None
+
+        try:
+            fitted_model = base_model.append(train[lineage['n_obs']:], refit=False)
+        except Exception as e:
+            print(f"Error al extender el modelo del producto {product_id}: {e}")
+            return None
+
+        # Los residuos de los días nuevos son errores de predicción a un paso
+        new_errors = np.asarray(fitted_model.resid)[-new_obs:]
+        new_rmse = float(np.sqrt(np.mean(new_errors ** 2)))
+        if lineage['resid_rmse'] and new_rmse > self.drift_tolerance * lineage['resid_rmse']:
+            return None
+
+        with self._lock:
+            self.extensions += 1
+        return fitted_model, {
+            'appended_obs': lineage['appended_obs'] + new_obs,
+            'resid_rmse': lineage['resid_rmse']
+        }
+
+    @staticmethod
+    def _resid_rmse(fitted_model, order):
+        """
+        RMSE de los residuos del ajuste, descartando las primeras observaciones sin historia suficiente.
+        """
+        resid = np.asarray(fitted_model.resid)[order[0] + order[1]:]
+        return float(np.sqrt(np.mean(resid ** 2))) if len(resid) else 0.0
+
+    def _lineage_path(self, product_id, order):
+        name = hashlib.sha1(f"{product_id}|{tuple(order)}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, "lineage", f"{name}.json")
+
+    def _read_lineage(self, product_id, order):
+        """
+        Lee los metadatos del último modelo guardado para el producto y orden indicados.
+        """
+        try:
+            with open(self._lineage_path(product_id, order), 'r') as lineage_file:
+                return json.load(lineage_file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_lineage(self, product_id, order, lineage):
+        """
+        Guarda los metadatos del último modelo del producto de forma atómica.
+        """
+        try:
+            path = self._lineage_path(product_id, order)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w') as lineage_file:
+                json.dump(lineage, lineage_file)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"Error al guardar los metadatos del modelo en caché: {e}")
+
+    def clear(self):
+        """
+        Elimina todas las entradas de la caché en memoria y en disco.
+        """
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._disk_index.clear()
+            self._disk_bytes = 0
+            self._disk_dir = None
+        if os.path.isdir(self.cache_dir):
+            for file_name in os.listdir(self.cache_dir):
+                if file_name.endswith('.pkl'):
+                    self._remove(os.path.join(self.cache_dir, file_name))
+        lineage_dir = os.path.join(self.cache_dir, "lineage")
+        if os.path.isdir(lineage_dir):
+            for file_name in os.listdir(lineage_dir):
+                self._remove(os.path.join(lineage_dir, file_name))
+
+    def stats(self):
+        """
+        Reporta aciertos, fallos y ocupación de la caché.
+        :return: Diccionario con contadores y tamaños.
+        """
+        with self._lock:
+            self._load_disk_index()
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'extensions': self.extensions,
+                'refits': self.refits,
+                'memory_items': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_items': len(self._disk_index),
+                'disk_bytes': self._disk_bytes
+            }
+
+    def _remember(self, key, entry):
+        """
+        Inserta en el LRU en memoria y descarta las entradas menos usadas hasta respetar max_memory_bytes.
+        Requiere el candado.
+        """
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key)[1]
+        size = entry['params'].nbytes + len(key) + 200  # Parámetros, clave y estructura de la entrada
+        self._memory[key] = (entry, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes and self._memory:
+            self._memory_bytes -= self._memory.popitem(last=False)[1][1]
+
+    def _disk_files(self):
+        """
+        Lista los modelos en disco como tuplas (ruta, tamaño, fecha de último uso).
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        files = []
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith('.pkl'):
+                continue
+            path = os.path.join(self.cache_dir, file_name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def _load_disk_index(self):
+        """
+        Lista el directorio una sola vez (o tras cambiar cache_dir) para conocer los archivos y su tamaño total.
+        A partir de ahí el índice se mantiene de forma incremental. Requiere el candado.
+        """
+        if self._disk_dir == self.cache_dir:
+            return
+        files = sorted(self._disk_files(), key=lambda item: item[2])
+        self._disk_index = OrderedDict((path, size) for path, size, _ in files)
+        self._disk_bytes = sum(self._disk_index.values())
+        self._disk_dir = self.cache_dir
+
+    def _track_disk(self, path, size):
+        """
+        Registra un archivo escrito y elimina los menos usados hasta respetar max_disk_bytes. Requiere el candado.
+        Los archivos escritos por otros procesos se contabilizan al volver a listar el directorio.
+        """
+        self._load_disk_index()
+        self._disk_bytes += size - self._disk_index.pop(path, 0)
+        self._disk_index[path] = size
+        while self._disk_bytes > self.max_disk_bytes and len(self._disk_index) > 1:
+            old_path, old_size = self._disk_index.popitem(last=False)
+            self._remove(old_path)
+            self._disk_bytes -= old_size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# Instancia compartida por todo el proceso
+model_cache = ModelCache()
+# Ajustes del backtesting en su propio directorio y con su propio límite: se entrenan sobre cortes de la serie
+# que producción nunca consulta y, en la caché compartida, desplazarían a los modelos de producción
+backtest_model_cache = ModelCache(cache_dir=os.path.join("data", "model_cache", "backtest"),
+                                  max_memory_bytes=16 * 1024 * 1024, max_disk_bytes=128 * 1024 * 1024)
@@ -0,0 +1,292 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+from statsmodels.tsa.arima.model import ARIMA
+from statsmodels.tsa.stattools import kpss
+from db.db_operations import get_database_operations
+from models.demand_classification import classify_demand
+from models.demand_matrix import DemandMatrix
+
+DEFAULT_ORDER = (5, 1, 0)
+ORDERS_PATH = os.path.join("data", "model_orders.json")
+# Nivel de significancia de la prueba KPSS que decide cuántas veces diferenciar la serie
+KPSS_ALPHA = 0.05
+
+_orders_lock = threading.Lock()
+_orders_cache = {'mtime': None, 'orders': {}}
+
+
+def load_product_orders(path=ORDERS_PATH):
+    """
+    Carga los órdenes ARIMA seleccionados por producto, releyendo el archivo solo si cambió.
+    :param path: Ruta del archivo JSON con los órdenes.
+    :return: Diccionario {str(ID_Producto): (p, d, q)}.
+    """
+    with _orders_lock:
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return {}
+        if _orders_cache['mtime'] != (path, mtime):
+            with open(path, 'r') as orders_file:
+                stored = json.load(orders_file)
+            _orders_cache['orders'] = {product_id: tuple(entry['order']) for product_id, entry in stored.items()}
+            _orders_cache['mtime'] = (path, mtime)
+        return _orders_cache['orders']
+
+
+def get_product_order(product_id, path=ORDERS_PATH):
+    """
+    Retorna el orden seleccionado para un producto o el orden por defecto (5, 1, 0).
+    """
+    return load_product_orders(path).get(str(product_id), DEFAULT_ORDER)
+
+
+def evaluate_candidate(train, order, warm_params=None, criterion="aic"):
+    """
+    Ajusta un orden candidato y retorna su criterio de información.
+    Es una función de módulo para que pueda ejecutarse dentro de un pool de procesos.
+    :param train: Serie diaria de entrenamiento.
+    :param order: Tupla (p, d, q) candidata.
+    :param warm_params: Parámetros del vecino ya ajustado ({nombre: valor}) para iniciar la optimización.
+    :param criterion: Criterio de información: "aic", "bic" o "aicc".
+    :return: Tupla (orden, valor del criterio, parámetros {nombre: valor}); el criterio es inf si el ajuste falla.
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model = ARIMA(train, order=order)
+            start_params = None
+            if warm_params:
+                # Iniciar desde los parámetros del vecino que compartan nombre (ar.L1, ma.L1, sigma2, ...)
+                start_params = np.array([
+                    warm_params.get(name, default)
+                    for name, default in zip(model.param_names, model.start_params)
+                ])
+            fitted_model = model.fit(start_params=start_params)
+        return order, float(getattr(fitted_model, criterion)), dict(zip(model.param_names, fitted_model.params))
+    except Exception:
+        return order, float('inf'), None
+
+
+def select_differencing(train, max_d=2, alpha=KPSS_ALPHA):
+    """
+    Elige el orden de diferenciación con pruebas KPSS sucesivas, como ndiffs en auto.arima:
+    la serie se diferencia mientras la prueba rechace la estacionariedad, hasta max_d veces.
+    Los criterios de información de modelos con distinto d no son comparables (se calculan sobre
+    series distintas), por lo que d se fija antes de buscar p y q.
+    :param train: Serie diaria de entrenamiento.
+    :param max_d: Máximo orden de diferenciación.
+    :param alpha: Nivel de significancia de la prueba.
+    :return: Orden de diferenciación d.
+    """
+    values = np.asarray(train, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    for d in range(max_d):
+        if len(values) < 3 or np.ptp(values) == 0:
+            return d  # Una serie constante ya es estacionaria
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")  # El p-valor fuera de la tabla de KPSS solo genera una advertencia
+                p_value = kpss(values, regression="c", nlags="auto")[1]
+        except Exception:
+            return d
+        if p_value >= alpha:
+            return d
+        values = np.diff(values)
+    return max_d
+
+
+def search_order(train, max_p=5, max_d=2, max_q=2, criterion="aic", max_steps=10, prune_margin=10.0, map_fn=map):
+    """
+    Búsqueda escalonada del orden (p, d, q) dentro de un espacio acotado.
+    El orden de diferenciación d se fija primero con select_differencing y luego solo se buscan p y q.
+    En cada paso se evalúan, con `map_fn`, los vecinos (±1 en p o q) de los mejores candidatos;
+    los candidatos cuyo criterio supera al mejor en más de `prune_margin` no se expanden y la búsqueda
+    se detiene en cuanto un paso no mejora el criterio. Cada vecino inicia su optimización desde
+    los parámetros del candidato que lo generó.
+    :param train: Serie diaria de entrenamiento.
+    :param max_p: Máximo orden autorregresivo.
+    :param max_d: Máximo orden de diferenciación.
+    :param max_q: Máximo orden de media móvil.
+    :param criterion: Criterio de información: "aic", "bic" o "aicc".
+    :param max_steps: Número máximo de pasos de expansión.
+    :param prune_margin: Margen sobre el mejor criterio a partir del cual se descartan candidatos.
+    :param map_fn: Función tipo map usada para evaluar los candidatos de cada paso (p. ej. executor.map).
+    :return: Tupla (mejor orden, valor del criterio).
+    """
+    d = select_differencing(train, max_d)
+
+    def clip(order):
+        return (min(max(order[0], 0), max_p), d, min(max(order[2], 0), max_q))
+
+    initial = list(dict.fromkeys(clip(order) for order in [DEFAULT_ORDER, (2, 1, 2), (1, 1, 0), (0, 1, 1), (0, 1, 0)]))
+    frontier = [(order, None) for order in initial]
+    evaluated = {}
+    best_order, best_value = clip(DEFAULT_ORDER), float('inf')
+
+    for _ in range(max_steps + 1):
+        if not frontier:
+            break
+        results = list(map_fn(
+            evaluate_candidate, [train] * len(frontier), [order for order, _ in frontier],
+            [params for _, params in frontier], [criterion] * len(frontier)
+        ))
+        for order, value, params in results:
+            evaluated[order] = (value, params)
+
+        step_best = min(results, key=lambda result: result[1])
+        if step_best[1] >= best_value:
+            break  # Parada temprana: el paso no mejoró el criterio
+        best_order, best_value = step_best[0], step_best[1]
+
+        # Expandir solo los candidatos que no fueron podados por el criterio
+        frontier = []
+        for order, value, params in results:
+            if value > best_value + prune_margin or params is None:
+                continue
+            for axis in (0, 2):
+                for delta in (-1, 1):
+                    neighbour = list(order)
+                    neighbour[axis] += delta
+                    neighbour = clip(neighbour)
+                    if neighbour not in evaluated and neighbour not in [candidate for candidate, _ in frontier]:
+                        frontier.append((neighbour, params))
+
+    return best_order, best_value
+
+
+def _search_product_order(train, max_p, max_d, max_q, criterion, max_steps, prune_margin):
+    """
+    Envoltorio de search_order para ejecutarse en un proceso por producto.
+    """
+    return search_order(train, max_p, max_d, max_q, criterion, max_steps, prune_margin)
+
+
+class OrderSelector:
+    """
+    Selección automática del orden ARIMA por producto.
+    Los órdenes elegidos se guardan en disco para que los ajustes posteriores usen solo el modelo seleccionado.
+    """
+
+    def __init__(self, max_p=5, max_d=2, max_q=2, criterion="aic", max_steps=10, prune_margin=10.0,
+                 max_workers=1, orders_path=ORDERS_PATH):
+        """
+        :param max_p: Máximo orden autorregresivo.
+        :param max_d: Máximo orden de diferenciación.
+        :param max_q: Máximo orden de media móvil.
+        :param criterion: Criterio de información: "aic", "bic" o "aicc".
+        :param max_steps: Número máximo de pasos de expansión por producto.
+        :param prune_margin: Margen sobre el mejor criterio a partir del cual se descartan candidatos.
+        :param max_workers: Número de procesos para la búsqueda (1 = ejecución en serie, None = todos los núcleos).
+        :param orders_path: Ruta del archivo JSON donde se guardan los órdenes seleccionados.
+        """
+        self.max_p = max_p
+        self.max_d = max_d
+        self.max_q = max_q
+        self.criterion = criterion
+        self.max_steps = max_steps
+        self.prune_margin = prune_margin
+        self.max_workers = max_workers
+        self.orders_path = orders_path
+
+    def _search_args(self):
+        return self.max_p, self.max_d, self.max_q, self.criterion, self.max_steps, self.prune_margin
+
+    def select_order(self, product_id, train):
+        """
+        Selecciona y guarda el orden de un producto, evaluando en paralelo los candidatos de cada paso.
+        :param product_id: ID del producto.
+        :param train: Serie diaria de entrenamiento.
+        :return: Tupla (p, d, q) seleccionada.
+        """
+        if self.max_workers == 1:
+            order, value = search_order(train, *self._search_args())
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                order, value = search_order(train, *self._search_args(), map_fn=executor.map)
+        self.save_orders({product_id: (order, value)})
+        return order
+
+    def select_orders(self, product_ids, trains):
+        """
+        Selecciona y guarda el orden de varios productos, repartiendo los productos entre procesos.
+        :param product_ids: Lista de IDs de producto.
+        :param trains: Lista de series de entrenamiento (una por producto).
+        :return: Diccionario {ID_Producto: (p, d, q)}.
+        """
+        args = [[arg] * len(trains) for arg in self._search_args()]
+        if self.max_workers == 1 or len(trains) <= 1:
+            results = list(map(_search_product_order, trains, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(_search_product_order, trains, *args))
+        selected = dict(zip(product_ids, results))
+        self.save_orders(selected)
+        return {product_id: order for product_id, (order, _) in selected.items()}
+
+    def save_orders(self, selected):
+        """
+        Agrega los órdenes seleccionados al archivo JSON de forma atómica.
+        :param selected: Diccionario {ID_Producto: ((p, d, q), valor del criterio)}.
+        """
+        stored = {}
+        if os.path.exists(self.orders_path):
+            with open(self.orders_path, 'r') as orders_file:
+                stored = json.load(orders_file)
+        selected_at = datetime.now().isoformat(timespec='seconds')
+        for product_id, (order, value) in selected.items():
+            stored[str(product_id)] = {
+                'order': list(order),
+                'criterion': self.criterion,
+                'value': value if np.isfinite(value) else None,
+                'selected_at': selected_at
+            }
+        os.makedirs(os.path.dirname(self.orders_path) or ".", exist_ok=True)
+        temp_path = f"{self.orders_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as orders_file:
+            json.dump(stored, orders_file, indent=2)
+        os.replace(temp_path, self.orders_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Selecciona el orden ARIMA de cada producto y lo guarda en data/model_orders.json.")
+    parser.add_argument("--products", type=int, nargs="+",
+                        help="IDs de producto (por defecto, todos los que se predicen con ARIMA).")
+    parser.add_argument("--criterion", default="aic", choices=["aic", "bic", "aicc"])
+    parser.add_argument("--max-workers", type=int, default=1, help="Procesos para la búsqueda.")
+    parser.add_argument("--orders-path", default=ORDERS_PATH, help="Archivo JSON de salida.")
+    args = parser.parse_args(argv)
+
+    demand_matrix = get_database_operations().fetch_sales_derived("demand_matrix", DemandMatrix.from_sales)
+    product_ids = args.products if args.products else demand_matrix.product_ids.tolist()
+    # Mismo 80% de entrenamiento que usa ForecastService al ajustar los modelos
+    histories = [demand_matrix.series(product_id) for product_id in product_ids]
+    trains = [history[:int(len(history) * 0.8)] for history in histories]
+    if not args.products:
+        # Los productos esporádicos se predicen con Croston/SBA y no necesitan orden ARIMA
+        classes = classify_demand(trains)
+        selected = [i for i, demand_class in enumerate(classes) if demand_class == "smooth"]
+        product_ids, trains = [product_ids[i] for i in selected], [trains[i] for i in selected]
+    selected = [i for i, train in enumerate(trains) if len(train) > 0]
+    product_ids, trains = [product_ids[i] for i in selected], [trains[i] for i in selected]
+    if not product_ids:
+        print("No hay productos con ventas para seleccionar su orden.")
+        return
+
+    selector = OrderSelector(criterion=args.criterion, max_workers=args.max_workers, orders_path=args.orders_path)
+    orders = selector.select_orders(product_ids, trains)
+    print(f"Órdenes seleccionados para {len(orders)} productos en {args.orders_path}.")
+
+
+if __name__ == "__main__":
+    main()
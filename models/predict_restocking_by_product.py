@@ -2,8 +2,7 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import pandas as pd
-from statsmodels.tsa.arima.model import ARIMA
-from db.db_operations import DatabaseOperations
+from db.db_operations import get_database_operations
 from models.compare_sales_and_predictions import CompareSalesAndPredictions
 
 
@@ -12,42 +11,40 @@ class PredictRestockingByProduct:
     Clase para predecir la cantidad de reposición por producto y generar un gráfico de barras.
     """
 
-    def __init__(self):
+    def __init__(self, engine="statsmodels", db_ops=None):
         """
         Inicializa la clase y establece la conexión a la base de datos.
+        :param engine: Motor de predicción: "statsmodels" (ARIMA) o "fast" (AR vectorizado por lotes).
+        :param db_ops: Instancia de DatabaseOperations a reutilizar (por defecto, la del origen configurado).
         """
-        self.db_ops = DatabaseOperations()
-        self.prediction_by_date = CompareSalesAndPredictions()
+        self.db_ops = db_ops if db_ops is not None else get_database_operations()
+        self.prediction_by_date = CompareSalesAndPredictions(engine=engine, db_ops=self.db_ops)
 
     def fetch_inventory_data(self):
         """
         Extrae datos de inventario desde la base de datos.
         :return: DataFrame con los datos de inventario.
         """
-        return self.db_ops.fetch_inventory_data()
+        return self.db_ops.fetch_inventory_snapshot()
 
     def fetch_sales_data(self):
         """
         Extrae datos de ventas desde la base de datos.
         :return: DataFrame con los datos de ventas.
         """
-        return self.db_ops.fetch_sales_data()
+        return self.db_ops.fetch_sales_snapshot()
 
     def predict_restocking_by_product(self, forecast_days=30):
         inventory_data = self.fetch_inventory_data()
-        sales_data = self.fetch_sales_data()
-        sales_data = self.prediction_by_date.preprocess_sales_data(sales_data)
-
-        restocking_data = []
-        for product_id in inventory_data['ID_Producto'].unique():
-            forecast_df, _ = self.prediction_by_date.predict_by_date(product_id, forecast_days)
-            total_restocking = forecast_df['Predicción'].sum()
-
-            product_name = inventory_data[inventory_data['ID_Producto'] == product_id]['Nombre_Producto'].values[0]
-            restocking_data.append({
-                'ID_Producto': product_id,
-                'Producto': product_name,
-                'Cantidad': total_restocking
-            })
-
-        return pd.DataFrame(restocking_data)
+
+        # Un producto por fila, con su nombre, en el orden de la primera aparición en el inventario
+        products = inventory_data.drop_duplicates('ID_Producto')
+        product_ids = products['ID_Producto'].to_numpy()
+        # Resultados unificados de todos los productos (se reutilizan los ajustes ya calculados)
+        forecasts = self.prediction_by_date.forecast_service.get_forecasts(product_ids, forecast_days)
+
+        return pd.DataFrame({
+            'ID_Producto': product_ids,
+            'Producto': products['Nombre_Producto'].to_numpy(),
+            'Cantidad': [product_forecast.restocking_total for product_forecast in forecasts]
+        })
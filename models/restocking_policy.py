@@ -0,0 +1,128 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import numpy as np
+import pandas as pd
+
+POLICY_PATH = os.path.join("data", "restocking_policy.json")
+DEFAULT_MINIMUM = 10
+MODERATE_MARGIN = 5
+
+STATUS_ORDER = {"Urgente": 0, "Moderada": 1, "Adecuado": 2, "No prioritario": 3}
+
+MATRIX_COLUMNS = [
+    "Código del Equipo",
+    "Descripción del Equipo",
+    "Inventario Actual",
+    "Cantidad Mínima Requerida",
+    "Cantidad Recomendada de Reposición",
+    "Estado de Reposición",
+    "Frecuencia de Uso",
+    "MSE",
+    "RMSE"
+]
+
+
+class RestockingPolicy:
+    """
+    Política de reposición aplicada a todo el catálogo con operaciones sobre columnas completas.
+    A partir del total predicho y el inventario de cada producto calcula el estado, la cantidad
+    recomendada y el orden de prioridad. El mínimo requerido se toma, en este orden, del producto,
+    de su categoría o del valor por defecto.
+    """
+
+    def __init__(self, default_minimum=DEFAULT_MINIMUM, moderate_margin=MODERATE_MARGIN, product_minimums=None,
+                 category_minimums=None):
+        """
+        :param default_minimum: Cantidad mínima requerida cuando no hay un valor por producto ni por categoría.
+        :param moderate_margin: Unidades sobre el mínimo por debajo de las cuales la reposición es "Moderada".
+        :param product_minimums: Diccionario {ID_Producto: mínimo}; las claves pueden ser enteros o texto
+                                 (como en el JSON de configuración).
+        :param category_minimums: Diccionario {Categoria: mínimo}.
+        """
+        self.default_minimum = default_minimum
+        self.moderate_margin = moderate_margin
+        # Claves enteras una sola vez, para mapear la columna ID_Producto (int32) sin convertirla a texto
+        self.product_minimums = {int(product_id): minimum for product_id, minimum in (product_minimums or {}).items()}
+        self.category_minimums = dict(category_minimums or {})
+
+    @classmethod
+    def from_config(cls, path=POLICY_PATH):
+        """
+        Crea la política desde un archivo JSON con las claves opcionales "default_minimum", "moderate_margin",
+        "product_minimums" y "category_minimums"; si el archivo no existe se usan los valores por defecto.
+        :param path: Ruta del archivo de configuración.
+        :return: Instancia de RestockingPolicy.
+        """
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r') as policy_file:
+            config = json.load(policy_file)
+        return cls(
+            default_minimum=config.get("default_minimum", DEFAULT_MINIMUM),
+            moderate_margin=config.get("moderate_margin", MODERATE_MARGIN),
+            product_minimums=config.get("product_minimums"),
+            category_minimums=config.get("category_minimums")
+        )
+
+    def minimums(self, inventory_data):
+        """
+        Calcula la cantidad mínima requerida de cada fila del inventario.
+        :param inventory_data: DataFrame con 'ID_Producto' y, opcionalmente, 'Categoria'.
+        :return: Arreglo de enteros con el mínimo de cada fila.
+        """
+        minimums = pd.Series(np.nan, index=inventory_data.index)
+        if self.product_minimums:
+            minimums = inventory_data['ID_Producto'].map(self.product_minimums)
+        if self.category_minimums and 'Categoria' in inventory_data.columns:
+            minimums = minimums.fillna(inventory_data['Categoria'].astype(object).map(self.category_minimums))
+        return minimums.fillna(self.default_minimum).to_numpy(dtype=np.int64)
+
+    def evaluate(self, inventory_data, forecast_totals, frequencies, mse=None, rmse=None):
+        """
+        Genera la matriz de reposición ordenada por prioridad (estado y frecuencia de uso).
+        :param inventory_data: DataFrame con una fila por producto: 'ID_Producto', 'Nombre_Producto',
+                               'Stock_Actual' y 'Categoria'.
+        :param forecast_totals: Arreglo con la cantidad total predicha de cada fila (0 si no hay predicción).
+        :param frequencies: Arreglo con las unidades vendidas históricamente por cada fila.
+        :param mse: Arreglo con el MSE del backtest de cada fila (None/NaN si no aplica).
+        :param rmse: Arreglo con el RMSE del backtest de cada fila (None/NaN si no aplica).
+        :return: DataFrame con las columnas de la matriz de reposición, sin la frecuencia de uso.
+        """
+        n_products = len(inventory_data)
+        stock = inventory_data['Stock_Actual'].to_numpy()
+        minimum = self.minimums(inventory_data)
+        # Igual que int(): trunca hacia cero, por lo que totales entre -1 y 1 cuentan como "sin demanda"
+        predicted = np.trunc(np.asarray(forecast_totals, dtype=np.float64)).astype(np.int64)
+        below_minimum = stock < minimum
+        no_demand = predicted == 0
+
+        status = np.select(
+            [no_demand & below_minimum, no_demand, below_minimum, stock < minimum + self.moderate_margin],
+            ["No prioritario", "Adecuado", "Urgente", "Moderada"],
+            default="Adecuado"
+        )
+        recommended = np.select(
+            [status == "Adecuado", no_demand],
+            [0, minimum - stock],
+            default=predicted
+        ).astype(np.int64)
+
+        restocking_df = pd.DataFrame({
+            "Código del Equipo": inventory_data['ID_Producto'].to_numpy(),
+            "Descripción del Equipo": inventory_data['Nombre_Producto'].to_numpy(),
+            "Inventario Actual": stock,
+            "Cantidad Mínima Requerida": minimum,
+            "Cantidad Recomendada de Reposición": recommended,
+            "Estado de Reposición": status.astype(object),
+            "Frecuencia de Uso": np.asarray(frequencies, dtype=np.float64),
+            "MSE": np.asarray(mse if mse is not None else [np.nan] * n_products, dtype=np.float64),
+            "RMSE": np.asarray(rmse if rmse is not None else [np.nan] * n_products, dtype=np.float64)
+        }, columns=MATRIX_COLUMNS)
+
+        # Prioridad: primero el estado y, dentro de cada estado, la mayor frecuencia de uso
+        priority = np.lexsort((-restocking_df["Frecuencia de Uso"].to_numpy(),
+                               restocking_df["Estado de Reposición"].map(STATUS_ORDER).to_numpy()))
+        return restocking_df.iloc[priority].drop(columns=["Frecuencia de Uso"])
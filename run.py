@@ -0,0 +1,91 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from db.results_store import ResultsStore
+from models.generate_restocking_matrix import RestockingMatrix
+
+
+def build_result_rows(restocking_df, forecasts):
+    """
+    Convierte la matriz de reposición y las predicciones en las filas de las tablas de resultados.
+    :param restocking_df: DataFrame devuelto por RestockingMatrix.generate_matrix() (ordenado por prioridad).
+    :param forecasts: Lista de ProductForecast en el mismo orden que la matriz.
+    :return: Tupla (filas de restocking_matrix, filas de product_forecasts).
+    """
+    matrix_rows = pd.DataFrame({
+        'ID_Producto': restocking_df["Código del Equipo"].to_numpy(),
+        'Nombre_Producto': restocking_df["Descripción del Equipo"].to_numpy(),
+        'Stock_Actual': restocking_df["Inventario Actual"].to_numpy(),
+        'Cantidad_Minima': restocking_df["Cantidad Mínima Requerida"].to_numpy(),
+        'Cantidad_Reposicion': restocking_df["Cantidad Recomendada de Reposición"].to_numpy(),
+        'Estado_Reposicion': restocking_df["Estado de Reposición"].to_numpy(),
+        'Prioridad': np.arange(1, len(restocking_df) + 1),
+        'Prediccion_Total': [float(product_forecast.restocking_total) for product_forecast in forecasts],
+        'MSE': restocking_df["MSE"].to_numpy(),
+        'RMSE': restocking_df["RMSE"].to_numpy()
+    })
+
+    # Predicciones futuras en formato largo (una fila por producto y día)
+    fitted = [product_forecast for product_forecast in forecasts if product_forecast.fitted]
+    if not fitted:
+        return matrix_rows, pd.DataFrame(columns=['ID_Producto', 'Fecha', 'Prediccion'])
+    horizons = np.array([len(product_forecast.future) for product_forecast in fitted])
+    first_dates = np.array([product_forecast.train.index[-1] + pd.Timedelta(days=1) for product_forecast in fitted],
+                           dtype='datetime64[ns]')
+    day_offsets = np.arange(horizons.sum()) - np.repeat(np.cumsum(horizons) - horizons, horizons)
+    forecast_rows = pd.DataFrame({
+        'ID_Producto': np.repeat([product_forecast.product_id for product_forecast in fitted], horizons),
+        'Fecha': np.repeat(first_dates, horizons) + day_offsets.astype('timedelta64[D]'),
+        'Prediccion': np.concatenate([np.asarray(product_forecast.future, dtype=np.float64) for product_forecast in fitted])
+    })
+    forecast_rows['Fecha'] = forecast_rows['Fecha'].dt.date
+    return matrix_rows, forecast_rows
+
+
+def run_batch(engine="statsmodels", forecast_days=30, max_workers=1, keep_runs=5, db_ops=None, store=None):
+    """
+    Calcula la matriz de reposición y las predicciones de todos los productos y las guarda como una nueva
+    ejecución en las tablas de resultados (ver db/migrations/001_create_tables.sql o ResultsStore.create_tables).
+    :param engine: Motor de predicción: "statsmodels" o "fast".
+    :param forecast_days: Días futuros a predecir.
+    :param max_workers: Número de procesos para el ajuste ARIMA.
+    :param keep_runs: Ejecuciones que se conservan en las tablas.
+    :param db_ops: Instancia de DatabaseOperations a reutilizar.
+    :param store: Instancia de ResultsStore a utilizar.
+    :return: Run_ID de la ejecución escrita.
+    """
+    start = time.perf_counter()
+    restocking = RestockingMatrix(max_workers=max_workers, engine=engine, db_ops=db_ops)
+    restocking.forecast_service.forecast_days = forecast_days
+    restocking_df = restocking.generate_matrix()
+    # Los ajustes ya están calculados para esta versión de los datos: no se vuelve a ajustar ningún modelo
+    forecasts = restocking.forecast_service.get_forecasts(restocking_df["Código del Equipo"].tolist())
+    matrix_rows, forecast_rows = build_result_rows(restocking_df, forecasts)
+    computed_at = time.perf_counter()
+
+    store = store if store is not None else ResultsStore(engine=restocking.db_ops.engine)
+    run_id = store.write_run(engine, forecast_days, matrix_rows, forecast_rows)
+    store.prune_runs(keep=keep_runs)
+    print(f"Ejecución {run_id}: {len(matrix_rows)} productos y {len(forecast_rows)} predicciones "
+          f"(cálculo {computed_at - start:.1f}s, escritura {time.perf_counter() - computed_at:.1f}s).")
+    return run_id
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calcula y guarda la matriz de reposición y las predicciones.")
+    parser.add_argument("--engine", default="statsmodels", choices=["statsmodels", "fast"])
+    parser.add_argument("--forecast-days", type=int, default=30, help="Días futuros a predecir.")
+    parser.add_argument("--max-workers", type=int, default=1, help="Procesos para el ajuste ARIMA.")
+    parser.add_argument("--keep-runs", type=int, default=5, help="Ejecuciones que se conservan.")
+    args = parser.parse_args(argv)
+    run_batch(engine=args.engine, forecast_days=args.forecast_days, max_workers=args.max_workers,
+              keep_runs=args.keep_runs)
+
+
+if __name__ == "__main__":
+    main()
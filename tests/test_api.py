@@ -0,0 +1,113 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import json
+import time
+import warnings
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from api.main import app
+from api.routes import forecasting
+from benchmarks.synthetic_data import generate_inventory, generate_sales
+from benchmarks.sqlite_operations import SQLiteDatabaseOperations
+from db.db_operations import query_cache, snapshot_store
+from db.results_store import ResultsStore
+from models.model_cache import backtest_model_cache, model_cache
+from run import run_batch
+
+N_PRODUCTS = 12
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """
+    Cliente de la API sobre un catálogo sintético en SQLite, con instantáneas y cachés en frío.
+    """
+    db_ops = SQLiteDatabaseOperations(generate_inventory(N_PRODUCTS), generate_sales(N_PRODUCTS, 150, sparsity=0.3))
+    monkeypatch.setattr(forecasting, '_services', {'db_ops': db_ops})
+    monkeypatch.setattr(forecasting, 'ResultsStore', lambda: ResultsStore(engine=db_ops.engine))
+    monkeypatch.setattr(model_cache, 'cache_dir', str(tmp_path / "models"))
+    monkeypatch.setattr(backtest_model_cache, 'cache_dir', str(tmp_path / "backtest"))
+    snapshot_store.invalidate()
+    query_cache.clear()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield TestClient(app)
+    snapshot_store.invalidate()
+    query_cache.clear()
+
+
+def test_forecast_accuracy_table(client):
+    response = client.get("/forecast/accuracy", params={"engine": "fast", "horizon": 7, "origins": 2})
+    assert response.status_code == 200
+    rows = response.json()["data"]
+    assert len(rows) == len({row["ID_Producto"] for row in rows}) > 0
+    assert set(rows[0]) == {"ID_Producto", "Clase", "Origenes", "MSE", "RMSE", "MAE", "MASE", "Sesgo"}
+    assert all(row["Origenes"] <= 2 for row in rows)
+
+    csv = client.get("/forecast/accuracy", params={"engine": "fast", "horizon": 7, "origins": 2},
+                     headers={"Accept": "text/csv"})
+    assert csv.status_code == 200
+    assert csv.text.splitlines()[0] == "ID_Producto,Clase,Origenes,MSE,RMSE,MAE,MASE,Sesgo"
+    assert len(csv.text.splitlines()) == len(rows) + 1
+
+
+def test_restocking_matrix_job_reports_progress_and_result(client):
+    response = client.post("/jobs/restocking-matrix", params={"engine": "fast"})
+    assert response.status_code == 202
+    job = response.json()
+    assert job['created'] and job['status'] in ('queued', 'running', 'completed')
+
+    deadline = time.time() + 30
+    while job['status'] not in ('completed', 'failed') and time.time() < deadline:
+        time.sleep(0.05)
+        job = client.get(f"/jobs/{job['job_id']}").json()
+    assert job['status'] == 'completed'
+    assert job['done'] == job['total'] == N_PRODUCTS
+    assert len(job['result']) == N_PRODUCTS
+    assert client.get("/jobs/no-existe").status_code == 404
+
+
+@pytest.mark.parametrize("accept", ["application/json", "application/x-ndjson", "text/csv"])
+def test_restocking_matrix_without_result_tables_is_not_found(client, accept):
+    response = client.get("/inventory/restocking_matrix", headers={"Accept": accept})
+    assert response.status_code == 404
+
+
+def test_inventory_listing(client):
+    response = client.get("/inventory/all")
+    assert response.status_code == 200
+    assert sorted(row["ID_Producto"] for row in response.json()) == list(range(1, N_PRODUCTS + 1))
+
+
+def test_batch_forecast_streams_one_line_per_product(client):
+    body = {"product_ids": [3, 1, 3, 7], "days": 5, "engine": "fast"}
+    data = client.post("/forecast", json=body).json()["data"]
+
+    ndjson = client.post("/forecast", json=body, headers={"Accept": "application/x-ndjson"})
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [line["ID_Producto"] for line in lines] == [3, 1, 7]
+    assert lines == [data[0], data[1], data[3]]
+
+    csv = pd.read_csv(io.StringIO(client.post("/forecast", json=body, headers={"Accept": "text/csv"}).text))
+    assert list(csv.columns) == ['ID_Producto', 'Clase', 'MSE', 'RMSE', 'Fecha', 'Prediccion']
+    assert csv['ID_Producto'].unique().tolist() == [3, 1, 7]
+    assert all(len(csv[csv['ID_Producto'] == product_id]) in (1, 5) for product_id in (3, 1, 7))
+
+
+def test_precomputed_restocking_matrix_is_streamed(client):
+    store = ResultsStore(engine=forecasting._services['db_ops'].engine)
+    store.create_tables()
+    run_batch(engine="fast", forecast_days=7, db_ops=forecasting._services['db_ops'], store=store)
+
+    rows = client.get("/inventory/restocking_matrix").json()["data"]
+    assert len(rows) == N_PRODUCTS
+    for path in ("/inventory/restocking_matrix", "/restocking-matrix"):
+        response = client.get(path, headers={"Accept": "application/x-ndjson"})
+        assert [json.loads(line) for line in response.text.splitlines()] == rows
+    csv = client.get("/inventory/restocking_matrix", headers={"Accept": "text/csv"}).text.splitlines()
+    assert csv[0].split(",")[0] == "Código del Equipo" and len(csv) == N_PRODUCTS + 1
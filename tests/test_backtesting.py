@@ -0,0 +1,96 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import warnings
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+from models.backtesting import RollingOriginBacktest, accuracy_metrics
+from models.demand_classification import CrostonSBAEngine
+from models.model_cache import backtest_model_cache, model_cache
+
+
+def daily_series(values, start="2024-01-01"):
+    return pd.Series(np.asarray(values, dtype=np.float64),
+                     index=pd.date_range(start, periods=len(values), freq='D'))
+
+
+def test_origins_leave_the_horizon_after_the_last_cut():
+    backtest = RollingOriginBacktest(horizon=10, n_origins=3, step=5, min_train=30)
+    origins = backtest.origins(np.array([100, 40, 20]))
+    np.testing.assert_array_equal(origins, [[80, 85, 90], [-1, -1, 30], [-1, -1, -1]])
+
+
+def test_accuracy_metrics_mase_and_bias():
+    actuals = np.array([[[1.0, 1.0], [1.0, np.nan]]])
+    forecasts = np.array([[[2.0, 0.0], [4.0, np.nan]]])  # Errores +1, -1 y +3; el último día no tiene real
+    errors = np.array([1.0, -1.0, 3.0])
+    metrics = accuracy_metrics(actuals, forecasts, np.array([2.0]))
+    np.testing.assert_allclose(metrics['MSE'], [np.mean(errors ** 2)])
+    np.testing.assert_allclose(metrics['MAE'], [np.mean(np.abs(errors))])
+    np.testing.assert_allclose(metrics['MASE'], [np.mean(np.abs(errors)) / 2.0])
+    np.testing.assert_allclose(metrics['Sesgo'], [1.0])  # Positivo: sobrestimación
+    assert metrics['Origenes'].tolist() == [2]
+
+
+def test_run_scores_each_origin_against_the_real_days():
+    rng = np.random.default_rng(0)
+    smooth = daily_series(30 + np.cumsum(rng.normal(size=120)))
+    short = daily_series(rng.poisson(5, 20))
+    backtest = RollingOriginBacktest(engine="fast", horizon=7, n_origins=3, step=7, min_train=30,
+                                     demand_routing=False)
+    table = backtest.run([1, 2], [smooth, short])
+
+    details = backtest.last_details
+    np.testing.assert_array_equal(details['origins'][0], [99, 106, 113])
+    for k, origin in enumerate(details['origins'][0]):
+        np.testing.assert_allclose(details['actuals'][0, k], smooth.to_numpy()[origin:origin + 7])
+
+    errors = details['forecasts'][0] - details['actuals'][0]
+    scale = np.mean(np.abs(np.diff(smooth.to_numpy()[:99])))
+    row = table.set_index('ID_Producto').loc[1]
+    assert row['Origenes'] == 3
+    np.testing.assert_allclose(row['MAE'], np.mean(np.abs(errors)))
+    np.testing.assert_allclose(row['MASE'], np.mean(np.abs(errors)) / scale)
+    np.testing.assert_allclose(row['Sesgo'], np.mean(errors))
+
+    # Una serie más corta que min_train + horizon no tiene cortes ni métricas
+    short_row = table.set_index('ID_Producto').loc[2]
+    assert short_row['Origenes'] == 0 and np.isnan(short_row['MSE'])
+
+
+def test_sparse_series_are_scored_with_croston():
+    values = np.zeros(90)
+    values[::4] = 3.0
+    history = daily_series(values)
+    backtest = RollingOriginBacktest(engine="fast", horizon=5, n_origins=2, step=10, min_train=30)
+    table = backtest.run([7], [history])
+
+    assert table.loc[0, 'Clase'] == "intermittent"
+    for k, origin in enumerate(backtest.last_details['origins'][0]):
+        rate = CrostonSBAEngine().demand_rate([values[:origin]])[0]
+        np.testing.assert_allclose(backtest.last_details['forecasts'][0, k], rate)
+
+
+def test_statsmodels_advances_one_fit_across_origins_outside_the_production_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_cache, 'cache_dir', str(tmp_path / "production"))
+    monkeypatch.setattr(backtest_model_cache, 'cache_dir', str(tmp_path / "backtest"))
+    model_cache.clear()
+    backtest_model_cache.clear()
+
+    rng = np.random.default_rng(1)
+    history = daily_series(40 + np.cumsum(rng.normal(size=100)))
+    backtest = RollingOriginBacktest(engine="statsmodels", horizon=5, n_origins=2, step=5, min_train=30,
+                                     demand_routing=False)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        backtest.run([3], [history])
+        first_fit = ARIMA(history[:90], order=(5, 1, 0)).fit()
+        expected = [first_fit.forecast(5), first_fit.append(history[90:95], refit=False).forecast(5)]
+
+    np.testing.assert_allclose(backtest.last_details['forecasts'][0], expected)
+    assert model_cache.stats()['disk_items'] == 0
+    assert backtest_model_cache.stats()['disk_items'] == 1
+    model_cache.clear()
+    backtest_model_cache.clear()
@@ -0,0 +1,23 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from db import db_operations
+from db.db_operations import DatabaseOperations, get_database_operations
+from db.file_operations import FileDatabaseOperations
+
+
+def test_sales_are_read_raw_unless_the_caller_opts_in():
+    assert DatabaseOperations(engine=create_engine("sqlite://")).sales_mode == "raw"
+    assert FileDatabaseOperations("inventario.csv", "ventas.csv").sales_mode == "raw"
+
+
+def test_configured_operations_read_daily_totals_by_default(monkeypatch):
+    settings = {'backend': 'files', 'inventory_path': "inventario.csv", 'sales_path': "ventas.csv"}
+    monkeypatch.setattr(db_operations, 'load_database_settings', lambda: settings)
+    assert get_database_operations().sales_mode == "daily"
+    assert get_database_operations(sales_mode="streaming").sales_mode == "streaming"
+
+    settings['sales_mode'] = "raw"
+    assert get_database_operations().sales_mode == "raw"
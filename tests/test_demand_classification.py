@@ -0,0 +1,25 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from models.demand_classification import CrostonSBAEngine, classify_demand
+
+
+def test_croston_sba_demand_rate():
+    engine = CrostonSBAEngine(alpha=0.5)
+    series = [np.array([0.0, 3.0, 0.0, 0.0, 5.0, 0.0]), np.zeros(4), np.array([2.0])]
+    # Serie 1: tamaño 3 -> 3 + 0.5 * (5 - 3) = 4; intervalo 2 -> 2 + 0.5 * (3 - 2) = 2.5
+    np.testing.assert_allclose(engine.demand_rate(series), [(1 - 0.25) * 4 / 2.5, 0.0, (1 - 0.25) * 2.0])
+    np.testing.assert_allclose(engine.forecast(series, 3)[0], [1.2, 1.2, 1.2])
+
+
+def test_classify_demand_quadrants():
+    series = [
+        np.array([5.0, 6.0, 5.0, 5.0, 6.0, 5.0]),   # frecuente y estable
+        np.array([1.0, 20.0, 1.0, 20.0, 1.0, 20.0]),  # frecuente y variable
+        np.array([0.0, 0.0, 5.0, 0.0, 0.0, 5.0]),   # esporádica y estable
+        np.array([0.0, 0.0, 1.0, 0.0, 0.0, 20.0]),  # esporádica y variable
+        np.zeros(6)
+    ]
+    assert classify_demand(series).tolist() == ["smooth", "erratic", "intermittent", "lumpy", "none"]
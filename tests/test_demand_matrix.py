@@ -0,0 +1,35 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from models.demand_matrix import DemandMatrix, pack_series
+
+
+def test_demand_matrix_series_matches_resample():
+    rng = np.random.default_rng(0)
+    start = pd.Timestamp("2024-01-01")
+    rows = []
+    for product_id, (first_day, last_day, probability) in {1: (0, 90, 0.9), 2: (20, 60, 0.2), 3: (45, 45, 1.0)}.items():
+        for day in range(first_day, last_day + 1):
+            if rng.random() < probability:
+                for _ in range(rng.integers(1, 4)):
+                    rows.append((start + pd.Timedelta(days=day, hours=int(rng.integers(0, 23))), product_id,
+                                 int(rng.integers(1, 10))))
+    sales_data = pd.DataFrame(rows, columns=['Fecha_Venta', 'ID_Producto', 'Cantidad_Vendida'])
+    demand_matrix = DemandMatrix.from_sales(sales_data)
+
+    indexed = sales_data.set_index('Fecha_Venta')
+    for product_id in (1, 2, 3):
+        expected = indexed[indexed['ID_Producto'] == product_id]['Cantidad_Vendida'].resample('D').sum().fillna(0)
+        series = demand_matrix.series(product_id)
+        pd.testing.assert_index_equal(series.index, expected.index, check_names=False)
+        np.testing.assert_allclose(series.to_numpy(), expected.to_numpy(dtype=np.float64))
+    assert demand_matrix.series(99).empty
+
+
+def test_pack_series_left_aligns_and_zero_fills():
+    values, lengths = pack_series([np.array([1.0, np.nan, 3.0]), [], np.array([4.0])])
+    np.testing.assert_array_equal(lengths, [3, 0, 1])
+    np.testing.assert_array_equal(values, [[1.0, 0.0, 3.0], [0.0, 0.0, 0.0], [4.0, 0.0, 0.0]])
@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import warnings
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+from models.demand_matrix import DemandMatrix
+from models.fast_ar_engine import FastAREngine, compare_engines
+from models.model_cache import model_cache
+
+
+def integrated_ar_series(coefficients, n_days, seed):
+    """
+    Serie ARIMA(p,1,0) sin constante: suma acumulada de un proceso AR(p).
+    """
+    rng = np.random.default_rng(seed)
+    p = len(coefficients)
+    diffs = np.zeros(n_days + 100)
+    noise = rng.normal(size=len(diffs))
+    for t in range(p, len(diffs)):
+        diffs[t] = np.dot(coefficients, diffs[t - p:t][::-1]) + noise[t]
+    return 50.0 + np.cumsum(diffs[100:])
+
+
+def test_fast_ar_matches_statsmodels_arima():
+    trains = [integrated_ar_series([0.5, -0.3], 1500, seed=0), integrated_ar_series([0.2, 0.1], 1200, seed=1)]
+    engine = FastAREngine(p=2)
+    coefficients = engine.fit(trains)
+    forecasts = engine.forecast(trains, 10, coefficients=coefficients)
+
+    for row, train in enumerate(trains):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            fitted_model = ARIMA(train, order=(2, 1, 0)).fit()
+        np.testing.assert_allclose(coefficients[row], fitted_model.params[:2], atol=0.02)
+        np.testing.assert_allclose(forecasts[row], fitted_model.forecast(steps=10), atol=0.1)
+
+
+def test_fast_ar_handles_short_and_empty_series():
+    forecasts = FastAREngine(p=5).forecast([np.array([3.0, 4.0]), np.array([])], 3)
+    # Sin suficientes rezagos los coeficientes son cero y la predicción repite el último valor
+    np.testing.assert_allclose(forecasts[0], [4.0, 4.0, 4.0])
+    assert np.isnan(forecasts[1]).all()
+
+
+def test_compare_engines_reports_both_engines(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_cache, 'cache_dir', str(tmp_path))
+    model_cache.clear()
+    dates = pd.date_range("2024-01-01", periods=200, freq='D')
+    sales_data = pd.DataFrame({
+        'Fecha_Venta': list(dates) * 2,
+        'ID_Producto': [1] * 200 + [2] * 200,
+        'Cantidad_Vendida': np.concatenate([integrated_ar_series([0.4], 200, seed=2),
+                                            integrated_ar_series([0.1, 0.2], 200, seed=3)])
+    })
+    report, summary = compare_engines(DemandMatrix.from_sales(sales_data), order=(2, 1, 0))
+    assert report['ID_Producto'].tolist() == [1, 2]
+    assert summary['products'] == 2
+    assert np.isfinite(report[['RMSE_statsmodels', 'RMSE_fast']].to_numpy()).all()
+    model_cache.clear()
@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import pytest
+from benchmarks.synthetic_data import generate_inventory, generate_sales
+from benchmarks.sqlite_operations import SQLiteDatabaseOperations
+from db.db_operations import QueryResultCache
+from db.file_operations import FileDatabaseOperations
+
+INVENTORY = generate_inventory(6)
+SALES = generate_sales(6, 45, sparsity=0.4)
+
+
+def sort_daily(daily):
+    return daily.sort_values(['ID_Producto', 'Fecha_Venta']).reset_index(drop=True)
+
+
+@pytest.fixture
+def sqlite_ops():
+    operations = SQLiteDatabaseOperations(INVENTORY, SALES)
+    operations.result_cache = QueryResultCache()
+    return operations
+
+
+@pytest.fixture(params=["csv", "parquet"])
+def file_ops(request, tmp_path):
+    inventory_path, sales_path = str(tmp_path / f"inventario.{request.param}"), str(tmp_path / f"ventas.{request.param}")
+    for data, path in ((INVENTORY, inventory_path), (SALES, sales_path)):
+        if request.param == "csv":
+            data.to_csv(path, index=False)
+        else:
+            data.to_parquet(path, index=False)
+    return FileDatabaseOperations(inventory_path, sales_path)
+
+
+def test_files_match_the_sql_backend(file_ops, sqlite_ops):
+    inventory = file_ops.fetch_inventory_data()
+    pd.testing.assert_frame_equal(inventory, sqlite_ops.fetch_inventory_data(), check_categorical=False)
+    assert inventory['ID_Producto'].dtype == 'int32'
+
+    pd.testing.assert_frame_equal(sort_daily(file_ops.fetch_daily_sales()), sort_daily(sqlite_ops.fetch_daily_sales()))
+    pd.testing.assert_frame_equal(sort_daily(file_ops.fetch_product_sales([2, 5])),
+                                  sort_daily(sqlite_ops.fetch_product_sales([2, 5])))
+    pd.testing.assert_frame_equal(sort_daily(file_ops.fetch_sales_streaming(chunksize=11)),
+                                  sort_daily(sqlite_ops.fetch_daily_sales()))
+
+
+def test_date_filters_apply_to_the_day(file_ops, sqlite_ops):
+    start, end = SALES['Fecha_Venta'].min(), pd.Timestamp(SALES['Fecha_Venta'].min()).normalize() + pd.Timedelta(days=10)
+    pd.testing.assert_frame_equal(sort_daily(file_ops.fetch_daily_sales(start_date=start, end_date=end)),
+                                  sort_daily(sqlite_ops.fetch_daily_sales(start_date=start, end_date=end)))
+
+
+def test_missing_and_empty_files(tmp_path):
+    empty_path = tmp_path / "ventas.csv"
+    empty_path.write_text("")
+    operations = FileDatabaseOperations(str(tmp_path / "no_existe.csv"), str(empty_path))
+    assert operations.fetch_raw_sales().empty
+    with pytest.raises(Exception, match="no se encuentra"):
+        operations.fetch_inventory_data()
+    with pytest.raises(Exception, match="no ejecuta consultas SQL"):
+        operations.execute_query("SELECT 1")
@@ -0,0 +1,106 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+import warnings
+import numpy as np
+import pytest
+from benchmarks.synthetic_data import generate_inventory, generate_sales
+from benchmarks.sqlite_operations import SQLiteDatabaseOperations
+from db.db_operations import query_cache, snapshot_store
+from models.forecast_service import ForecastService
+from models.model_cache import model_cache
+
+N_PRODUCTS = 8
+
+
+@pytest.fixture
+def db_ops(tmp_path, monkeypatch):
+    """
+    Catálogo sintético en SQLite con instantáneas, caché de consultas y caché de modelos en frío.
+    """
+    monkeypatch.setattr(model_cache, 'cache_dir', str(tmp_path / "models"))
+    snapshot_store.invalidate()
+    query_cache.clear()
+    operations = SQLiteDatabaseOperations(generate_inventory(N_PRODUCTS), generate_sales(N_PRODUCTS, 120, sparsity=0.3))
+    operations.product_fetches = []
+    fetch_product_sales = operations.fetch_product_sales
+
+    def tracked_fetch_product_sales(product_ids, *args, **kwargs):
+        operations.product_fetches.append(list(product_ids))
+        return fetch_product_sales(product_ids, *args, **kwargs)
+
+    operations.fetch_product_sales = tracked_fetch_product_sales
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield operations
+    snapshot_store.invalidate()
+    query_cache.clear()
+
+
+def test_product_forecasts_without_a_snapshot_read_only_those_products(db_ops):
+    service = ForecastService(engine="fast", db_ops=db_ops)
+    product_forecasts = service.get_product_forecasts([2, 3, 2])
+    assert db_ops.product_fetches == [[2, 3]]
+    assert not db_ops.sales_snapshot_fresh()
+    assert [product_forecast.product_id for product_forecast in product_forecasts] == [2, 3, 2]
+
+    # Las series por producto son las mismas que las de la matriz completa
+    full = {product_forecast.product_id: product_forecast for product_forecast in service.get_forecasts([2, 3])}
+    for product_forecast in product_forecasts[:2]:
+        np.testing.assert_allclose(product_forecast.future, full[product_forecast.product_id].future)
+
+
+def test_product_forecasts_reuse_the_shared_results_of_the_snapshot(db_ops):
+    service = ForecastService(engine="fast", db_ops=db_ops)
+    matrix_forecasts = service.get_forecasts(list(range(1, N_PRODUCTS + 1)))
+
+    # Otra instancia (otra sección del dashboard) lee el mismo resultado sin volver a leer ni ajustar
+    section = ForecastService(engine="fast", db_ops=db_ops)
+    section.fit_products = lambda *args, **kwargs: pytest.fail("no debía volver a ajustar")
+    assert section.get_forecast(4) is matrix_forecasts[3]
+    assert section.get_product_forecasts([1, 5]) == [matrix_forecasts[0], matrix_forecasts[4]]
+    assert db_ops.product_fetches == []
+
+
+def test_missing_products_are_fitted_from_the_same_snapshot(db_ops):
+    service = ForecastService(engine="fast", db_ops=db_ops)
+    service.get_forecasts([1, 2])
+    version = snapshot_store.version(db_ops.sales_snapshot_key)
+
+    product_forecast = service.get_forecast(6)
+    assert db_ops.product_fetches == []
+    assert snapshot_store.version(db_ops.sales_snapshot_key) == version
+    assert service.get_forecasts([6])[0] is product_forecast
+
+
+def test_concurrent_requests_fit_each_product_once(db_ops):
+    services = [ForecastService(engine="fast", db_ops=db_ops) for _ in range(4)]
+    fitted = []
+    for service in services:
+        fit_products = service.fit_products
+
+        def tracked_fit_products(product_ids, *args, fit_products=fit_products, **kwargs):
+            fitted.extend(product_ids)
+            time.sleep(0.05)  # Ensancha la ventana en que otra solicitud podría ajustar lo mismo
+            return fit_products(product_ids, *args, **kwargs)
+
+        service.fit_products = tracked_fit_products
+
+    service_results = [None] * len(services)
+    barrier = threading.Barrier(len(services))
+
+    def request(index):
+        barrier.wait()
+        service_results[index] = services[index].get_forecasts(list(range(1, N_PRODUCTS + 1)))
+
+    threads = [threading.Thread(target=request, args=(index,)) for index in range(len(services))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(fitted) == list(range(1, N_PRODUCTS + 1))
+    assert all(forecasts == service_results[0] for forecasts in service_results)
@@ -0,0 +1,86 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+from api.routes.jobs import JobManager
+
+
+def wait_for(manager, job_id, status, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if manager.status(job_id)['status'] == status:
+            return manager.status(job_id)
+        time.sleep(0.01)
+    raise AssertionError(f"El trabajo {job_id} no llegó al estado '{status}'")
+
+
+def test_identical_requests_share_the_active_job():
+    manager = JobManager()
+    release = threading.Event()
+    calls = []
+
+    def work(progress):
+        calls.append(1)
+        release.wait(5)
+        return "listo"
+
+    job_id, created = manager.submit(("matriz", "fast"), work)
+    same_id, same_created = manager.submit(("matriz", "fast"), work)
+    assert created and not same_created and same_id == job_id
+
+    other_id, other_created = manager.submit(("matriz", "statsmodels"), lambda progress: "otro")
+    assert other_created and other_id != job_id
+
+    release.set()
+    wait_for(manager, job_id, 'completed')
+    assert calls == [1] and manager.result(job_id) == "listo"
+    # Una vez terminado, la misma solicitud crea un trabajo nuevo
+    assert manager.submit(("matriz", "fast"), work)[1]
+
+
+def test_progress_and_eta_are_reported_while_running():
+    manager = JobManager()
+    halfway, release = threading.Event(), threading.Event()
+
+    def work(progress):
+        progress(0, 4)
+        time.sleep(0.05)
+        progress(2, 4)
+        halfway.set()
+        release.wait(5)
+        progress(4, 4)
+        return 4
+
+    job_id, _ = manager.submit("progreso", work)
+    assert halfway.wait(5)
+    status = manager.status(job_id)
+    assert status['status'] == 'running'
+    assert (status['done'], status['total']) == (2, 4)
+    # A mitad de camino, el tiempo restante estimado es igual al transcurrido
+    assert status['eta_seconds'] is not None and abs(status['eta_seconds'] - status['elapsed_seconds']) < 0.05
+
+    release.set()
+    status = wait_for(manager, job_id, 'completed')
+    assert (status['done'], status['eta_seconds']) == (4, 0.0)
+
+
+def test_failed_jobs_keep_the_error_and_free_their_key():
+    manager = JobManager()
+
+    def fail(progress):
+        raise ValueError("sin datos")
+
+    job_id, _ = manager.submit("falla", fail)
+    status = wait_for(manager, job_id, 'failed')
+    assert status['error'] == "sin datos" and manager.result(job_id) is None
+    assert manager.submit("falla", lambda progress: 1)[1]
+
+
+def test_only_the_configured_history_of_finished_jobs_is_kept():
+    manager = JobManager(history=2)
+    job_ids = [manager.submit(index, lambda progress, index=index: index)[0] for index in range(4)]
+    wait_for(manager, job_ids[-1], 'completed')
+    assert manager.status(job_ids[0]) is None and manager.status(job_ids[1]) is None
+    assert [manager.result(job_id) for job_id in job_ids[2:]] == [2, 3]
@@ -0,0 +1,30 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from sqlalchemy import create_engine, inspect
+from db.migrate import MigrationRunner
+from db.results_store import RESULT_METADATA, ResultsStore
+
+
+def test_migrations_are_split_into_batches_by_go():
+    script = "CREATE TABLE a (x INT);\nGO\n\n  go ;\nCREATE VIEW b AS SELECT 1;\nGO\n"
+    assert MigrationRunner.split_batches(script) == ["CREATE TABLE a (x INT);", "CREATE VIEW b AS SELECT 1;"]
+
+
+def test_runner_rejects_engines_other_than_sql_server(tmp_path):
+    runner = MigrationRunner(engine=create_engine(f"sqlite:///{tmp_path / 'results.db'}"))
+    with pytest.raises(Exception, match="T-SQL.*'sqlite'"):
+        runner.apply()
+
+
+def test_result_tables_are_created_with_portable_ddl(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'results.db'}")
+    store = ResultsStore(engine=engine)
+    store.create_tables()
+    store.create_tables()  # Idempotente
+    columns = {table: [column['name'] for column in inspect(engine).get_columns(table)] for table in RESULT_METADATA.tables}
+    assert columns['product_forecasts'] == ['Run_ID', 'ID_Producto', 'Fecha', 'Prediccion']
+    assert inspect(engine).get_pk_constraint('restocking_matrix')['constrained_columns'] == ['Run_ID', 'ID_Producto']
+    assert store.latest_run_id() is None
@@ -0,0 +1,100 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.arima.model import ARIMA
+from models.model_cache import ModelCache
+
+ORDER = (1, 1, 0)
+
+
+@pytest.fixture(autouse=True)
+def quiet_statsmodels():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield
+
+
+def daily_series(n_days, seed=0, start="2024-01-01"):
+    rng = np.random.default_rng(seed)
+    values = 20.0 + np.cumsum(rng.normal(scale=0.5, size=n_days))
+    return pd.Series(values, index=pd.date_range(start, periods=n_days, freq='D'))
+
+
+def extended_series(train, new_values):
+    new_index = pd.date_range(train.index[-1] + pd.Timedelta(days=1), periods=len(new_values), freq='D')
+    return pd.concat([train, pd.Series(new_values, index=new_index)])
+
+
+def test_disk_hit_rebuilds_the_fitted_model_from_params(tmp_path):
+    cache = ModelCache(cache_dir=str(tmp_path))
+    train = daily_series(150)
+    fitted_model = cache.get_or_fit(1, train, ORDER)
+
+    # Otra instancia sobre el mismo directorio solo encuentra los parámetros en disco
+    reloaded = ModelCache(cache_dir=str(tmp_path)).get_or_fit(1, train, ORDER)
+    np.testing.assert_allclose(reloaded.params, fitted_model.params)
+    np.testing.assert_allclose(reloaded.forecast(10), fitted_model.forecast(10))
+
+    stats = cache.stats()
+    assert stats['refits'] == 1 and stats['disk_items'] == 1
+    # Solo se guardan los parámetros, no el resultado completo con la serie y las matrices del filtro
+    assert stats['disk_bytes'] < 2048
+
+
+def test_new_days_extend_the_previous_model(tmp_path):
+    cache = ModelCache(cache_dir=str(tmp_path))
+    train = daily_series(150)
+    base_model = cache.get_or_fit(1, train, ORDER)
+    longer = extended_series(train, train.iloc[-1] + np.array([0.2, -0.1, 0.3]))
+
+    fitted_model = cache.get_or_fit(1, longer, ORDER)
+    assert cache.extensions == 1 and cache.refits == 1
+    assert len(fitted_model.model.endog) == len(longer)
+    np.testing.assert_allclose(fitted_model.params, base_model.params)
+    np.testing.assert_allclose(fitted_model.forecast(5),
+                               base_model.append(longer.iloc[150:], refit=False).forecast(5))
+
+
+def test_drift_in_the_new_days_forces_a_refit(tmp_path):
+    cache = ModelCache(cache_dir=str(tmp_path), drift_tolerance=1.5)
+    train = daily_series(150)
+    cache.get_or_fit(1, train, ORDER)
+    shocked = extended_series(train, train.iloc[-1] + np.array([40.0, -35.0, 50.0]))
+
+    fitted_model = cache.get_or_fit(1, shocked, ORDER)
+    assert cache.extensions == 0 and cache.refits == 2
+    np.testing.assert_allclose(fitted_model.params, ARIMA(shocked, order=ORDER).fit().params)
+
+
+def test_refit_schedule_and_changed_history_skip_the_extension(tmp_path):
+    cache = ModelCache(cache_dir=str(tmp_path), refit_every_obs=3)
+    train = daily_series(150)
+    cache.get_or_fit(1, train, ORDER)
+
+    # Cinco días nuevos superan el calendario de reajuste (3 observaciones)
+    cache.get_or_fit(1, extended_series(train, train.iloc[-1] + np.zeros(5)), ORDER)
+    assert cache.extensions == 0 and cache.refits == 2
+
+    # Si cambió un día ya conocido, la historia no coincide con la del modelo previo
+    revised = extended_series(train, train.iloc[-1] + np.zeros(6))
+    revised.iloc[10] += 5.0
+    cache.get_or_fit(1, revised, ORDER)
+    assert cache.extensions == 0 and cache.refits == 3
+
+
+def test_disk_and_memory_tiers_respect_their_byte_limits(tmp_path):
+    cache = ModelCache(cache_dir=str(tmp_path), max_memory_bytes=1000, max_disk_bytes=1500)
+    for product_id in range(8):
+        cache.get_or_fit(product_id, daily_series(60, seed=product_id), ORDER)
+
+    stats = cache.stats()
+    on_disk = [name for name in os.listdir(tmp_path) if name.endswith('.pkl')]
+    assert stats['memory_bytes'] <= 1000
+    assert stats['disk_bytes'] <= 1500
+    assert stats['disk_items'] == len(on_disk)
+    assert stats['disk_bytes'] == sum(os.path.getsize(os.path.join(tmp_path, name)) for name in on_disk)
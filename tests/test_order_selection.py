@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from models.order_selection import OrderSelector, get_product_order, search_order, select_differencing
+
+
+def ar_series(n=300, phi=(0.6, -0.3), seed=0):
+    rng = np.random.default_rng(seed)
+    values = np.zeros(n)
+    noise = rng.normal(size=n)
+    for t in range(len(phi), n):
+        values[t] = sum(coefficient * values[t - lag - 1] for lag, coefficient in enumerate(phi)) + noise[t]
+    return pd.Series(values + 20, index=pd.date_range("2023-01-01", periods=n, freq="D"))
+
+
+@pytest.fixture(autouse=True)
+def quiet():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield
+
+
+def test_kpss_sets_the_differencing_order():
+    assert select_differencing(ar_series()) == 0
+    assert select_differencing(ar_series().cumsum()) == 1
+    assert select_differencing(pd.Series([3.0] * 50)) == 0
+
+
+def test_stepwise_search_prunes_the_grid():
+    evaluated = []
+
+    def recording_map(function, *args):
+        evaluated.extend(args[1])
+        return map(function, *args)
+
+    order, value = search_order(ar_series(), prune_margin=2.0, map_fn=recording_map)
+    assert order == (2, 0, 0) and np.isfinite(value)
+    assert len(set(evaluated)) == len(evaluated)  # Ningún candidato se evalúa dos veces
+    assert len(evaluated) < 6 * 3  # Menos que la grilla completa de p y q
+
+
+def test_selected_orders_are_saved_and_used(tmp_path):
+    orders_path = str(tmp_path / "model_orders.json")
+    selector = OrderSelector(max_p=2, max_q=1, max_steps=2, orders_path=orders_path)
+    selected = selector.select_orders([7, 8], [ar_series(150), ar_series(150, seed=1).cumsum()])
+    assert selected[7][1] == 0 and selected[8][1] == 1
+    assert get_product_order(7, path=orders_path) == selected[7]
+    assert get_product_order(99, path=orders_path) == (5, 1, 0)
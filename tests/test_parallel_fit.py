@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from models.forecast_service import ForecastService
+from models.model_cache import model_cache
+
+
+@pytest.fixture(autouse=True)
+def cold_model_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_cache, 'cache_dir', str(tmp_path / "models"))
+    model_cache.clear()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield
+    model_cache.clear()
+
+
+def make_trains():
+    rng = np.random.default_rng(3)
+    index = pd.date_range("2024-01-01", periods=80, freq="D")
+    trains = [pd.Series(rng.poisson(5 + product_id, 80).astype(float), index=index) for product_id in range(4)]
+    trains[2] = pd.Series([], dtype=float)  # Sin historia: su ajuste falla
+    return trains
+
+
+def fit(service):
+    product_ids = [11, 12, 13, 14]
+    progress = []
+    results = service.fit_with_engine(product_ids, make_trains(), [7] * 4, 10, advance=progress.append)
+    return results, progress
+
+
+def test_parallel_fit_keeps_input_order_and_isolates_failures():
+    serial, _ = fit(ForecastService(engine="statsmodels", db_ops=object(), max_workers=1))
+    model_cache.clear()
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        parallel, progress = fit(ForecastService(engine="statsmodels", db_ops=object(), executor=executor))
+
+    assert progress == [1, 1, 1, 1]
+    assert [result['error'] is None for result in parallel] == [True, True, False, True]
+    for serial_result, parallel_result in zip(serial, parallel):
+        if serial_result['error'] is None:
+            np.testing.assert_allclose(parallel_result['forecast_future'], serial_result['forecast_future'])
+            assert len(parallel_result['forecast']) == 7
+        else:
+            assert parallel_result['forecast'] is None and parallel_result['error']
+
+
+def test_process_pool_matches_serial_fit():
+    serial, _ = fit(ForecastService(engine="statsmodels", db_ops=object(), max_workers=1))
+    model_cache.clear()
+    parallel, _ = fit(ForecastService(engine="statsmodels", db_ops=object(), max_workers=2))
+    assert [result['error'] is None for result in parallel] == [True, True, False, True]
+    for index in (0, 1, 3):
+        np.testing.assert_allclose(parallel[index]['forecast_future'], serial[index]['forecast_future'])
@@ -0,0 +1,127 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import StaticPool
+from db.db_operations import DatabaseOperations, QueryResultCache
+from db.file_operations import FileDatabaseOperations
+
+SALES_TABLE = "DATATEL_Ventas_Inventario_Analytical_Dataset"
+
+
+@pytest.fixture
+def db_ops():
+    """
+    Operaciones sobre SQLite con una caché de consultas propia y un contador de sondas de versión.
+    """
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    pd.DataFrame({
+        'Fecha_Venta': ['2024-01-01 10:00:00', '2024-01-01 12:00:00', '2024-01-02 09:00:00'],
+        'ID_Cliente': [1, 2, 1],
+        'ID_Producto': [5, 5, 6],
+        'Cantidad_Vendida': [2, 3, 4],
+        'aud_Fecha_Modificacion': ['2024-01-03 00:00:00'] * 3
+    }).to_sql(SALES_TABLE, engine, index=False)
+    pd.DataFrame({'ID_Producto': [5, 6], 'Nombre_Producto': ['A', 'B'], 'Stock_Actual': [1, 2],
+                  'Categoria': ['X', 'X'], 'Precio_Unitario': [1.0, 2.0]}).to_sql("ds_Product_Items", engine, index=False)
+
+    operations = DatabaseOperations(engine=engine, sales_mode="daily")
+    operations.result_cache = QueryResultCache()
+    operations.probes = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_probes(connection, cursor, statement, parameters, context, executemany):
+        if "COUNT(*)" in statement:
+            operations.probes.append(statement)
+
+    return operations
+
+
+def execute(engine, statement):
+    with engine.begin() as connection:
+        connection.execute(text(statement))
+
+
+def test_unchanged_table_is_served_from_the_cache(db_ops):
+    first = db_ops.fetch_daily_sales()
+    second = db_ops.fetch_daily_sales()
+    pd.testing.assert_frame_equal(first, second)
+    assert db_ops.result_cache.stats()['hits'] == 1
+    assert second.attrs['result_version'] == first.attrs['result_version']
+
+    # Los consumidores reciben una copia superficial: reemplazar una columna no altera la caché
+    second['Cantidad_Vendida'] = 0
+    assert db_ops.fetch_daily_sales()['Cantidad_Vendida'].sum() == 9
+
+
+def test_updates_and_deletes_invalidate_the_result(db_ops):
+    before = db_ops.fetch_daily_sales()
+    execute(db_ops.engine, f"UPDATE {SALES_TABLE} SET Cantidad_Vendida = 10, "
+                           "aud_Fecha_Modificacion = '2024-01-04 00:00:00' WHERE ID_Producto = 6")
+    updated = db_ops.fetch_daily_sales()
+    assert updated['Cantidad_Vendida'].sum() == before['Cantidad_Vendida'].sum() + 6
+
+    # Una eliminación no cambia la fecha de auditoría máxima, pero sí el conteo
+    execute(db_ops.engine, f"DELETE FROM {SALES_TABLE} WHERE ID_Cliente = 2")
+    deleted = db_ops.fetch_daily_sales()
+    assert deleted['Cantidad_Vendida'].sum() == updated['Cantidad_Vendida'].sum() - 3
+    assert db_ops.result_cache.stats()['hits'] == 0
+
+
+def test_product_filtered_reads_skip_the_probe(db_ops):
+    db_ops.fetch_product_sales([5])
+    db_ops.fetch_product_sales([5])
+    assert db_ops.probes == []
+    assert db_ops.result_cache.stats()['misses'] == 0
+
+
+def test_failed_probe_is_remembered_and_reported_once(db_ops, capsys):
+    # ds_Product_Items no tiene aud_Fecha_Modificacion: la sonda falla
+    for _ in range(3):
+        inventory_data = db_ops.fetch_inventory_data()
+    assert len(inventory_data) == 2
+    assert len(db_ops.probes) == 1
+    assert capsys.readouterr().out.count("no admite la sonda de versión") == 1
+    assert db_ops.result_cache.stats()['unversioned_tables'] == ["ds_Product_Items"]
+
+    # Vaciar la caché vuelve a intentar la sonda
+    db_ops.result_cache.clear()
+    db_ops.fetch_inventory_data()
+    assert len(db_ops.probes) == 2
+
+
+def test_dates_are_parsed_while_reading(db_ops, tmp_path, monkeypatch):
+    # Ninguna lectura convierte las fechas después de construir el DataFrame
+    monkeypatch.setattr(pd, 'to_datetime', lambda *args, **kwargs: pytest.fail("conversión posterior a la lectura"))
+    sales_path = tmp_path / "ventas.csv"
+    pd.read_sql(f"SELECT Fecha_Venta, ID_Producto, Cantidad_Vendida FROM {SALES_TABLE}", db_ops.engine).to_csv(
+        sales_path, index=False)
+    file_ops = FileDatabaseOperations(tmp_path / "inventario.csv", str(sales_path))
+
+    for sales_data in (db_ops.fetch_raw_sales(), db_ops.fetch_daily_sales(), file_ops.fetch_raw_sales(),
+                       next(file_ops.iter_sales_chunks(2)), next(db_ops.iter_sales_chunks(2))):
+        assert pd.api.types.is_datetime64_any_dtype(sales_data['Fecha_Venta'])
+
+
+def test_least_recently_used_results_are_evicted_over_budget():
+    cache = QueryResultCache(max_bytes=2500)
+    frames = {name: pd.DataFrame({'x': range(100)}) for name in ("a", "b", "c")}
+    size = int(frames["a"].memory_usage(deep=True, index=True).sum())
+    assert 2 * size <= 2500 < 3 * size
+
+    for name in ("a", "b"):
+        cache.get_or_fetch(name, 1, lambda name=name: frames[name])
+    cache.get_or_fetch("a", 1, lambda: pytest.fail("debía leerse de la caché"))
+    cache.get_or_fetch("c", 1, lambda: frames["c"])
+
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1 and stats['total_bytes'] == 2 * size
+    fetched = []
+    cache.get_or_fetch("b", 1, lambda: fetched.append("b") or frames["b"])
+    assert fetched == ["b"]  # "b" era el menos usado
+    # Una versión distinta de la tabla obliga a leer de nuevo
+    cache.get_or_fetch("c", 2, lambda: fetched.append("c") or frames["c"])
+    assert fetched == ["b", "c"]
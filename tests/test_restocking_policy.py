@@ -0,0 +1,120 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from models.restocking_policy import MATRIX_COLUMNS, RestockingPolicy
+
+
+def reference_matrix(inventory_data, forecast_totals, frequencies, mse, rmse, product_minimums=None,
+                     category_minimums=None, default_minimum=10, moderate_margin=5):
+    """
+    Bucle original de RestockingMatrix.generate_matrix (un producto por iteración), con el mínimo
+    tomado del producto, de su categoría o del valor por defecto.
+    """
+    product_minimums = product_minimums or {}
+    category_minimums = category_minimums or {}
+    restocking_data = []
+    for row, product_info in enumerate(inventory_data.itertuples(index=False)):
+        recommended_restocking = forecast_totals[row]
+        stock_actual = product_info.Stock_Actual
+        recommended_minimum = product_minimums.get(
+            str(product_info.ID_Producto), category_minimums.get(product_info.Categoria, default_minimum))
+
+        if int(recommended_restocking) == 0:
+            if stock_actual < recommended_minimum:
+                recommended_restocking = recommended_minimum - stock_actual
+                status = "No prioritario"
+            else:
+                status = "Adecuado"
+        elif stock_actual < recommended_minimum:
+            status = "Urgente"
+        elif stock_actual < recommended_minimum + moderate_margin:
+            status = "Moderada"
+        else:
+            status = "Adecuado"
+
+        if status == "Adecuado":
+            recommended_restocking = 0
+
+        restocking_data.append([
+            product_info.ID_Producto, product_info.Nombre_Producto, stock_actual, recommended_minimum,
+            int(recommended_restocking), status, frequencies[row], mse[row], rmse[row]
+        ])
+
+    restocking_df = pd.DataFrame(restocking_data, columns=MATRIX_COLUMNS)
+    state_order = {"Urgente": 0, "Moderada": 1, "Adecuado": 2, "No prioritario": 3}
+    restocking_df['Estado Orden'] = restocking_df['Estado de Reposición'].map(state_order)
+    restocking_df.sort_values(by=["Estado Orden", "Frecuencia de Uso"], ascending=[True, False], inplace=True)
+    return restocking_df.drop(columns=["Estado Orden", "Frecuencia de Uso"])
+
+
+def make_inventory(stock, categories=None):
+    n_products = len(stock)
+    return pd.DataFrame({
+        'ID_Producto': np.arange(1, n_products + 1),
+        'Nombre_Producto': [f"Producto {product_id}" for product_id in range(1, n_products + 1)],
+        'Stock_Actual': np.asarray(stock, dtype=np.int64),
+        'Categoria': categories if categories is not None else ["A"] * n_products
+    })
+
+
+def assert_matches_reference(inventory_data, forecast_totals, frequencies, **minimums):
+    n_products = len(inventory_data)
+    mse = np.linspace(0.5, 2.0, n_products)
+    rmse = np.sqrt(mse)
+    policy = RestockingPolicy(product_minimums=minimums.get('product_minimums'),
+                              category_minimums=minimums.get('category_minimums'))
+    result = policy.evaluate(inventory_data, forecast_totals, frequencies, mse, rmse)
+    expected = reference_matrix(inventory_data, forecast_totals, frequencies, mse, rmse, **minimums)
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False)
+
+
+def test_negative_totals():
+    inventory_data = make_inventory([0, 5, 12, 20, 3, 14])
+    forecast_totals = np.array([-3.7, -12.0, -1.5, -40.2, -0.2, -2.0])
+    assert_matches_reference(inventory_data, forecast_totals, np.array([5.0, 3.0, 9.0, 1.0, 7.0, 2.0]))
+
+
+def test_totals_between_minus_one_and_one_count_as_no_demand():
+    inventory_data = make_inventory([2, 15, 8, 30, 0])
+    forecast_totals = np.array([0.99, -0.99, 0.5, -0.01, 0.0])
+    result = RestockingPolicy().evaluate(inventory_data, forecast_totals, np.arange(5, dtype=np.float64))
+    assert set(result["Estado de Reposición"]) <= {"No prioritario", "Adecuado"}
+    assert_matches_reference(inventory_data, forecast_totals, np.array([4.0, 1.0, 6.0, 2.0, 3.0]))
+
+
+def test_products_without_sales():
+    # Sin ventas no hay predicción (total 0), frecuencia 0 ni métricas de error
+    inventory_data = make_inventory([0, 25, 9, 11])
+    forecast_totals = np.array([0.0, 0.0, 18.4, 0.0])
+    frequencies = np.array([0.0, 0.0, 40.0, 0.0])
+    assert_matches_reference(inventory_data, forecast_totals, frequencies)
+
+    mse = np.array([np.nan, np.nan, 1.0, np.nan])
+    result = RestockingPolicy().evaluate(inventory_data, forecast_totals, frequencies, mse, np.sqrt(mse))
+    without_sales = result[result["Código del Equipo"] != 3]
+    assert without_sales["MSE"].isna().all()
+    assert (without_sales.loc[without_sales["Inventario Actual"] >= 10, "Cantidad Recomendada de Reposición"] == 0).all()
+
+
+def test_product_minimum_takes_precedence_over_category():
+    inventory_data = make_inventory([10, 10, 10, 10], categories=["A", "A", "B", "C"])
+    product_minimums = {1: 25}
+    category_minimums = {"A": 12, "B": 4}
+    policy = RestockingPolicy(product_minimums=product_minimums, category_minimums=category_minimums)
+    assert policy.minimums(inventory_data).tolist() == [25, 12, 4, 10]
+
+    forecast_totals = np.array([30.0, 0.0, 7.5, 6.0])
+    assert_matches_reference(inventory_data, forecast_totals, np.array([1.0, 2.0, 3.0, 4.0]),
+                             product_minimums={"1": 25}, category_minimums=category_minimums)
+
+
+def test_product_minimums_accept_text_keys_from_the_configuration():
+    inventory_data = make_inventory([10, 10, 10])
+    inventory_data['ID_Producto'] = inventory_data['ID_Producto'].astype(np.int32)
+    from_json = RestockingPolicy(product_minimums={"2": 7, "3": 30})
+    from_code = RestockingPolicy(product_minimums={2: 7, 3: 30})
+    assert from_json.product_minimums == from_code.product_minimums == {2: 7, 3: 30}
+    assert from_json.minimums(inventory_data).tolist() == [10, 7, 30]
@@ -0,0 +1,102 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import warnings
+import pandas as pd
+import pytest
+from benchmarks.synthetic_data import generate_inventory, generate_sales
+from benchmarks.sqlite_operations import SQLiteDatabaseOperations
+from db.db_operations import query_cache, snapshot_store
+from db.results_store import MATRIX_DISPLAY_COLUMNS, ResultsStore
+from models.model_cache import model_cache
+from run import run_batch
+
+N_PRODUCTS = 6
+
+
+def matrix_rows(product_ids):
+    return pd.DataFrame({
+        'ID_Producto': product_ids,
+        'Nombre_Producto': [f"Producto {product_id}" for product_id in product_ids],
+        'Stock_Actual': [10] * len(product_ids),
+        'Cantidad_Minima': [5] * len(product_ids),
+        'Cantidad_Reposicion': [3] * len(product_ids),
+        'Estado_Reposicion': ["Urgente"] * len(product_ids),
+        'Prioridad': range(len(product_ids), 0, -1),
+        'Prediccion_Total': [1.5] * len(product_ids),
+        'MSE': [None] * len(product_ids),
+        'RMSE': [None] * len(product_ids)
+    })
+
+
+def forecast_rows(product_id, days=3):
+    return pd.DataFrame({
+        'ID_Producto': [product_id] * days,
+        'Fecha': pd.date_range("2024-03-01", periods=days).date,
+        'Prediccion': [float(day) for day in range(days)]
+    })
+
+
+@pytest.fixture
+def store():
+    store = ResultsStore(engine=SQLiteDatabaseOperations(generate_inventory(1), generate_sales(1, 10)).engine,
+                         chunk_size=2)
+    store.create_tables()
+    return store
+
+
+def test_runs_get_increasing_ids_and_readers_see_the_latest(store):
+    assert store.latest_run() is None
+    first = store.write_run("fast", 3, matrix_rows([1, 2, 3]), forecast_rows(1))
+    second = store.write_run("statsmodels", 3, matrix_rows([4, 5]), forecast_rows(4))
+    assert (first, second) == (1, 2)
+
+    run = store.latest_run()
+    assert (run['Run_ID'], run['Motor'], run['Productos']) == (2, "statsmodels", 2)
+    assert pd.Timestamp.now() - run['Fecha_Ejecucion'] < pd.Timedelta(minutes=1)
+
+    matrix = store.fetch_restocking_matrix()
+    assert list(matrix.columns) == list(MATRIX_DISPLAY_COLUMNS.values())
+    assert matrix["Código del Equipo"].tolist() == [5, 4]  # Ordenada por prioridad
+    assert store.fetch_restocking_matrix(first)["Código del Equipo"].tolist() == [3, 2, 1]
+    chunks = list(store.iter_restocking_matrix(first, chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+
+
+def test_forecast_of_a_product_missing_from_the_run_is_none(store):
+    store.write_run("fast", 3, matrix_rows([1, 2]), forecast_rows(1))
+    forecast = store.fetch_forecast(1)
+    assert list(forecast.columns) == ['Fecha', 'Predicción'] and len(forecast) == 3
+    assert store.fetch_forecast(2) is None
+
+
+def test_pruning_keeps_the_most_recent_runs_and_ids_keep_growing(store):
+    for _ in range(4):
+        store.write_run("fast", 3, matrix_rows([1]), forecast_rows(1))
+    store.prune_runs(keep=2)
+    assert store.fetch_restocking_matrix(2) is not None and store.fetch_restocking_matrix(2).empty
+    assert len(store.fetch_restocking_matrix(3)) == 1
+    assert store.write_run("fast", 3, matrix_rows([1]), forecast_rows(1)) == 5
+
+
+def test_run_batch_writes_the_matrix_and_forecasts(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_cache, 'cache_dir', str(tmp_path / "models"))
+    snapshot_store.invalidate()
+    query_cache.clear()
+    db_ops = SQLiteDatabaseOperations(generate_inventory(N_PRODUCTS), generate_sales(N_PRODUCTS, 120, sparsity=0.3))
+    store = ResultsStore(engine=db_ops.engine)
+    store.create_tables()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        run_id = run_batch(engine="fast", forecast_days=7, db_ops=db_ops, store=store)
+    snapshot_store.invalidate()
+
+    assert store.latest_run_id() == run_id
+    matrix = store.fetch_restocking_matrix()
+    assert sorted(matrix["Código del Equipo"]) == list(range(1, N_PRODUCTS + 1))
+    by_product = store.fetch_restocking_by_product()
+    assert list(by_product.columns) == ['ID_Producto', 'Producto', 'Cantidad']
+    forecasts = [store.fetch_forecast(product_id) for product_id in matrix["Código del Equipo"]]
+    assert any(forecast is not None for forecast in forecasts)
+    assert all(len(forecast) == 7 for forecast in forecasts if forecast is not None)
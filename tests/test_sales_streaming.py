@@ -0,0 +1,35 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import pytest
+from benchmarks.synthetic_data import generate_inventory, generate_sales
+from benchmarks.sqlite_operations import SQLiteDatabaseOperations
+from db.db_operations import QueryResultCache
+
+
+def sort_daily(daily):
+    return daily.sort_values(['ID_Producto', 'Fecha_Venta']).reset_index(drop=True)
+
+
+@pytest.fixture
+def db_ops():
+    operations = SQLiteDatabaseOperations(generate_inventory(5), generate_sales(5, 60, sparsity=0.5))
+    operations.result_cache = QueryResultCache()
+    return operations
+
+
+@pytest.mark.parametrize("chunksize", [7, 100, 1000000])
+def test_streamed_totals_match_the_server_aggregation(db_ops, chunksize):
+    streamed = db_ops.fetch_sales_streaming(chunksize=chunksize)
+    pd.testing.assert_frame_equal(sort_daily(streamed), sort_daily(db_ops.fetch_daily_sales()))
+    assert pd.api.types.is_datetime64_any_dtype(streamed['Fecha_Venta'])
+    assert streamed['ID_Producto'].dtype == 'int32' and streamed['Cantidad_Vendida'].dtype == 'int32'
+
+
+def test_streaming_an_empty_table_returns_typed_empty_totals(db_ops):
+    with db_ops.engine.begin() as connection:
+        connection.exec_driver_sql("DELETE FROM DATATEL_Ventas_Inventario_Analytical_Dataset")
+    streamed = db_ops.fetch_sales_streaming(chunksize=10)
+    assert streamed.empty and list(streamed.columns) == ['Fecha_Venta', 'ID_Producto', 'Cantidad_Vendida']
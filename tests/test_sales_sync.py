@@ -0,0 +1,102 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from db.db_operations import DatabaseOperations
+from db.sales_sync import SalesSync
+
+SALES_TABLE = "DATATEL_Ventas_Inventario_Analytical_Dataset"
+
+
+@pytest.fixture
+def source():
+    """
+    Tabla de ventas en SQLite con dos líneas idénticas de una misma venta y una venta de otro mes.
+    """
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    pd.DataFrame({
+        'Fecha_Venta': ['2024-01-05 10:00:00', '2024-01-05 10:00:00', '2024-02-01 09:00:00'],
+        'ID_Cliente': [1, 1, 2],
+        'ID_Producto': [7, 7, 8],
+        'Cantidad_Vendida': [2, 2, 1],
+        'aud_Fecha_Modificacion': ['2024-03-01 00:00:00'] * 3
+    }).to_sql(SALES_TABLE, engine, index=False)
+    db_ops = DatabaseOperations(engine=engine, sales_mode="raw")
+    db_ops.result_cache = None
+    return engine, db_ops
+
+
+def execute(engine, statement):
+    with engine.begin() as connection:
+        connection.execute(text(statement))
+
+
+def assert_store_matches_source(sync, db_ops):
+    stored = sync.load_sales().sort_values(['Fecha_Venta', 'ID_Producto']).reset_index(drop=True)
+    expected = db_ops.fetch_daily_sales().sort_values(['Fecha_Venta', 'ID_Producto']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(stored, expected, check_dtype=False)
+
+
+def test_first_sync_keeps_repeated_lines_and_sets_the_watermark(source, tmp_path):
+    engine, db_ops = source
+    sync = SalesSync(db_ops, str(tmp_path))
+    report = sync.sync()
+
+    assert report['rows_fetched'] == 3
+    assert report['partitions_written'] == ['2024-01', '2024-02']
+    assert report['watermark'] == '2024-03-01T00:00:00'
+    assert len(sync.load_sales(daily=False)) == 3
+    assert_store_matches_source(sync, db_ops)
+
+
+def test_rows_reread_at_the_watermark_are_not_duplicated(source, tmp_path):
+    engine, db_ops = source
+    sync = SalesSync(db_ops, str(tmp_path))
+    sync.sync()
+    # Con >= la marca de agua se releen las mismas filas: el grupo se reemplaza en lugar de duplicarse
+    report = sync.sync()
+    assert report['rows_fetched'] == 3
+    assert len(sync.load_sales(daily=False)) == 3
+    assert_store_matches_source(sync, db_ops)
+
+
+def test_updates_and_inserts_rewrite_only_the_touched_partitions(source, tmp_path):
+    engine, db_ops = source
+    sync = SalesSync(db_ops, str(tmp_path))
+    sync.sync()
+
+    execute(engine, f"UPDATE {SALES_TABLE} SET Cantidad_Vendida = 10, "
+                    "aud_Fecha_Modificacion = '2024-03-02 00:00:00' WHERE ID_Producto = 8")
+    execute(engine, f"INSERT INTO {SALES_TABLE} VALUES ('2024-02-01 09:00:00', 2, 8, 4, '2024-03-02 00:00:00')")
+    report = sync.sync()
+    # Las filas de enero siguen en la marca anterior (>=) y se releen una última vez
+    assert report['rows_fetched'] == 4
+    assert report['watermark'] == '2024-03-02T00:00:00'
+    assert len(sync.load_sales(daily=False)) == 4
+    assert_store_matches_source(sync, db_ops)
+
+    # Con la marca ya avanzada, solo se releen las líneas del grupo modificado y solo se reescribe su mes
+    january = os.path.join(str(tmp_path), "Mes=2024-01", "ventas.parquet")
+    january_mtime = os.path.getmtime(january)
+    report = sync.sync()
+    assert report['rows_fetched'] == 2
+    assert report['partitions_written'] == ['2024-02']
+    assert os.path.getmtime(january) == january_mtime
+    assert_store_matches_source(sync, db_ops)
+
+
+def test_full_sync_picks_up_deleted_rows(source, tmp_path):
+    engine, db_ops = source
+    sync = SalesSync(db_ops, str(tmp_path))
+    sync.sync()
+    execute(engine, f"DELETE FROM {SALES_TABLE} WHERE ID_Producto = 8")
+
+    sync.sync()  # Las eliminaciones no se detectan de forma incremental
+    assert 8 in sync.load_sales()['ID_Producto'].tolist()
+    sync.sync(full=True)
+    assert_store_matches_source(sync, db_ops)
+    assert sync.load_state()['rows_synced'] == 2
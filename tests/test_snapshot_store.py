@@ -0,0 +1,85 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+import pandas as pd
+from db.db_operations import DataSnapshotStore
+
+
+def run_threads(target, count):
+    threads = [threading.Thread(target=target, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+
+def test_concurrent_requests_share_a_single_load():
+    store = DataSnapshotStore()
+    loads = []
+    barrier = threading.Barrier(4)
+
+    def loader():
+        loads.append(1)
+        time.sleep(0.05)
+        return pd.DataFrame({'x': [1, 2]})
+
+    def request(index):
+        barrier.wait()
+        store.get("sales", loader)
+
+    run_threads(request, 4)
+    assert loads == [1]
+    assert store.stats()['misses'] == 1 and store.version("sales") == 1
+
+
+def test_a_slow_load_does_not_block_other_keys():
+    store = DataSnapshotStore()
+    loading, release = threading.Event(), threading.Event()
+
+    def slow_loader():
+        loading.set()
+        release.wait(5)
+        return pd.DataFrame({'x': [1]})
+
+    thread = threading.Thread(target=store.get, args=("sales", slow_loader))
+    thread.start()
+    assert loading.wait(5)
+    try:
+        # La carga de "sales" sigue en curso y "inventory" se resuelve sin esperarla
+        assert len(store.get("inventory", lambda: pd.DataFrame({'y': [1, 2, 3]}))) == 3
+        assert not store.is_fresh("sales")
+    finally:
+        release.set()
+        thread.join(5)
+    assert store.is_fresh("sales")
+
+
+def test_derived_objects_are_built_once_per_version():
+    store = DataSnapshotStore()
+    builds = []
+    barrier = threading.Barrier(3)
+
+    def builder(data):
+        builds.append(len(data))
+        time.sleep(0.05)
+        return object()
+
+    derived = [None] * 3
+
+    def request(index):
+        barrier.wait()
+        derived[index] = store.get_derived("sales", lambda: pd.DataFrame({'x': [1, 2]}), "matrix", builder)
+
+    run_threads(request, 3)
+    assert builds == [2] and derived[0] is derived[1] is derived[2]
+
+    # Una recarga crea una versión nueva con sus propios derivados; la copia entregada no altera la instantánea
+    store.invalidate("sales")
+    rebuilt = store.get_derived("sales", lambda: pd.DataFrame({'x': [1, 2, 3]}), "matrix", builder)
+    assert rebuilt is not derived[0] and builds == [2, 3] and store.version("sales") == 2
+    copy = store.get("sales", pd.DataFrame)
+    copy['x'] = 0
+    assert store.get("sales", pd.DataFrame)['x'].tolist() == [1, 2, 3]